@@ -0,0 +1,61 @@
+import argparse
+import json
+import subprocess
+import sys
+import os
+
+# modules that have to import with the standard library and NumPy only
+LIGHT_MODULES = ('maze.maze', 'maze.maze_generator', 'maze.maze_reduction', 'maze.maze_segmentation', 'maze.maze_oracle_model',
+                 'maze.maze_classical', 'maze.maze_io', 'maze.maze_trace')
+# modules that may pull in qiskit, timed to spot regressions
+HEAVY_MODULES = ('maze.maze_circuit', 'maze.maze_solver')
+# packages the light modules must not load
+FORBIDDEN = ('qiskit', 'qiskit_aer', 'matplotlib', 'sympy', 'IPython', 'PIL', 'requests', 'utils')
+
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": sorted(name for name in {forbidden!r} if name in sys.modules)}}))
+'''
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import time of the module in a fresh interpreter, best of repeat runs, and the forbidden packages it loaded
+def measure(module: str, repeat: int = 3) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(module=module, forbidden=FORBIDDEN)], env=env, cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+    return {'module': module, 'seconds': min(run['seconds'] for run in runs), 'loaded': runs[0]['loaded']}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import time of the maze modules, fails when a light module loads a heavy dependency")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-light-seconds', type=float, default=0.5, help="import time budget of every light module")
+    parser.add_argument('--json', help="write the measurements to this file")
+    args = parser.parse_args()
+
+    results = []
+    failures = []
+    for module in LIGHT_MODULES + HEAVY_MODULES:
+        result = measure(module, args.repeat)
+        results.append(result)
+        print(f"{module:28s} {result['seconds']:7.3f} s  {', '.join(result['loaded']) or '-'}")
+        if module in LIGHT_MODULES:
+            if result['loaded']:
+                failures.append(f"{module} loads {', '.join(result['loaded'])}")
+            if result['seconds'] > args.max_light_seconds:
+                failures.append(f"{module} takes {result['seconds']:.3f} s, budget {args.max_light_seconds} s")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
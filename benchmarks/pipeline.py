@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from maze.maze_generator import PrimGenerator
+from maze.maze_classical import BFSSolver
+from maze.maze_circuit import MazeCircuitInfo, MazeOracle, QuantumMazeCircuit, OracleGateLibrary
+
+STAGES = ('generate', 'bfs', 'oracle', 'circuit', 'transpile', 'simulate')
+
+# best wall time of repeat runs of fn, then one more run under tracemalloc for the peak of Python allocations;
+# setup runs before every call and is not timed. Returns the result of the last call with the measurements
+def measure(fn, repeat: int, setup=None) -> tuple[object, dict]:
+    best = float('inf')
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {'seconds': best, 'peak_bytes': peak}
+
+def circuit_counts(circuit) -> dict:
+    return {
+        'num_qubits': circuit.num_qubits,
+        'num_clbits': circuit.num_clbits,
+        'size': circuit.size(),
+        'depth': circuit.depth(),
+        'ops': {name: int(count) for name, count in circuit.count_ops().items()},
+    }
+
+def max_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    # kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+def case_key(case: dict) -> str:
+    return f"{case['width']}x{case['height']} L={case['max_path_length']} tb={int(case['turn_back_check'])} mcx={case['mcx_mode']}"
+
+def run_case(width: int, height: int, max_path_length: int, turn_back_check: bool, args) -> dict:
+    from qiskit import transpile
+    from qiskit_aer import AerSimulator
+
+    case = {'width': width, 'height': height, 'max_path_length': max_path_length, 'turn_back_check': turn_back_check,
+            'mcx_mode': args.mcx_mode, 'seed': args.seed}
+    stages = {}
+    generator = PrimGenerator()
+    maze, stages['generate'] = measure(lambda: generator.generate_maze(width, height, seed=args.seed), args.repeat)
+    path, stages['bfs'] = measure(lambda: BFSSolver().solve(maze), args.repeat)
+    info = MazeCircuitInfo(maze, max_path_length, turn_back_check, iterations=args.iterations, mcx_mode=args.mcx_mode)
+    case['shortest_path_length'] = len(path) - 1 if path is not None else None
+    case['iterations'] = info.iterations
+
+    # every construction gets a library of its own, so it is timed cold and leaves the shared one alone
+    oracle, stages['oracle'] = measure(lambda: MazeOracle(info, gate_library=OracleGateLibrary()), args.repeat)
+    circuit, stages['circuit'] = measure(lambda: QuantumMazeCircuit(maze, max_path_length, turn_back_check, iterations=args.iterations,
+                                                                     mcx_mode=args.mcx_mode, gate_library=OracleGateLibrary()), args.repeat)
+    simulator = AerSimulator()
+    transpiled, stages['transpile'] = measure(lambda: transpile(circuit, simulator), args.repeat)
+    case['counts'] = {'oracle': circuit_counts(oracle), 'circuit': circuit_counts(circuit), 'transpiled': circuit_counts(transpiled)}
+
+    if transpiled.num_qubits <= args.max_sim_qubits:
+        measured = transpiled.copy()
+        measured.measure(range(circuit.num_clbits), range(circuit.num_clbits))
+        _, stages['simulate'] = measure(lambda: simulator.run(measured, shots=args.shots, seed_simulator=args.seed).result(), args.repeat)
+    case['stages'] = stages
+    case['max_rss_bytes'] = max_rss_bytes()
+    return case
+
+def environment() -> dict:
+    import numpy
+    import qiskit
+    import qiskit_aer
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy.__version__,
+        'qiskit': qiskit.__version__,
+        'qiskit_aer': qiskit_aer.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+def run(args) -> int:
+    sizes = [tuple(int(v) for v in size.split('x')) for size in args.sizes.split(',')]
+    lengths = [int(length) for length in args.lengths.split(',')]
+    turn_back = {'off': [False], 'on': [True], 'both': [False, True]}[args.turn_back]
+    cases = []
+    for width, height in sizes:
+        for length in lengths:
+            if length > width * height - 1:
+                continue
+            for turn_back_check in turn_back:
+                case = run_case(width, height, length, turn_back_check, args)
+                cases.append(case)
+                timings = '  '.join(f"{stage} {case['stages'][stage]['seconds'] * 1000:9.2f} ms" for stage in STAGES if stage in case['stages'])
+                print(f"{case_key(case):32s} qubits {case['counts']['transpiled']['num_qubits']:3d}  {timings}", flush=True)
+    arguments = {name: value for name, value in vars(args).items() if name != 'handler'}
+    results = {'environment': environment(), 'arguments': arguments, 'cases': cases}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+# stages slower by more than threshold (and by more than min_seconds) and changed transpiled gate counts, per case
+def compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = {case_key(case): case for case in json.load(f)['cases']}
+    with open(args.current) as f:
+        current = {case_key(case): case for case in json.load(f)['cases']}
+    regressions = []
+    for key in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[key], current[key]
+        for stage in STAGES:
+            if stage not in old['stages'] or stage not in new['stages']:
+                continue
+            before, after = old['stages'][stage]['seconds'], new['stages'][stage]['seconds']
+            ratio = after / before if before > 0 else float('inf')
+            flag = ratio > args.threshold and after - before > args.min_seconds
+            print(f"{key:32s} {stage:10s} {before * 1000:10.2f} ms -> {after * 1000:10.2f} ms  x{ratio:5.2f}{'  REGRESSION' if flag else ''}")
+            if flag:
+                regressions.append(f"{key} {stage} x{ratio:.2f}")
+        old_ops, new_ops = old['counts']['transpiled']['ops'], new['counts']['transpiled']['ops']
+        if old_ops != new_ops:
+            changed = {name: (old_ops.get(name, 0), new_ops.get(name, 0)) for name in old_ops.keys() | new_ops.keys()
+                       if old_ops.get(name, 0) != new_ops.get(name, 0)}
+            print(f"{key:32s} transpiled gate counts changed {changed}")
+            if sum(new_ops.values()) > sum(old_ops.values()):
+                regressions.append(f"{key} gate count {sum(old_ops.values())} -> {sum(new_ops.values())}")
+    for key in sorted(baseline.keys() - current.keys()):
+        print(f"{key:32s} missing from {args.current}")
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Times every stage of the maze pipeline and compares runs")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run the sweep")
+    run_parser.add_argument('--sizes', default='2x2,2x3', help="comma separated WIDTHxHEIGHT mazes")
+    run_parser.add_argument('--lengths', default='3,4', help="comma separated max_path_length values, too long ones are skipped")
+    run_parser.add_argument('--turn-back', choices=('off', 'on', 'both'), default='both')
+    run_parser.add_argument('--mcx-mode', default='noancilla')
+    run_parser.add_argument('--iterations', type=int, default=None, help="Grover iterations, derived from the search space by default")
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--shots', type=int, default=1024)
+    run_parser.add_argument('--seed', type=int, default=1)
+    run_parser.add_argument('--max-sim-qubits', type=int, default=22, help="larger circuits are built and transpiled only")
+    run_parser.add_argument('--output', help="write the results as JSON to this file")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser('compare', help="compare two result files, fails on regressions")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=1.25, help="slowdown ratio counted as a regression")
+    compare_parser.add_argument('--min-seconds', type=float, default=0.005, help="smaller slowdowns are noise")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,9 @@
-import matplotlib.pyplot as plt
-import utils.Helpers as hp
+from typing import TYPE_CHECKING
+import numpy as np
+
+# plotting and the notebook helpers take seconds to import, they are only loaded by show()
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
 
 class Node:
     def __init__(self, id: int, edges: list['Edge'] = []):
@@ -63,27 +67,33 @@ class Edge:
 
 class Graph:
     def __init__(self, nodes: set[Node], start: Node, end: Node, edges: list[Edge] = None):
-        self.__nodes = nodes
-        if start in nodes:
-            self.__start = start
+        self.__node_table: dict[int, Node] = {node.id: node for node in nodes}
+        self.__nodes = frozenset(self.__node_table.values())
+        if start.id in self.__node_table:
+            self.__start = self.__node_table[start.id]
         else:
             raise ValueError(f"Start node {start} is not in the graph nodes")
-        if end in nodes:
-            self.__end = end
+        if end.id in self.__node_table:
+            self.__end = self.__node_table[end.id]
         else:
             raise ValueError(f"End node {end} is not in the graph nodes")
-        if edges is None:
-            self.__edges = []
-        else:
-            self.__edges = list(edges)
+        # outgoing and incoming edges of every node, keyed by the id of the node at the other side
+        self.__successors: dict[int, dict[int, Edge]] = {node_id: {} for node_id in self.__node_table}
+        self.__predecessors: dict[int, dict[int, Edge]] = {node_id: {} for node_id in self.__node_table}
+        self.__edges_view: frozenset[Edge] = None
+        self.__edge_count = 0
+        for edge in edges if edges is not None else []:
+            self.__add_edge(edge)
 
     @property
     def nodes(self) -> frozenset[Node]:
-        return frozenset(self.__nodes)
+        return self.__nodes
 
     @property
     def edges(self) -> frozenset[Edge]:
-        return frozenset(self.__edges)
+        if self.__edges_view is None:
+            self.__edges_view = frozenset(edge for out_edges in self.__successors.values() for edge in out_edges.values())
+        return self.__edges_view
     
     @property
     def start(self) -> Node:
@@ -95,11 +105,16 @@ class Graph:
     
     @property
     def total_nodes(self) -> int:
-        return len(self.nodes)
+        return len(self.__node_table)
+
+    @property
+    def total_edges(self) -> int:
+        return self.__edge_count
     
     @staticmethod
     def from_edges(edges: list[tuple[int, int]], start: int, end: int, bidirectional: bool = False) -> 'Graph':
-        graph = Graph(list(map(lambda node_id: Node(node_id), list(set([node_id for edge in edges for node_id in edge])))), Node(start), Node(end))
+        node_ids = dict.fromkeys(node_id for edge in edges for node_id in edge)
+        graph = Graph([Node(node_id) for node_id in node_ids], Node(start), Node(end))
         for e_start, e_end in edges:
             graph.connect_nodes(e_start, e_end)
             if bidirectional:
@@ -107,22 +122,67 @@ class Graph:
         return graph
     
     def node_by_id(self, node_id: int) -> Node:
-        node = next((node for node in self.nodes if node.id == node_id), None)
-        if not node:
+        node = self.__node_table.get(node_id)
+        if node is None:
             raise ValueError(f"Node with id {node_id} not found in the graph")
         return node
 
+    def has_edge(self, n1_id: int, n2_id: int) -> bool:
+        return n2_id in self.__successors.get(n1_id, ())
+
+    def successors(self, node_id: int) -> list[Node]:
+        self.node_by_id(node_id)
+        return [edge.end for edge in self.__successors[node_id].values()]
+
+    def neighbor_ids(self, node_id: int) -> list[int]:
+        self.node_by_id(node_id)
+        # edges are followed in both directions, as the classical solvers do
+        return list(dict.fromkeys([*self.__successors[node_id], *self.__predecessors[node_id]]))
+
+    def neighbors(self, node_id: int) -> list[Node]:
+        return [self.__node_table[n] for n in self.neighbor_ids(node_id)]
+
+    def __add_edge(self, edge: Edge) -> None:
+        out_edges = self.__successors[edge.start.id]
+        if edge.end.id in out_edges:
+            return
+        out_edges[edge.end.id] = edge
+        self.__predecessors[edge.end.id][edge.start.id] = edge
+        self.__edge_count += 1
+        self.__edges_view = None
+
+    def __remove_edge(self, n1_id: int, n2_id: int) -> None:
+        del self.__successors[n1_id][n2_id]
+        del self.__predecessors[n2_id][n1_id]
+        self.__edge_count -= 1
+        self.__edges_view = None
+
     def connect_nodes(self, n1_id: int, n2_id: int) -> None:
         n1 = self.node_by_id(n1_id)
         n2 = self.node_by_id(n2_id)
-        self.__edges.append(Edge(n1, n2))
+        self.__add_edge(Edge(n1, n2))
 
     def disconnect_nodes(self, n1_id: int, n2_id: int) -> None:
-        n1 = self.node_by_id(n1_id)
-        n2 = self.node_by_id(n2_id)
-        self.__edges.remove(Edge(n1, n2))
+        self.node_by_id(n1_id)
+        self.node_by_id(n2_id)
+        # edges compare equal in both directions, so the reverse edge is removed when the direct one is missing
+        if self.has_edge(n1_id, n2_id):
+            self.__remove_edge(n1_id, n2_id)
+        elif self.has_edge(n2_id, n1_id):
+            self.__remove_edge(n2_id, n1_id)
+        else:
+            raise ValueError(f"Edge {n1_id} -> {n2_id} not found in the graph")
 
-    def show(self, path: list[int] = None):
+    RENDERERS = ('mermaid', 'local')
+
+    # 'mermaid' renders through mermaid.ink, 'local' draws the graph with matplotlib without any network access
+    def show(self, path: list[int] = None, renderer: str = 'mermaid', ax: 'plt.Axes' = None):
+        if renderer not in Graph.RENDERERS:
+            raise ValueError(f"Unknown renderer {renderer}, expected one of {Graph.RENDERERS}")
+        if renderer == 'local':
+            self.__draw(path, ax)
+            return
+        import utils.Helpers as hp
         mermaid_lines = ["flowchart LR;"]
         for edge in self.edges:
             mermaid_lines.append(f"    n{edge.start.id} --> n{edge.end.id};")
@@ -131,25 +191,70 @@ class Graph:
             for start, end in zip(path, path[1:]):
                 mermaid_lines.append(f"    ns{start.id} --> ns{end.id};")
         hp.mm("\n".join(mermaid_lines))
- 
+
+    # left to right layers by breadth first distance from the start like the mermaid flowchart,
+    # nodes the start cannot reach go to a last layer
+    def layout(self) -> dict[int, tuple[float, float]]:
+        depth = {self.start.id: 0}
+        queue = [self.start.id]
+        for node_id in queue:
+            for successor in self.successors(node_id):
+                if successor.id not in depth:
+                    depth[successor.id] = depth[node_id] + 1
+                    queue.append(successor.id)
+        last = max(depth.values()) + 1
+        layers: dict[int, list[int]] = {}
+        for node_id in sorted(node.id for node in self.nodes):
+            layers.setdefault(depth.get(node_id, last), []).append(node_id)
+        return {node_id: (float(layer), i - (len(ids) - 1) / 2) for layer, ids in layers.items() for i, node_id in enumerate(ids)}
+
+    def __draw(self, path: list[int], ax: 'plt.Axes') -> None:
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import LineCollection
+        own_figure = ax is None
+        if own_figure:
+            _, ax = plt.subplots()
+        ax.axis('off')
+        positions = self.layout()
+        edges = [(positions[e.start.id], positions[e.end.id]) for e in self.edges if e.start.id != e.end.id]
+        ax.add_collection(LineCollection(edges, colors='gray', linewidths=1, zorder=1))
+        if path:
+            steps = [(positions[a], positions[b]) for a, b in zip(path, path[1:]) if a != b]
+            ax.add_collection(LineCollection(steps, colors='red', linewidths=2.5, zorder=2))
+        ids = sorted(positions)
+        xy = np.array([positions[node_id] for node_id in ids]).reshape(-1, 2)
+        colors = ['tab:green' if n == self.start.id else 'tab:red' if n == self.end.id else 'white' for n in ids]
+        ax.scatter(xy[:, 0], xy[:, 1], s=300, c=colors, edgecolors='black', zorder=3)
+        for node_id, (x, y) in zip(ids, xy):
+            ax.annotate(str(node_id), (x, y), ha='center', va='center', fontsize=8, zorder=4)
+        ax.autoscale_view()
+        ax.margins(0.1)
+        if own_figure:
+            plt.show()
+
 class Maze(Graph):
     def __init__(self, width: int, height: int, start: tuple[int, int] = (0, 0), end: tuple[int, int] = None):
         self.__width = width
         self.__height = height
         if end is None:
             end = (width - 1, height - 1)
-        if not self.__coordinate_on_boundary(*start):
-            raise ValueError(f"Start {start} must be on the maze boundary")
-        if not self.__coordinate_on_boundary(*end):
-            raise ValueError(f"End {end} must be on the maze boundary")
+        Maze.check_terminals(width, height, start, end)
         nodes = [MazeCell(y * width + x, x, y) for y in range(height) for x in range(width)]
-        edges = []    
-        coord_to_node = {(node.x, node.y): node for node in nodes}
+        super().__init__(nodes, nodes[start[1] * width + start[0]], nodes[end[1] * width + end[0]])
 
-        super().__init__(nodes, coord_to_node[start], coord_to_node[end], edges)
+    @staticmethod
+    def on_boundary(width: int, height: int, x: int, y: int) -> bool:
+        return x == 0 or x == width - 1 or y == 0 or y == height - 1
 
-    def __coordinate_on_boundary(self, x: int, y: int) -> bool:
-        return x == 0 or x == self.width - 1 or y == 0 or y == self.height - 1
+    @staticmethod
+    def check_terminals(width: int, height: int, start: tuple[int, int], end: tuple[int, int]) -> None:
+        for name, (x, y) in (('Start', start), ('End', end)):
+            if not (0 <= x < width and 0 <= y < height):
+                raise ValueError(f"{name} {(x, y)} is outside the {width}x{height} maze")
+        if not Maze.on_boundary(width, height, *start):
+            raise ValueError(f"Start {start} must be on the maze boundary")
+        if not Maze.on_boundary(width, height, *end):
+            raise ValueError(f"End {end} must be on the maze boundary")
 
     @property
     def width(self) -> int:
@@ -173,6 +278,11 @@ class Maze(Graph):
         
     def node_by_id(self, node_id) -> MazeCell:
         return super().node_by_id(node_id)
+
+    def cell_at(self, x: int, y: int) -> MazeCell:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise ValueError(f"Cell ({x}, {y}) is outside the maze")
+        return self.node_by_id(y * self.width + x)
     
     def connect_nodes(self, n1_id: int, n2_id: int) -> None:
         super().connect_nodes(n1_id, n2_id)
@@ -182,45 +292,269 @@ class Maze(Graph):
         super().disconnect_nodes(n1_id, n2_id)
         super().disconnect_nodes(n2_id, n1_id)
 
-    def show(self, path: list[MazeCell] = None):
-        fig, ax = plt.subplots(figsize=(self.width / 2, self.height / 2))
-        ax.set_aspect('equal')
-        ax.axis('off')
+    # east_walls[y, x] is the wall between (x, y) and (x + 1, y), south_walls[y, x] the one between (x, y) and (x, y + 1)
+    def walls(self) -> tuple[np.ndarray, np.ndarray]:
+        east_walls = np.ones((self.height, self.width), dtype=bool)
+        south_walls = np.ones((self.height, self.width), dtype=bool)
+        for edge in self.edges:
+            a, b = edge.start, edge.end
+            if a.y == b.y and abs(a.x - b.x) == 1:
+                east_walls[a.y, min(a.x, b.x)] = False
+            elif a.x == b.x and abs(a.y - b.y) == 1:
+                south_walls[min(a.y, b.y), a.x] = False
+        return east_walls, south_walls
+
+    def to_grid(self) -> 'GridMaze':
+        return GridMaze(self.width, self.height, (self.start.x, self.start.y), (self.end.x, self.end.y), *self.walls())
+
+    # grids with more cells are rasterized instead of drawn as line segments
+    RASTER_CELLS = 250_000
+
+    # wall arrays of every side of every cell with the start and end opened on the boundary
+    def __cell_walls(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        east_walls, south_walls = (w.copy() for w in self.walls())
+        east_walls[:, -1] = True
+        south_walls[-1, :] = True
+        north_walls = np.ones_like(south_walls)
+        north_walls[1:, :] = south_walls[:-1, :]
+        west_walls = np.ones_like(east_walls)
+        west_walls[:, 1:] = east_walls[:, :-1]
 
         def open_wall(node: MazeCell):
             if node.x == 0: # connect to the left
-                new_connection = {(node.x, node.y), (node.x - 1, node.y)}
+                west_walls[node.y, node.x] = False
             elif node.x == self.width - 1: # connect to the right
-                new_connection = {(node.x, node.y), (node.x + 1, node.y)}
+                east_walls[node.y, node.x] = False
             elif node.y == 0: # connect to the top
-                new_connection = {(node.x, node.y), (node.x, node.y - 1)}
-            elif node.y == self.height - 1: # connect to the bottom  
-                new_connection = {(node.x, node.y), (node.x, node.y + 1)}
-            return new_connection    
-
-        connections = {frozenset({(e.start.x, e.start.y), (e.end.x, e.end.y)}) for e in self.edges}
-        connections.add(frozenset(open_wall(self.start)))
-        connections.add(frozenset(open_wall(self.end)))
-
-        def wall_exists(x1, y1, x2, y2):
-            return frozenset({(x1, y1), (x2, y2)}) not in connections
-
-        for y in range(self.height):
-            for x in range(self.width):
-                cx, cy = x, self.height - y - 1
-                if wall_exists(x, y, x, y - 1):  # North
-                    ax.plot([cx, cx + 1], [cy + 1, cy + 1], 'k')
-                if wall_exists(x, y, x - 1, y):  # West
-                    ax.plot([cx, cx], [cy, cy + 1], 'k')
-                if wall_exists(x, y, x, y + 1):  # South
-                    ax.plot([cx, cx + 1], [cy, cy], 'k')
-                if wall_exists(x, y, x + 1, y):  # East
-                    ax.plot([cx + 1, cx + 1], [cy, cy + 1], 'k')
+                north_walls[node.y, node.x] = False
+            elif node.y == self.height - 1: # connect to the bottom
+                south_walls[node.y, node.x] = False
+
+        open_wall(self.start)
+        open_wall(self.end)
+        return north_walls, west_walls, south_walls, east_walls
+
+    # every wall once as a ((x0, y0), (x1, y1)) segment, shape (n, 2, 2), with y pointing up;
+    # inner walls come from the south and east sides, the north and west ones only add the outer boundary
+    def wall_segments(self) -> np.ndarray:
+        north_walls, west_walls, south_walls, east_walls = self.__cell_walls()
+        sides = ((south_walls, (0, 0, 1, 0)), (east_walls, (1, 0, 1, 1)), (north_walls[:1], (0, 1, 1, 1)), (west_walls[:, :1], (0, 0, 0, 1)))
+        segments = []
+        for walls, (x0, y0, x1, y1) in sides:
+            ys, xs = np.nonzero(walls)
+            cy = self.height - ys - 1
+            segments.append(np.stack([np.stack([xs + x0, cy + y0], axis=1), np.stack([xs + x1, cy + y1], axis=1)], axis=1))
+        return np.concatenate(segments).astype(float)
+
+    # (2 * height + 1, 2 * width + 1) image, True on walls: cell (x, y) is pixel (2y + 1, 2x + 1) and the pixels
+    # between two cells hold the wall separating them
+    def raster(self) -> np.ndarray:
+        north_walls, west_walls, south_walls, east_walls = self.__cell_walls()
+        image = np.ones((2 * self.height + 1, 2 * self.width + 1), dtype=bool)
+        image[1::2, 1::2] = False
+        image[1::2, 2::2] = east_walls
+        image[2::2, 1::2] = south_walls
+        image[0, 1::2] = north_walls[0]
+        image[1::2, 0] = west_walls[:, 0]
+        return image
+
+    # draws all walls as one LineCollection, or as a single image once the grid exceeds RASTER_CELLS cells
+    def show(self, path: list[MazeCell] = None, raster: bool = None, ax: 'plt.Axes' = None):
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import LineCollection
+        own_figure = ax is None
+        if own_figure:
+            _, ax = plt.subplots(figsize=(min(self.width / 2, 20), min(self.height / 2, 20)))
+        ax.set_aspect('equal')
+        ax.axis('off')
+
+        if raster is None:
+            raster = self.width * self.height > Maze.RASTER_CELLS
+        if raster:
+            # pixel p covers [(p - 0.5) / 2, p / 2] in cell units, so cell centres stay at x + 0.5
+            ax.imshow(self.raster(), cmap='gray_r', interpolation='nearest',
+                      extent=(-0.25, self.width + 0.25, -0.25, self.height + 0.25))
+        else:
+            ax.add_collection(LineCollection(self.wall_segments(), colors='k'))
+            ax.set_xlim(-0.1, self.width + 0.1)
+            ax.set_ylim(-0.1, self.height + 0.1)
 
         if path:
-            cells = [self.node_by_id(cell_id) for cell_id in path]
-            px = [cell.x + 0.5 for cell in cells]
-            py = [self.height - cell.y - 0.5 for cell in cells]
-            ax.plot(px, py, color='red', linewidth=2)
+            ids = np.asarray(path, dtype=np.int64)
+            ax.plot(ids % self.width + 0.5, self.height - ids // self.width - 0.5, color='red', linewidth=2)
+
+        if own_figure:
+            plt.show()
+
+# Maze stored as two bit-packed wall arrays instead of per-cell objects, MazeCell and Edge instances are created on demand.
+# Graph.__init__ is never run, so the node table and adjacency dicts of Graph do not exist: every Graph and Maze method
+# that reads them is overridden here, the others only go through the public API (tests/test_grid_maze.py checks both)
+class GridMaze(Maze):
+    def __init__(self, width: int, height: int, start: tuple[int, int] = (0, 0), end: tuple[int, int] = None,
+                 east_walls: np.ndarray = None, south_walls: np.ndarray = None):
+        if end is None:
+            end = (width - 1, height - 1)
+        Maze.check_terminals(width, height, start, end)
+        self.__width = width
+        self.__height = height
+        self.__east_walls = GridMaze.pack(width, height, east_walls)
+        self.__south_walls = GridMaze.pack(width, height, south_walls)
+        self.__start = self.__cell(start[1] * width + start[0])
+        self.__end = self.__cell(end[1] * width + end[0])
+
+    # row y of a (height, width) wall array as (width + 7) // 8 bytes, wall x is bit x % 8 of byte x // 8;
+    # without walls every wall is set
+    @staticmethod
+    def pack(width: int, height: int, walls: np.ndarray = None) -> np.ndarray:
+        if walls is None:
+            walls = np.ones((height, width), dtype=bool)
+        walls = np.asarray(walls, dtype=bool)
+        if walls.shape != (height, width):
+            raise ValueError(f"Wall arrays must have shape {(height, width)}, got {walls.shape}")
+        return np.packbits(walls, axis=1, bitorder='little')
+
+    def __unpack(self, packed: np.ndarray) -> np.ndarray:
+        return np.unpackbits(packed, axis=1, count=self.__width, bitorder='little').astype(bool)
+
+    @property
+    def width(self) -> int:
+        return self.__width
+
+    @property
+    def height(self) -> int:
+        return self.__height
+
+    @property
+    def start(self) -> MazeCell:
+        return self.__start
+
+    @property
+    def end(self) -> MazeCell:
+        return self.__end
+
+    # unpacked copies, changing them does not change the maze
+    @property
+    def east_walls(self) -> np.ndarray:
+        return self.__unpack(self.__east_walls)
+
+    @property
+    def south_walls(self) -> np.ndarray:
+        return self.__unpack(self.__south_walls)
+
+    # bytes held by the wall arrays
+    @property
+    def nbytes(self) -> int:
+        return self.__east_walls.nbytes + self.__south_walls.nbytes
+
+    @property
+    def nodes(self) -> frozenset[MazeCell]:
+        return frozenset(self.__cell(node_id) for node_id in range(self.total_nodes))
+
+    @property
+    def edges(self) -> frozenset[Edge]:
+        width = self.width
+        east_walls, south_walls = self.walls()
+        ys, xs = np.nonzero(~east_walls[:, :-1])
+        horizontal = zip((ys * width + xs).tolist(), (ys * width + xs + 1).tolist())
+        ys, xs = np.nonzero(~south_walls[:-1, :])
+        vertical = zip((ys * width + xs).tolist(), ((ys + 1) * width + xs).tolist())
+        edges = set()
+        for a, b in [*horizontal, *vertical]:
+            n1, n2 = self.__cell(a), self.__cell(b)
+            edges.add(Edge(n1, n2))
+            edges.add(Edge(n2, n1))
+        return frozenset(edges)
+
+    @property
+    def total_nodes(self) -> int:
+        return self.width * self.height
+
+    @property
+    def total_edges(self) -> int:
+        east_walls, south_walls = self.walls()
+        return 2 * (int(np.count_nonzero(~east_walls[:, :-1])) + int(np.count_nonzero(~south_walls[:-1, :])))
+
+    def __cell(self, node_id: int) -> MazeCell:
+        width = self.width
+        return MazeCell(node_id, node_id % width, node_id // width)
+
+    def __check_id(self, node_id: int) -> None:
+        if not (0 <= node_id < self.total_nodes):
+            raise ValueError(f"Node with id {node_id} not found in the graph")
+
+    def node_by_id(self, node_id: int) -> MazeCell:
+        self.__check_id(node_id)
+        return self.__cell(node_id)
+
+    @staticmethod
+    def __is_wall(walls: np.ndarray, y: int, x: int) -> bool:
+        return bool(walls[y, x >> 3] >> (x & 7) & 1)
+
+    # returns the packed wall array and the cell whose east or south wall separates two adjacent cells
+    def __wall_between(self, n1_id: int, n2_id: int) -> tuple[np.ndarray, int, int]:
+        self.__check_id(n1_id)
+        self.__check_id(n2_id)
+        width = self.width
+        low, high = min(n1_id, n2_id), max(n1_id, n2_id)
+        y, x = divmod(low, width)
+        if high - low == 1 and x < width - 1:
+            return self.__east_walls, y, x
+        if high - low == width:
+            return self.__south_walls, y, x
+        raise ValueError(f"Cells {n1_id} and {n2_id} are not adjacent")
+
+    def has_edge(self, n1_id: int, n2_id: int) -> bool:
+        try:
+            walls, y, x = self.__wall_between(n1_id, n2_id)
+        except ValueError:
+            return False
+        return not GridMaze.__is_wall(walls, y, x)
+
+    def connect_nodes(self, n1_id: int, n2_id: int) -> None:
+        walls, y, x = self.__wall_between(n1_id, n2_id)
+        walls[y, x >> 3] &= ~np.uint8(1 << (x & 7))
+
+    def disconnect_nodes(self, n1_id: int, n2_id: int) -> None:
+        walls, y, x = self.__wall_between(n1_id, n2_id)
+        if GridMaze.__is_wall(walls, y, x):
+            raise ValueError(f"Edge {n1_id} -> {n2_id} not found in the graph")
+        walls[y, x >> 3] |= np.uint8(1 << (x & 7))
+
+    def neighbor_ids(self, node_id: int) -> list[int]:
+        self.__check_id(node_id)
+        width, height = self.width, self.height
+        y, x = divmod(node_id, width)
+        result = []
+        if x > 0 and not GridMaze.__is_wall(self.__east_walls, y, x - 1):
+            result.append(node_id - 1)
+        if x < width - 1 and not GridMaze.__is_wall(self.__east_walls, y, x):
+            result.append(node_id + 1)
+        if y > 0 and not GridMaze.__is_wall(self.__south_walls, y - 1, x):
+            result.append(node_id - width)
+        if y < height - 1 and not GridMaze.__is_wall(self.__south_walls, y, x):
+            result.append(node_id + width)
+        return result
+
+    def neighbors(self, node_id: int) -> list[MazeCell]:
+        return [self.__cell(n) for n in self.neighbor_ids(node_id)]
+
+    def successors(self, node_id: int) -> list[MazeCell]:
+        return self.neighbors(node_id)
+
+    # unpacked (height, width) bool copies like Maze.walls
+    def walls(self) -> tuple[np.ndarray, np.ndarray]:
+        return self.__unpack(self.__east_walls), self.__unpack(self.__south_walls)
+
+    def to_grid(self) -> 'GridMaze':
+        return self
+
+    def copy(self) -> 'GridMaze':
+        return GridMaze(self.width, self.height, (self.start.x, self.start.y), (self.end.x, self.end.y), *self.walls())
 
-        plt.show()
+    # an independent maze over the region; bit-packed rows cannot be sliced at any column, so the walls are copied
+    def crop(self, x: int, y: int, width: int, height: int, start: tuple[int, int] = (0, 0), end: tuple[int, int] = None) -> 'GridMaze':
+        if x < 0 or y < 0 or x + width > self.width or y + height > self.height:
+            raise ValueError(f"Region ({x}, {y}, {width}, {height}) is outside the maze")
+        east_walls, south_walls = (np.unpackbits(walls[y:y + height], axis=1, count=x + width, bitorder='little')[:, x:].astype(bool)
+                                   for walls in (self.__east_walls, self.__south_walls))
+        return GridMaze(width, height, start, end, east_walls, south_walls)
@@ -0,0 +1,101 @@
+import asyncio
+from maze.maze_circuit import QuantumMazeCircuit, MazeCircuitInfo
+from maze.maze_service import SolveService, SolveJob, JobResult
+from maze.maze_solver import Path, QuantumMazeSolver
+
+class JobFailed(Exception):
+    def __init__(self, result: JobResult):
+        super().__init__(f"Job {result.job_id!r} failed: {result.error}")
+        self.result = result
+
+# asyncio front-end of QuantumMazeSolver. Aer keeps the GIL for the whole simulation, so solves run on a pool of
+# max_concurrency worker processes (see SolveService) and the event loop only awaits their futures. submit waits while
+# max_pending solves are unfinished
+class AsyncQuantumMazeSolver:
+    def __init__(self, backend: str = 'aer', max_concurrency: int = 4, max_pending: int = None, cache_capacity: int = 32,
+                 cache_directory: str = None, simulator_options: dict = None, mp_context=None):
+        if backend not in QuantumMazeSolver.BACKENDS:
+            raise ValueError(f"Unknown backend {backend}, expected one of {QuantumMazeSolver.BACKENDS}")
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        max_pending = max_pending if max_pending is not None else 4 * max_concurrency
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be at least 1, got {max_pending}")
+        self.__backend = backend
+        self.__max_concurrency = max_concurrency
+        self.__max_pending = max_pending
+        self.__service = SolveService(max_concurrency, cache_capacity, cache_directory, simulator_options, mp_context)
+        self.__queued = asyncio.Semaphore(max_pending)
+        self.__tasks: set[asyncio.Task] = set()
+        self.__closed = False
+
+    @property
+    def backend(self) -> str:
+        return self.__backend
+
+    @property
+    def max_concurrency(self) -> int:
+        return self.__max_concurrency
+
+    @property
+    def max_pending(self) -> int:
+        return self.__max_pending
+
+    # submitted solves that have not finished yet
+    @property
+    def pending(self) -> int:
+        return len(self.__tasks)
+
+    # waits for room when max_pending solves are unfinished, then returns a task resolving to the decoded paths.
+    # The timeout counts from here, so it includes the time spent waiting for a worker. Cancelling the task or running
+    # out of time drops a solve that has not started and stops a running one by replacing its worker process.
+    # Timed out and failed solves raise TimeoutError and JobFailed
+    async def submit(self, circuit: QuantumMazeCircuit | MazeCircuitInfo, shots: int = 1, seed: int = None, timeout: float = None) -> asyncio.Task:
+        if self.__closed:
+            raise RuntimeError("The solver is closed")
+        await self.__queued.acquire()
+        task = asyncio.ensure_future(self.__run(circuit, shots, seed, timeout))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__finished)
+        return task
+
+    async def solve(self, circuit: QuantumMazeCircuit | MazeCircuitInfo, shots: int = 1, seed: int = None, timeout: float = None) -> list[Path]:
+        return await (await self.submit(circuit, shots, seed, timeout))
+
+    def __finished(self, task: asyncio.Task) -> None:
+        self.__tasks.discard(task)
+        self.__queued.release()
+
+    async def __run(self, circuit: QuantumMazeCircuit | MazeCircuitInfo, shots: int, seed: int, timeout: float) -> list[Path]:
+        info = circuit if isinstance(circuit, MazeCircuitInfo) else circuit.info
+        future = self.__service.submit(SolveJob.quantum(info, shots, seed, self.__backend, timeout))
+        try:
+            result: JobResult = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except TimeoutError:
+            # waiting stopped, cancelling the wrapper only reaches a queued job, a running one needs the service
+            self.__service.cancel(future)
+            raise TimeoutError(f"exceeded {timeout} s") from None
+        except asyncio.CancelledError:
+            self.__service.cancel(future)
+            raise
+        if result.status == 'timeout':
+            raise TimeoutError(result.error)
+        if not result.ok:
+            raise JobFailed(result)
+        return result.paths
+
+    # waits for the unfinished solves, or cancels them, and stops the worker processes
+    async def close(self, cancel: bool = False) -> None:
+        self.__closed = True
+        tasks = list(self.__tasks)
+        if cancel:
+            for task in tasks:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, self.__service.shutdown, True, cancel)
+
+    async def __aenter__(self) -> 'AsyncQuantumMazeSolver':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close(cancel=exc_type is not None)
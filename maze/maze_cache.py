@@ -0,0 +1,114 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import tempfile
+from qiskit import QuantumCircuit, qpy
+from maze.maze import Graph
+from maze.maze_circuit import MazeCircuitInfo
+
+# stable digest of the graph structure, independent of node and edge iteration order
+def graph_fingerprint(graph: Graph) -> str:
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        'nodes': sorted(node.id for node in graph.nodes),
+        'edges': sorted((edge.start.id, edge.end.id) for edge in graph.edges),
+        'start': graph.start.id,
+        'end': graph.end.id,
+    }).encode('utf8'))
+    return digest.hexdigest()
+
+# transpiled circuits kept in an in-memory LRU and, optionally, as QPY files on disk
+class CircuitCache:
+    def __init__(self, capacity: int = 32, directory: str = None, max_disk_bytes: int = 1 << 30):
+        self.__capacity = capacity
+        self.__directory = directory
+        self.__max_disk_bytes = max_disk_bytes
+        self.__memory: OrderedDict[str, QuantumCircuit] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(maze_circuit_info: MazeCircuitInfo, backend_options: dict = None) -> str:
+        info = maze_circuit_info
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            'graph': graph_fingerprint(info.graph),
+            'max_path_length': info.max_path_length,
+            'turn_back_check': info.turn_back_check,
+            'iterations': info.iterations,
+            'encoding': info.encoding,
+            'mcx_mode': info.mcx_mode,
+            'backend': {str(k): repr(v) for k, v in sorted((backend_options or {}).items())},
+        }, sort_keys=True).encode('utf8'))
+        return digest.hexdigest()
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.__directory, f'{key}.qpy')
+
+    def get(self, key: str) -> QuantumCircuit | None:
+        if key in self.__memory:
+            self.__memory.move_to_end(key)
+            self.__hits += 1
+            return self.__memory[key]
+        if self.__directory is not None and os.path.exists(self.__path(key)):
+            try:
+                with open(self.__path(key), 'rb') as file:
+                    circuit = qpy.load(file)[0]
+            except (OSError, qpy.QpyError):
+                circuit = None
+            if circuit is not None:
+                os.utime(self.__path(key))
+                self.__remember(key, circuit)
+                self.__hits += 1
+                return circuit
+        self.__misses += 1
+        return None
+
+    def put(self, key: str, circuit: QuantumCircuit) -> None:
+        self.__remember(key, circuit)
+        if self.__directory is None:
+            return
+        # write to a temporary file first so concurrent readers never see a partial file
+        handle, temporary = tempfile.mkstemp(dir=self.__directory, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as file:
+            qpy.dump(circuit, file)
+        os.replace(temporary, self.__path(key))
+        self.__evict_disk()
+
+    def clear(self) -> None:
+        self.__memory.clear()
+        if self.__directory is not None:
+            for name in os.listdir(self.__directory):
+                if name.endswith('.qpy'):
+                    os.remove(os.path.join(self.__directory, name))
+
+    def __remember(self, key: str, circuit: QuantumCircuit) -> None:
+        self.__memory[key] = circuit
+        self.__memory.move_to_end(key)
+        while len(self.__memory) > self.__capacity:
+            self.__memory.popitem(last=False)
+
+    # removes the least recently used files until the store fits max_disk_bytes
+    def __evict_disk(self) -> None:
+        entries = []
+        for name in os.listdir(self.__directory):
+            if name.endswith('.qpy'):
+                stat = os.stat(os.path.join(self.__directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.__max_disk_bytes:
+                break
+            os.remove(os.path.join(self.__directory, name))
+            total -= size
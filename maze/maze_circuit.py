@@ -1,16 +1,38 @@
-from qiskit import QuantumCircuit
-from qiskit.circuit.library import XGate, ZGate, GroverOperator
+import threading
+from collections import OrderedDict
+from qiskit import QuantumCircuit, transpile
+from qiskit.circuit import Gate
+from qiskit.circuit.library import XGate, ZGate, RCCXGate, GroverOperator
+from qiskit.synthesis import synth_mcx_n_clean_m15, synth_mcx_1_clean_b95
 import numpy as np
-from maze.maze import Graph, Edge
+from maze.maze import Graph, Edge, Maze
+from maze.maze_oracle_model import MazeOracleModel, DirectionOracleModel, opposite_move
+from maze import maze_trace
 from qiskit import QuantumCircuit
 
+# synthesis of the multi-controlled gates: 'noancilla' needs no extra qubits, 'recursion' borrows one work qubit,
+# 'v-chain' uses a ladder of Toffolis over clean work qubits and 'relative-phase' additionally lets the edge and
+# turn back checks use relative-phase Toffolis, which is exact because the path check is uncomputed by its inverse
+MCX_MODES = ('noancilla', 'recursion', 'v-chain', 'relative-phase')
+
 class MazeCircuitInfo:
-    def __init__(self, graph: Graph, max_path_length: int = None):
+    # iterations overrides the Grover iteration count otherwise derived from number_of_solutions
+    def __init__(self, graph: Graph, max_path_length: int = None, turn_back_check: bool = False, number_of_solutions: int = 1, iterations: int = None,
+                 mcx_mode: str = 'noancilla'):
+        if mcx_mode not in MCX_MODES:
+            raise ValueError(f"Unknown mcx mode {mcx_mode}, expected one of {MCX_MODES}")
         self.__graph = graph
         self.__max_path_length = max_path_length if max_path_length else graph.total_nodes - 1
         self.__num_nodes_in_max_path = self.__max_path_length + 1
         self.__bits_per_node = int(np.ceil(np.log2(graph.total_nodes)))
         self.__num_qubits_in_max_path = (self.__num_nodes_in_max_path) * self.__bits_per_node
+        self.__turn_back_check = turn_back_check
+        self.__number_of_solutions = number_of_solutions
+        self.__iterations = iterations
+        self.__mcx_mode = mcx_mode
+        self.__num_ancillas = self.__max_path_length
+        if turn_back_check:
+            self.__num_ancillas += self.__max_path_length - 1
 
     @property
     def graph(self) -> Graph:
@@ -27,166 +49,729 @@ class MazeCircuitInfo:
     @property
     def num_qubits_in_max_path(self) -> int:
         return self.__num_qubits_in_max_path
+    @property
+    def turn_back_check(self) -> bool:
+        return self.__turn_back_check
+    @property
+    def number_of_solutions(self) -> int:
+        return self.__number_of_solutions
+    @property
+    def num_ancillas(self) -> int:
+        return self.__num_ancillas
+    @property
+    def mcx_mode(self) -> str:
+        return self.__mcx_mode
+    # number of controls of every kind of multi-controlled gate in the oracle
+    @property
+    def control_sizes(self) -> list[int]:
+        sizes = [2 * self.bits_per_node, self.num_ancillas - 1]
+        if self.turn_back_check:
+            sizes.append(self.bits_per_node)
+        return sizes
+    # clean qubits after the ancillas, shared by all multi-controlled gates
+    @property
+    def num_work_qubits(self) -> int:
+        oracle = max(mcx_work_qubits(k, self.mcx_mode) for k in self.control_sizes)
+        # the diffuser runs once the oracle has uncomputed its ancillas and borrows them as clean work qubits
+        diffuser = mcx_work_qubits(self.num_qubits_in_max_path - 1, self.mcx_mode) - self.num_ancillas
+        return max(oracle, diffuser)
+    @property
+    def total_qubits(self) -> int:
+        return self.__num_qubits_in_max_path + self.__num_ancillas + self.num_work_qubits
+    @property
+    def iterations(self) -> int:
+        if self.__iterations is not None:
+            return self.__iterations
+        return int(np.ceil((np.pi / 4) * np.sqrt((2 ** self.num_qubits_in_max_path) / self.number_of_solutions )))
+    # how the path register is laid out: one node id per path position
+    @property
+    def encoding(self) -> str:
+        return 'node'
+    @property
+    def register_width(self) -> int:
+        return self.__num_nodes_in_max_path
+    @property
+    def bits_per_symbol(self) -> int:
+        return self.__bits_per_node
+
+    def oracle_model(self) -> MazeOracleModel:
+        return MazeOracleModel(self)
+
+    def estimate_resources(self) -> 'MazeCircuitResources':
+        return MazeCircuitResources(self)
+
+# path register holding one 2-bit move per step instead of one node id per position, only for mazes.
+# The oracle tracks the walker: before step s it stands on one of the cells reachable from the start in s moves, held as
+# an index into that list by the position register of the step (no qubits while there is a single cell), and every
+# (cell, move) the walls allow is one lookup entry setting the ok ancilla of the step and the next position register.
+# On the last step only the moves into the end count, so the ok ancillas are all set exactly on the marked registers
+class DirectionMazeCircuitInfo(MazeCircuitInfo):
+    def __init__(self, maze: Maze, max_path_length: int = None, turn_back_check: bool = False, number_of_solutions: int = 1, iterations: int = None,
+                 mcx_mode: str = 'noancilla'):
+        if not isinstance(maze, Maze):
+            raise ValueError(f"Direction encoding requires a Maze, got {type(maze).__name__}")
+        super().__init__(maze, max_path_length, turn_back_check, number_of_solutions, iterations, mcx_mode)
+        self.__moves: np.ndarray = None
+        self.__positions: list[list[int]] = None
+        self.__transitions: list[list[tuple[int, int, int]]] = None
+
+    # cells the walker can stand on before every step, positions[0] is the start; the walker stays on the end with move 0
+    @property
+    def positions(self) -> list[list[int]]:
+        if self.__positions is None:
+            self.__build_lookup()
+        return self.__positions
+
+    # (position index, move, next position index) of every move the oracle accepts at every step;
+    # the next index is 0 on the last step, which has no position register after it
+    @property
+    def transitions(self) -> list[list[tuple[int, int, int]]]:
+        if self.__transitions is None:
+            self.__build_lookup()
+        return self.__transitions
+
+    def __build_lookup(self) -> None:
+        self.__moves = moves = self.oracle_model().moves
+        end = self.graph.end.id
+        positions = [[self.graph.start.id]]
+        transitions = []
+        for s in range(self.max_path_length):
+            last = s == self.max_path_length - 1
+            entries = []
+            for i, cell in enumerate(positions[s]):
+                for move in range(4):
+                    target = end if cell == end and move == 0 else int(moves[cell, move]) if cell != end else -1
+                    if target >= 0 and (not last or target == end):
+                        entries.append((i, move, target))
+            if not last:
+                following = sorted({target for _, _, target in entries})
+                index = {cell: i for i, cell in enumerate(following)}
+                positions.append(following)
+                entries = [(i, move, index[target]) for i, move, target in entries]
+            else:
+                entries = [(i, move, 0) for i, move, _ in entries]
+            transitions.append(entries)
+        self.__positions = positions
+        self.__transitions = transitions
+
+    def position_bits(self, step: int) -> int:
+        return int(np.ceil(np.log2(len(self.positions[step]))))
+
+    # first qubit of the position register of every step, step 0 has none
+    def position_offset(self, step: int) -> int:
+        return self.num_qubits_in_max_path + sum(self.position_bits(s) for s in range(1, step))
+
+    def ok_ancilla(self, step: int) -> int:
+        return self.position_offset(self.max_path_length) + step
+
+    # clean qubit holding the match of one lookup entry while it writes the next position
+    @property
+    def lookup_ancilla(self) -> int:
+        return self.ok_ancilla(self.max_path_length)
+
+    # (position index, move of the previous step) pairs of every step whose move back to the previous cell is a turn back
+    def turn_backs(self, step: int) -> list[tuple[int, int]]:
+        if not self.turn_back_check or step == 0 or step == self.max_path_length - 1:
+            # the last step only counts moves into the end, which never turn back to a cell the walker came from
+            return []
+        previous = set(self.positions[step - 1]) - {self.graph.end.id}
+        moves = self.__moves
+        return [(i, opposite_move(move)) for i, cell in enumerate(self.positions[step]) if cell != self.graph.end.id
+                for move in range(4) if moves[cell, move] in previous]
+
+    @property
+    def num_qubits_in_max_path(self) -> int:
+        return 2 * self.max_path_length
+    @property
+    def num_ancillas(self) -> int:
+        position_qubits = sum(self.position_bits(s) for s in range(1, self.max_path_length))
+        return position_qubits + self.max_path_length + 1
+    @property
+    def total_qubits(self) -> int:
+        return self.num_qubits_in_max_path + self.num_ancillas + self.num_work_qubits
+    # position and move of a lookup entry, position and both moves of a turn back, the ok ancillas of the phase flip
+    @property
+    def control_sizes(self) -> list[int]:
+        sizes = [self.position_bits(s) + 2 for s in range(self.max_path_length)] + [self.max_path_length - 1]
+        if self.turn_back_check:
+            sizes += [self.position_bits(s) + 4 for s in range(1, self.max_path_length - 1)]
+        return sizes
+    @property
+    def encoding(self) -> str:
+        return 'direction'
+    @property
+    def register_width(self) -> int:
+        return self.max_path_length
+    @property
+    def bits_per_symbol(self) -> int:
+        return 2
+
+    def oracle_model(self) -> DirectionOracleModel:
+        return DirectionOracleModel(self)
+
+    def estimate_resources(self) -> 'MazeCircuitResources':
+        return DirectionMazeCircuitResources(self)
+
+# CX count and depth of a multi-controlled X/Z gate with k controls, transpiled to ['cx', 'u'] without ancillas.
+# These are upper bounds inside a whole oracle: the transpiler borrows the qubits it knows to be clean there and
+# synthesizes noancilla (and the smaller recursion) gates far cheaper, a noancilla circuit can come out at half the count
+MCX_CX_COUNT = {0: 0, 1: 1, 2: 6, 3: 14, 4: 36, 5: 84, 6: 140}
+MCX_DEPTH = {0: 1, 1: 1, 2: 11, 3: 27, 4: 65, 5: 131, 6: 193, 7: 333, 8: 501, 9: 705, 10: 937, 11: 1205, 12: 1501}
+# same with one work qubit (recursion), from 5 controls on
+MCX_RECURSION_CX_COUNT = {5: 56, 6: 80}
+MCX_RECURSION_DEPTH = {5: 87, 6: 151, 7: 180, 8: 210, 9: 250, 10: 278, 11: 314, 12: 342, 13: 378}
+
+# work qubits taken by a multi-controlled gate with k controls
+def mcx_work_qubits(num_controls: int, mode: str = 'noancilla') -> int:
+    if mode in ('v-chain', 'relative-phase'):
+        return max(0, num_controls - 2)
+    if mode == 'recursion':
+        return 1 if num_controls > 4 else 0
+    return 0
+
+# relative marks the phase-insensitive MCX of the edge and turn back checks
+def mcx_cx_count(num_controls: int, mode: str = 'noancilla', relative: bool = False) -> int:
+    if mode == 'relative-phase' and relative and num_controls > 1:
+        return 6 * num_controls - 9
+    if mode in ('v-chain', 'relative-phase') and num_controls > 2:
+        return 6 * num_controls - 6
+    if mode == 'recursion' and num_controls > 4:
+        return MCX_RECURSION_CX_COUNT.get(num_controls, 16 * num_controls - 8)
+    return MCX_CX_COUNT.get(num_controls, 8 * num_controls ** 2 - 16 * num_controls - 60)
+
+def mcx_depth(num_controls: int, mode: str = 'noancilla', relative: bool = False) -> int:
+    if mode == 'relative-phase' and relative and num_controls > 1:
+        return 12 * num_controls - 17
+    if mode in ('v-chain', 'relative-phase') and num_controls > 2:
+        return 12 * num_controls - 12
+    if mode == 'recursion' and num_controls > 4:
+        return MCX_RECURSION_DEPTH.get(num_controls, 34 * num_controls - 64)
+    return MCX_DEPTH.get(num_controls, 16 * num_controls ** 2 - 70 * num_controls + 37)
+
+# analytic gate and qubit counts of QuantumMazeCircuit, computed from the graph without building any circuit
+class MazeCircuitResources:
+    def __init__(self, maze_circuit_info: MazeCircuitInfo):
+        self.__info = info = maze_circuit_info
+        self.__mcx_per_iteration, self.__mcz_per_iteration, extra_cx, extra_depth = self.gate_counts()
+        mode = info.mcx_mode
+        self.__cx_per_iteration = extra_cx + sum(mcx_cx_count(k, mode, True) * n for k, n in self.__mcx_per_iteration.items()) \
+            + sum(mcx_cx_count(k, mode) * n for k, n in self.__mcz_per_iteration.items())
+        self.__depth_per_iteration = extra_depth + sum(mcx_depth(k, mode, True) * n for k, n in self.__mcx_per_iteration.items()) \
+            + sum(mcx_depth(k, mode) * n for k, n in self.__mcz_per_iteration.items())
+
+    # multi-controlled X gates (phase-insensitive, undone by the uncompute) and multi-controlled Z gates of one
+    # Grover iteration keyed by number of controls, then the CX count and depth of the remaining gates
+    def gate_counts(self) -> tuple[dict[int, int], dict[int, int], int, int]:
+        info = self.__info
+        graph = info.graph
+        edges = list(graph.edges)
+        bits = info.bits_per_node
+        length = info.max_path_length
+        # edge checks run once on every directed edge plus the self-cycle of the end node
+        if not graph.has_edge(graph.end.id, graph.end.id):
+            edges.append(Edge(graph.end, graph.end))
+        first_edges = sum(1 for e in edges if e.start == graph.start)
+        last_edges = sum(1 for e in edges if e.end == graph.end)
+        edge_checks = first_edges + last_edges + max(0, length - 2) * len(edges)
+        if length == 1:
+            edge_checks = sum(1 for e in edges if e.start == graph.start and e.end == graph.end)
+        turn_back_steps = length - 1 if info.turn_back_check else 0
+
+        # path check is applied twice per oracle (compute and uncompute)
+        mcx = {2 * bits: 2 * (edge_checks + turn_back_steps)}
+        if turn_back_steps:
+            mcx[bits] = mcx.get(bits, 0) + 2 * turn_back_steps
+        mcz = {}
+        for controls in (info.num_ancillas - 1, info.num_qubits_in_max_path - 1):
+            mcz[controls] = mcz.get(controls, 0) + 1
+        return mcx, mcz, 2 * turn_back_steps * 2 * bits, 2 * turn_back_steps * 2
+
+    @property
+    def info(self) -> MazeCircuitInfo:
+        return self.__info
+    @property
+    def num_qubits(self) -> int:
+        return self.__info.total_qubits
+    @property
+    def num_path_qubits(self) -> int:
+        return self.__info.num_qubits_in_max_path
+    @property
+    def num_ancillas(self) -> int:
+        return self.__info.num_ancillas
+    @property
+    def num_work_qubits(self) -> int:
+        return self.__info.num_work_qubits
+    @property
+    def iterations(self) -> int:
+        return self.__info.iterations
+    # number of multi-controlled X gates in the whole circuit, keyed by number of controls
+    @property
+    def mcx_counts(self) -> dict[int, int]:
+        return {k: n * self.iterations for k, n in self.__mcx_per_iteration.items()}
+    # number of multi-controlled Z gates (oracle phase flip and diffuser) in the whole circuit, keyed by number of controls
+    @property
+    def mcz_counts(self) -> dict[int, int]:
+        return {k: n * self.iterations for k, n in self.__mcz_per_iteration.items()}
+    # per gate synthesis costs: exact for the v-chain and relative-phase modes, an upper bound for the noancilla and
+    # recursion modes whose gates the transpiler shrinks with borrowed qubits
+    @property
+    def estimated_cx(self) -> int:
+        return self.__cx_per_iteration * self.iterations
+    # upper bound, multi-controlled gates are assumed to run one after another
+    @property
+    def estimated_depth(self) -> int:
+        return self.__depth_per_iteration * self.iterations + 1
+
+    def as_dict(self) -> dict:
+        return {
+            'num_qubits': self.num_qubits,
+            'num_path_qubits': self.num_path_qubits,
+            'num_ancillas': self.num_ancillas,
+            'num_work_qubits': self.num_work_qubits,
+            'mcx_mode': self.info.mcx_mode,
+            'iterations': self.iterations,
+            'mcx_counts': self.mcx_counts,
+            'mcz_counts': self.mcz_counts,
+            'estimated_cx': self.estimated_cx,
+            'estimated_depth': self.estimated_depth,
+        }
 
+    def __repr__(self) -> str:
+        return f"MazeCircuitResources(qubits={self.num_qubits}, iterations={self.iterations}, cx~{self.estimated_cx}, depth<={self.estimated_depth})"
+
+# lookup entries of DirectionMazeOracle: an entry writing a position computes its match on the lookup ancilla, copies
+# it to the ok ancilla and the set bits of the next position with CX gates and uncomputes it, the others flip the ok
+# ancilla directly; turn backs flip it back
+class DirectionMazeCircuitResources(MazeCircuitResources):
+    def gate_counts(self) -> tuple[dict[int, int], dict[int, int], int, int]:
+        info = self.info
+        mcx: dict[int, int] = {}
+        extra_cx = 0
+        for s, entries in enumerate(info.transitions):
+            controls = info.position_bits(s) + 2
+            for _, _, following in entries:
+                mcx[controls] = mcx.get(controls, 0) + (2 if following else 1)
+                extra_cx += bin(following).count('1') + 1 if following else 0
+            turn_backs = len(info.turn_backs(s))
+            if turn_backs:
+                mcx[controls + 2] = mcx.get(controls + 2, 0) + turn_backs
+        # the position tracking runs twice per oracle (compute and uncompute)
+        mcx = {k: 2 * n for k, n in mcx.items()}
+        mcz = {}
+        for controls in (info.max_path_length - 1, info.num_qubits_in_max_path - 1):
+            mcz[controls] = mcz.get(controls, 0) + 1
+        return mcx, mcz, 2 * extra_cx, 2 * extra_cx
+
+# work qubits of the chosen mcx mode follow the n_qubits register qubits
 class GroverDiffusionOperator(QuantumCircuit):
-    def __init__(self, n_qubits: int):
-        super().__init__(n_qubits, name="Diffuser")
+    def __init__(self, n_qubits: int, mcx_mode: str = 'noancilla', gate_library: 'OracleGateLibrary' = None):
+        gate_library = gate_library if gate_library is not None else SHARED_GATE_LIBRARY
+        phase_flip = gate_library.multi_controlled_z(n_qubits - 1, mcx_mode)
+        super().__init__(phase_flip.num_qubits, name="Diffuser")
         self.h(range(n_qubits))
         self.x(range(n_qubits))
-        self.append(ZGate().control(n_qubits - 1), range(n_qubits))
+        self.append(phase_flip, range(phase_flip.num_qubits))
         self.x(range(n_qubits))
         self.h(range(n_qubits))
 
+# one Gate definition per node pattern, edge check, block of edge checks and turn back check,
+# shared by every oracle built with the same library; gates of the multi-controlled modes that need
+# work qubits take them as their last qubits. At most capacity gates are kept, least recently used first out;
+# an evicted gate stays valid in the circuits holding it, it is only rebuilt for the next oracle asking for it
+class OracleGateLibrary:
+    def __init__(self, capacity: int = 4096):
+        if capacity < 1:
+            raise ValueError(f"Capacity must be positive, got {capacity}")
+        self.__capacity = capacity
+        self.__gates: OrderedDict[tuple, Gate] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def size(self) -> int:
+        with self.__lock:
+            return len(self.__gates)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__gates.clear()
+
+    # oracles keep their library, copies and pickles of them get an empty one of the same capacity
+    def __reduce__(self):
+        return OracleGateLibrary, (self.__capacity,)
+
+    # wraps a circuit into a gate without the deep copy of to_gate, so nested library gates stay shared
+    @staticmethod
+    def wrap(circuit: QuantumCircuit) -> Gate:
+        gate = Gate(circuit.name, circuit.num_qubits, [])
+        gate.definition = circuit
+        return gate
+
+    # builds outside the lock since builds nest; when two threads race on a key the first stored gate wins
+    def __memoized(self, key: tuple, build) -> Gate:
+        with self.__lock:
+            gate = self.__gates.get(key)
+            if gate is not None:
+                self.__gates.move_to_end(key)
+                return gate
+        gate = build()
+        with self.__lock:
+            gate = self.__gates.setdefault(key, gate)
+            self.__gates.move_to_end(key)
+            while len(self.__gates) > self.__capacity:
+                self.__gates.popitem(last=False)
+        return gate
+
+    # X on the target (qubit num_controls) when all controls are set; relative allows a relative phase,
+    # which cancels as long as the gate is later undone by its inverse
+    def multi_controlled_x(self, num_controls: int, mode: str = 'noancilla', relative: bool = False) -> Gate:
+        relative = relative and mode == 'relative-phase' and num_controls > 1
+        def build():
+            if relative:
+                return self.__relative_phase_mcx(num_controls)
+            if mode in ('v-chain', 'relative-phase') and num_controls > 2:
+                return self.wrap(synth_mcx_n_clean_m15(num_controls))
+            if mode == 'recursion' and num_controls > 4:
+                return self.wrap(synth_mcx_1_clean_b95(num_controls))
+            return XGate().control(num_controls)
+        return self.__memoized(('mcx', num_controls, mode, relative), build)
+
+    # Toffoli ladder of relative-phase Toffolis, the work qubits are computed and uncomputed around the target
+    def __relative_phase_mcx(self, num_controls: int) -> Gate:
+        target = num_controls
+        work = list(range(num_controls + 1, num_controls + 1 + mcx_work_qubits(num_controls, 'relative-phase')))
+        quantum_circuit = QuantumCircuit(num_controls + 1 + len(work), name=f'rmcx {num_controls}')
+        ladder = QuantumCircuit(quantum_circuit.num_qubits)
+        if work:
+            ladder.append(RCCXGate(), [0, 1, work[0]])
+            for i in range(2, num_controls - 1):
+                ladder.append(RCCXGate(), [i, work[i - 2], work[i - 1]])
+        quantum_circuit.compose(ladder, inplace=True)
+        last_controls = [num_controls - 1, work[-1]] if work else [0, 1]
+        quantum_circuit.append(RCCXGate(), last_controls + [target])
+        quantum_circuit.compose(ladder.inverse(), inplace=True)
+        return self.wrap(quantum_circuit)
+
+    # phase flip when all qubits are set, without controls it is a plain Z; always exact since the phase is the point
+    def multi_controlled_z(self, num_controls: int, mode: str = 'noancilla') -> Gate:
+        def build():
+            if num_controls == 0:
+                return ZGate()
+            # ZGate().control builds every synthesis of qiskit's mcx, the pending deprecated ones included
+            if num_controls <= 2:
+                return ZGate().control(num_controls)
+            mcx = self.multi_controlled_x(num_controls, mode)
+            quantum_circuit = QuantumCircuit(mcx.num_qubits, name=f'mcz {num_controls}')
+            quantum_circuit.h(num_controls)
+            quantum_circuit.append(mcx, range(mcx.num_qubits))
+            quantum_circuit.h(num_controls)
+            return self.wrap(quantum_circuit)
+        return self.__memoized(('mcz', num_controls, mode), build)
+
+    # maps the x-gates on the correct bits, given the number; the gate is its own inverse
+    def node_to_binary(self, bits: int, number: int) -> Gate:
+        def build():
+            quantum_circuit = QuantumCircuit(bits, name=f'Node {number} to Binary')
+            bitmask = 1
+            for qubit in range(bits):
+                if not (number & bitmask):
+                    quantum_circuit.x(qubit)
+                bitmask <<= 1 # shift bitmask left)
+            return self.wrap(quantum_circuit)
+        return self.__memoized(('node', bits, number), build)
+
+    # X on the target (qubit sum(widths)) when field i of the controls, little endian, holds values[i]
+    def pattern_check(self, widths: tuple[int, ...], values: tuple[int, ...], mode: str = 'noancilla') -> Gate:
+        def build():
+            mcx = self.multi_controlled_x(sum(widths), mode, relative=True)
+            quantum_circuit = QuantumCircuit(mcx.num_qubits, name=f'Pattern Check {values}')
+            encoders = []
+            offset = 0
+            for width, value in zip(widths, values):
+                if width:
+                    encoders.append((self.node_to_binary(width, value), range(offset, offset + width)))
+                offset += width
+            for gate, qubits in encoders:
+                quantum_circuit.append(gate, qubits)
+            quantum_circuit.append(mcx, range(mcx.num_qubits))
+            for gate, qubits in encoders:
+                quantum_circuit.append(gate, qubits)
+            return self.wrap(quantum_circuit)
+        return self.__memoized(('pattern', widths, values, mode), build)
+
+    @staticmethod
+    def __flip(quantum_circuit: QuantumCircuit, mask: int) -> None:
+        qubits = [qubit for qubit in range(mask.bit_length()) if mask >> qubit & 1]
+        if qubits:
+            quantum_circuit.x(qubits)
+
+    # position of a code in the reflected Gray code, neighbours in that order differ in few bits
+    @staticmethod
+    def __gray_rank(code: int) -> int:
+        rank = code
+        while code := code >> 1:
+            rank ^= code
+        return rank
+
+    # checks all the given (from, to) node pairs against the same ancilla. Instead of encoding and decoding the nodes
+    # around every check, the pairs run in Gray code order of their joint pattern and only the bits in which two
+    # neighbouring patterns differ are flipped between their checks, the uncompute of one check is the compute of the next
+    def edge_check_block(self, bits: int, pairs: tuple[tuple[int, int], ...], name: str = 'Edge Check Circuit', mode: str = 'noancilla') -> Gate:
+        def build():
+            mcx = self.multi_controlled_x(2 * bits, mode, relative=True)
+            quantum_circuit = QuantumCircuit(mcx.num_qubits, name=name)
+            ones = (1 << 2 * bits) - 1
+            patterns = sorted((from_node | to_node << bits for from_node, to_node in pairs), key=OracleGateLibrary.__gray_rank)
+            # qubits currently flipped, an X maps a 0 of the pattern onto the 1 the mcx waits for
+            flipped = 0
+            for pattern in patterns:
+                OracleGateLibrary.__flip(quantum_circuit, flipped ^ ones ^ pattern)
+                quantum_circuit.append(mcx, range(mcx.num_qubits))
+                flipped = ones ^ pattern
+            OracleGateLibrary.__flip(quantum_circuit, flipped)
+            return self.wrap(quantum_circuit)
+        return self.__memoized(('block', bits, pairs, name, mode), build)
+
+    # check if the nodes are equal 
+    def turn_back_check(self, bits: int, last_id: int, mode: str = 'noancilla') -> Gate:
+        def build():
+            ancilla_index = number_of_qubits_for_three_nodes = 3 * bits
+            different_mcx = self.multi_controlled_x(bits, mode, relative=True)
+            last_mcx = self.multi_controlled_x(2 * bits, mode, relative=True)
+            work = list(range(ancilla_index + 1, ancilla_index + 1 + max(different_mcx.num_qubits - bits, last_mcx.num_qubits - 2 * bits) - 1))
+            circ = QuantumCircuit(ancilla_index + 1 + len(work), name='Turn Back Check')
+
+            # first check: two nodes are different
+            different_nodes_check_circuit = QuantumCircuit(number_of_qubits_for_three_nodes, name='Different Nodes Check')
+            for i in range(bits):
+                different_nodes_check_circuit.cx(i, i + 2 * bits)
+                different_nodes_check_circuit.x(i + 2 * bits)
+            different_nodes_check = self.wrap(different_nodes_check_circuit)
+
+            circ.append(different_nodes_check, range(number_of_qubits_for_three_nodes))
+            circ.append(different_mcx, list(range(2 * bits, ancilla_index + 1)) + work[:different_mcx.num_qubits - bits - 1])
+            circ.x(ancilla_index)
+            circ.append(different_nodes_check.inverse(), range(number_of_qubits_for_three_nodes))
+
+            # second check: first node is equal to the last node
+            last_node = self.node_to_binary(bits, last_id)
+            circ.append(last_node, range(bits))
+            circ.append(last_node, range(bits, 2 * bits))
+            circ.append(last_mcx, list(range(2 * bits)) + [ancilla_index] + work[:last_mcx.num_qubits - 2 * bits - 1])
+            circ.append(last_node, range(bits, 2 * bits))
+            circ.append(last_node, range(bits))
+            return self.wrap(circ)
+        return self.__memoized(('turn back', bits, last_id, mode), build)
+
+# default library of the oracles and circuits not given their own
+SHARED_GATE_LIBRARY = OracleGateLibrary()
+
 class MazeOracle(QuantumCircuit):
-    def __init__(self, maze_circuit_info: MazeCircuitInfo, turn_back_check: bool = False):
+    def __init__(self, maze_circuit_info: MazeCircuitInfo, turn_back_check: bool = None, gate_library: OracleGateLibrary = None):
+        if turn_back_check is not None and turn_back_check != maze_circuit_info.turn_back_check:
+            maze_circuit_info = MazeCircuitInfo(maze_circuit_info.graph, maze_circuit_info.max_path_length, turn_back_check, maze_circuit_info.number_of_solutions, maze_circuit_info.iterations,
+                                                maze_circuit_info.mcx_mode)
         self.__maze_circuit_info = maze_circuit_info
-        self.__turn_back_check = turn_back_check
-        self.__num_ancillas = self.__maze_circuit_info.max_path_length
-        if turn_back_check:
-            self.__num_ancillas += self.__maze_circuit_info.max_path_length - 1
-        self.__total_size = self.__maze_circuit_info.num_qubits_in_max_path + self.__num_ancillas
+        self.__turn_back_check = maze_circuit_info.turn_back_check
+        self.__num_ancillas = maze_circuit_info.num_ancillas
+        self.__mcx_mode = maze_circuit_info.mcx_mode
+        self.__total_size = self.__maze_circuit_info.total_qubits
+        self.__work_qubits = list(range(self.__maze_circuit_info.num_qubits_in_max_path + self.__num_ancillas, self.__total_size))
+        self.__gate_library = gate_library if gate_library is not None else SHARED_GATE_LIBRARY
         super().__init__(self.__total_size, name='Maze Oracle')
-        self.__generate()
-
-        
-    # maps the x-gates on the correct bits, given the number
-    def __node_to_binary(self, number):
-        number_of_qubits = self.__maze_circuit_info.bits_per_node
-        quantum_circuit = QuantumCircuit(number_of_qubits, name=f'Node {number} to Binary')
-        bitmask = 1
-        for qubit in range(number_of_qubits):
-            if not (number & bitmask):
-                quantum_circuit.x(qubit)
-            bitmask <<= 1 # shift bitmask left)
-        return quantum_circuit
-    
-    # encodes the nodes of an edge with their binary quantum circuit representation
-    def __encode_edge_nodes(self, from_node: int, to_node: int):
-        number_of_qubits_for_a_node = self.__maze_circuit_info.bits_per_node
-        number_of_qubits_for_two_nodes = 2 * number_of_qubits_for_a_node
-        quantum_circuit = QuantumCircuit(number_of_qubits_for_two_nodes, name=f'Edge Encoder {from_node} -> {to_node}')
-        quantum_circuit.append(self.__node_to_binary(from_node), range(number_of_qubits_for_a_node))
-        quantum_circuit.append(self.__node_to_binary(to_node), range(number_of_qubits_for_a_node, number_of_qubits_for_two_nodes))
-        return quantum_circuit
-
-    # checks if an edge is valid (input: pair of nodes, output: ancilla)
-    def __map_edge(self, from_node: int, to_node: int):
-        number_of_qubits_for_a_node = self.__maze_circuit_info.bits_per_node
-        ancilla_index = number_of_qubits_for_two_nodes = 2 * number_of_qubits_for_a_node
-        quantum_circuit = QuantumCircuit(number_of_qubits_for_two_nodes + 1, name=f'Edge Check {from_node} -> {to_node}')
-        edge_encoder_quantum_circuit = self.__encode_edge_nodes(from_node, to_node)
-              
-        quantum_circuit.append(edge_encoder_quantum_circuit, range(number_of_qubits_for_two_nodes))
-        quantum_circuit.append(XGate().control(number_of_qubits_for_two_nodes), list(range(number_of_qubits_for_two_nodes)) + [ancilla_index])
-        quantum_circuit.append(edge_encoder_quantum_circuit.inverse(), range(number_of_qubits_for_two_nodes))
-
-        return quantum_circuit
-       
-    # creates the circuit for all edges check, given a list of edges
-    def __generate_edge_check_circuit(self, edges: list[Edge]):
-        number_of_qubits_for_two_nodes = 2 * self.__maze_circuit_info.bits_per_node
-        total_size = number_of_qubits_for_two_nodes + 1
-        quantum_circuit = QuantumCircuit(total_size, name='Edge Check Circuit')
-        for e in edges:
-            quantum_circuit.append(self.__map_edge(e.start.id, e.end.id), range(total_size))
-            quantum_circuit.barrier()
-        return quantum_circuit
-    
-    # check if the nodes are equal 
-    def __generate_turn_back_check_circuit(self):
-        number_of_qubits_for_a_node = self.__maze_circuit_info.bits_per_node
-        ancilla_index = number_of_qubits_for_three_nodes = 3 * number_of_qubits_for_a_node
-        total_size = number_of_qubits_for_three_nodes + 1
-        circ = QuantumCircuit(total_size, name='Turn Back Check')
-
-        # first check: two nodes are different
-        different_nodes_check_circuit = QuantumCircuit(number_of_qubits_for_three_nodes, name='Different Nodes Check')
-        for i in range(number_of_qubits_for_a_node):
-            different_nodes_check_circuit.cx(i, i + 2 * number_of_qubits_for_a_node)
-            different_nodes_check_circuit.x(i + 2 * number_of_qubits_for_a_node)
-
-        circ.append(different_nodes_check_circuit, range(number_of_qubits_for_three_nodes))    
-        circ.append(XGate().control(number_of_qubits_for_a_node), range(2*number_of_qubits_for_a_node, total_size))
-        circ.x(ancilla_index)
-        circ.append(different_nodes_check_circuit.inverse(), range(number_of_qubits_for_three_nodes))    
-
-        circ.barrier()
-        # second check: first node is equal to the last node
-        last_id = self.__maze_circuit_info.graph.end.id
-        circ.append(self.__node_to_binary(last_id), range(number_of_qubits_for_a_node))
-        circ.append(self.__node_to_binary(last_id), range(number_of_qubits_for_a_node, 2*number_of_qubits_for_a_node))
-        circ.append(XGate().control(2*number_of_qubits_for_a_node), list(range(2*number_of_qubits_for_a_node)) + [ancilla_index])
-        circ.append(self.__node_to_binary(last_id), range(number_of_qubits_for_a_node, 2*number_of_qubits_for_a_node))
-        circ.append(self.__node_to_binary(last_id), range(number_of_qubits_for_a_node))
-
-        return circ
+        with maze_trace.span('oracle.generate', qubits=self.__total_size, mcx_mode=self.__mcx_mode) as span:
+            self.__generate()
+            if span:
+                span.set(library_gates=self.__gate_library.size)
+
+    # edge checks of a list of edges, each directed edge checked once
+    def __generate_edge_check_circuit(self, edges: list[Edge], name: str) -> Gate:
+        pairs = tuple(sorted({(e.start.id, e.end.id) for e in edges}))
+        return self.__gate_library.edge_check_block(self.__maze_circuit_info.bits_per_node, pairs, name, self.__mcx_mode)
+
+    # qubits of a library gate: its own qubits followed by as many work qubits as it takes
+    def __with_work_qubits(self, gate: Gate, qubits: list[int]) -> list[int]:
+        return qubits + self.__work_qubits[:gate.num_qubits - len(qubits)]
 
     def __generate(self):
         path_check = QuantumCircuit(self.__total_size, name='Path Check')
-        edges = list(self.__maze_circuit_info.graph.edges)
+        with maze_trace.span('oracle.edge_checks'):
+            edges = list(self.__maze_circuit_info.graph.edges)
 
-        # add self-cycle to last node (for termination)
-        edges.append(Edge(self.__maze_circuit_info.graph.end, self.__maze_circuit_info.graph.end))
-        last_edge_check  = self.__generate_edge_check_circuit(filter(lambda e: e.end == self.__maze_circuit_info.graph.end, edges))
-        last_edge_check.name = "Last Edge Check"
-        last_edge_check_ancilla = self.__maze_circuit_info.num_qubits_in_max_path + self.__maze_circuit_info.max_path_length - 1
-        path_check.append(last_edge_check, list(range(self.__maze_circuit_info.num_qubits_in_max_path - 2 * self.__maze_circuit_info.bits_per_node, self.__maze_circuit_info.num_qubits_in_max_path)) + [last_edge_check_ancilla])
+            # add self-cycle to last node (for termination)
+            edges.append(Edge(self.__maze_circuit_info.graph.end, self.__maze_circuit_info.graph.end))
+            if self.__maze_circuit_info.max_path_length == 1:
+                # a single step shares one ancilla, so it must go straight from the first node to the last one
+                single_edge_check = self.__generate_edge_check_circuit(filter(lambda e: e.start == self.__maze_circuit_info.graph.start and e.end == self.__maze_circuit_info.graph.end, edges), "Single Edge Check")
+                path_check.append(single_edge_check, self.__with_work_qubits(single_edge_check, list(range(2 * self.__maze_circuit_info.bits_per_node)) + [self.__maze_circuit_info.num_qubits_in_max_path]))
+            else:
+                last_edge_check  = self.__generate_edge_check_circuit(filter(lambda e: e.end == self.__maze_circuit_info.graph.end, edges), "Last Edge Check")
+                last_edge_check_ancilla = self.__maze_circuit_info.num_qubits_in_max_path + self.__maze_circuit_info.max_path_length - 1
+                path_check.append(last_edge_check, self.__with_work_qubits(last_edge_check, list(range(self.__maze_circuit_info.num_qubits_in_max_path - 2 * self.__maze_circuit_info.bits_per_node, self.__maze_circuit_info.num_qubits_in_max_path)) + [last_edge_check_ancilla]))
 
-        first_edge_check = self.__generate_edge_check_circuit(filter(lambda e: e.start == self.__maze_circuit_info.graph.start, edges)) # only check edges containing the first node
-        first_edge_check.name = "First Edge Check"
-        first_edge_check_ancilla = self.__maze_circuit_info.num_qubits_in_max_path
-        path_check.append(first_edge_check, list(range(2 * self.__maze_circuit_info.bits_per_node)) + [first_edge_check_ancilla]) 
+                first_edge_check = self.__generate_edge_check_circuit(filter(lambda e: e.start == self.__maze_circuit_info.graph.start, edges), "First Edge Check") # only check edges containing the first node
+                first_edge_check_ancilla = self.__maze_circuit_info.num_qubits_in_max_path
+                path_check.append(first_edge_check, self.__with_work_qubits(first_edge_check, list(range(2 * self.__maze_circuit_info.bits_per_node)) + [first_edge_check_ancilla]))
 
-        full_edge_check_size = self.__maze_circuit_info.num_qubits_in_max_path + self.__maze_circuit_info.max_path_length
-        full_edge_check = QuantumCircuit(full_edge_check_size, name='Full Edge Check')
-        edge_check = self.__generate_edge_check_circuit(edges) # check all other edges
-        for s in range(1, self.__maze_circuit_info.max_path_length - 1):
-            start_qubit    = s * self.__maze_circuit_info.bits_per_node
-            full_edge_check.append(edge_check, list(range(start_qubit, start_qubit + 2 * self.__maze_circuit_info.bits_per_node)) + [self.__maze_circuit_info.num_qubits_in_max_path + s])
+            full_edge_check = QuantumCircuit(self.__total_size, name='Full Edge Check')
+            edge_check = self.__generate_edge_check_circuit(edges, "Edge Check Circuit") # check all other edges
+            for s in range(1, self.__maze_circuit_info.max_path_length - 1):
+                start_qubit    = s * self.__maze_circuit_info.bits_per_node
+                full_edge_check.append(edge_check, self.__with_work_qubits(edge_check, list(range(start_qubit, start_qubit + 2 * self.__maze_circuit_info.bits_per_node)) + [self.__maze_circuit_info.num_qubits_in_max_path + s]))
 
-        path_check.append(full_edge_check, range(full_edge_check_size))
+            path_check.append(OracleGateLibrary.wrap(full_edge_check), range(self.__total_size))
 
         if self.__turn_back_check:
-            full_turn_back_check_size = self.__maze_circuit_info.num_qubits_in_max_path + self.__maze_circuit_info.max_path_length - 1
-            full_turn_back_check = QuantumCircuit(full_turn_back_check_size, name='Full Turn Back Check')
-            turn_back_check = self.__generate_turn_back_check_circuit()
-            for s in range(1, self.__maze_circuit_info.max_path_length):
-                start_qubit    = s * self.__maze_circuit_info.bits_per_node
-                previous_qubit = (s-1) * self.__maze_circuit_info.bits_per_node
-                next_qubit     = (s+1) * self.__maze_circuit_info.bits_per_node
-                full_turn_back_check.append(turn_back_check, list(range(previous_qubit, next_qubit + self.__maze_circuit_info.bits_per_node)) + [self.__maze_circuit_info.num_qubits_in_max_path + s - 1])    
-            path_check.append(full_turn_back_check, list(range(self.__maze_circuit_info.num_qubits_in_max_path)) + list(range(self.__maze_circuit_info.num_qubits_in_max_path + self.__maze_circuit_info.max_path_length, self.__total_size)))
+            with maze_trace.span('oracle.turn_back_checks'):
+                full_turn_back_check = QuantumCircuit(self.__total_size, name='Full Turn Back Check')
+                turn_back_check = self.__gate_library.turn_back_check(self.__maze_circuit_info.bits_per_node, self.__maze_circuit_info.graph.end.id, self.__mcx_mode)
+                for s in range(1, self.__maze_circuit_info.max_path_length):
+                    previous_qubit = (s-1) * self.__maze_circuit_info.bits_per_node
+                    next_qubit     = (s+1) * self.__maze_circuit_info.bits_per_node
+                    turn_back_ancilla = self.__maze_circuit_info.num_qubits_in_max_path + self.__maze_circuit_info.max_path_length + s - 1
+                    full_turn_back_check.append(turn_back_check, self.__with_work_qubits(turn_back_check, list(range(previous_qubit, next_qubit + self.__maze_circuit_info.bits_per_node)) + [turn_back_ancilla]))
+                path_check.append(OracleGateLibrary.wrap(full_turn_back_check), range(self.__total_size))
 
-        self.append(path_check, range(self.__total_size))
-        self.append(ZGate().control(self.__num_ancillas - 1), range(self.__maze_circuit_info.num_qubits_in_max_path, self.__total_size))
-        self.append(path_check.inverse(), range(self.__total_size)) 
+        with maze_trace.span('oracle.phase_flip'):
+            path_check = OracleGateLibrary.wrap(path_check)
+            self.append(path_check, range(self.__total_size))
+            phase_flip = self.__gate_library.multi_controlled_z(self.__num_ancillas - 1, self.__mcx_mode)
+            ancillas = list(range(self.__maze_circuit_info.num_qubits_in_max_path, self.__maze_circuit_info.num_qubits_in_max_path + self.__num_ancillas))
+            self.append(phase_flip, self.__with_work_qubits(phase_flip, ancillas))
+            # every check xors a function of the path qubits onto an ancilla, so the path check is its own inverse;
+            # relative-phase Toffolis break that and need the actual inverse
+            self.append(path_check.inverse() if self.__mcx_mode == 'relative-phase' else path_check, range(self.__total_size))
+
+# position tracking oracle over the move register, see DirectionMazeCircuitInfo: every step looks up the next position
+# and the ok ancilla from the position and the move of the step, the ok ancillas of all steps drive the phase flip
+class DirectionMazeOracle(QuantumCircuit):
+    def __init__(self, maze_circuit_info: DirectionMazeCircuitInfo, gate_library: OracleGateLibrary = None):
+        self.__maze_circuit_info = info = maze_circuit_info
+        self.__gate_library = gate_library if gate_library is not None else SHARED_GATE_LIBRARY
+        self.__mcx_mode = info.mcx_mode
+        self.__work_qubits = list(range(info.num_qubits_in_max_path + info.num_ancillas, info.total_qubits))
+        super().__init__(info.total_qubits, name='Direction Maze Oracle')
+        with maze_trace.span('oracle.generate', qubits=info.total_qubits, mcx_mode=self.__mcx_mode, encoding='direction'):
+            steps = [OracleGateLibrary.wrap(self.__step(s)) for s in range(info.max_path_length)]
+            for step in steps:
+                self.append(step, range(info.total_qubits))
+            ok_ancillas = [info.ok_ancilla(s) for s in range(info.max_path_length)]
+            phase_flip = self.__gate_library.multi_controlled_z(len(ok_ancillas) - 1, self.__mcx_mode)
+            self.append(phase_flip, self.__with_work_qubits(phase_flip, ok_ancillas))
+            # a step only writes registers later steps read, so each step is its own inverse but they are undone in reverse;
+            # relative-phase Toffolis need the actual inverse
+            for step in reversed(steps):
+                self.append(step.inverse() if self.__mcx_mode == 'relative-phase' else step, range(info.total_qubits))
+
+    def __with_work_qubits(self, gate: Gate, qubits: list[int]) -> list[int]:
+        return qubits + self.__work_qubits[:gate.num_qubits - len(qubits)]
+
+    # lookup entries and turn backs of one step; an entry writing a position computes its match on the lookup ancilla,
+    # copies it and uncomputes it, a plain match is its own inverse up to the relative phases the uncompute undoes
+    def __step(self, s: int) -> QuantumCircuit:
+        info = self.__maze_circuit_info
+        step = QuantumCircuit(info.total_qubits, name=f'Step {s} Lookup')
+        position = list(range(info.position_offset(s), info.position_offset(s) + info.position_bits(s)))
+        move = [2 * s, 2 * s + 1]
+        ok = info.ok_ancilla(s)
+        for i, m, following in info.transitions[s]:
+            check = self.__gate_library.pattern_check((len(position), 2), (i, m), self.__mcx_mode)
+            if not following:
+                step.append(check, self.__with_work_qubits(check, position + move + [ok]))
+                continue
+            qubits = self.__with_work_qubits(check, position + move + [info.lookup_ancilla])
+            step.append(check, qubits)
+            step.cx(info.lookup_ancilla, ok)
+            offset = info.position_offset(s + 1)
+            for bit in range(info.position_bits(s + 1)):
+                if following >> bit & 1:
+                    step.cx(info.lookup_ancilla, offset + bit)
+            step.append(check, qubits)
+        for i, previous in info.turn_backs(s):
+            # the previous move followed by its opposite, read from both move registers as one 4-bit field
+            check = self.__gate_library.pattern_check((len(position), 4), (i, previous | opposite_move(previous) << 2), self.__mcx_mode)
+            step.append(check, self.__with_work_qubits(check, position + list(range(2 * s - 2, 2 * s + 2)) + [ok]))
+        return step
 
 class QuantumMazeCircuit(Graph, QuantumCircuit):
-    def __init__(self, graph: Graph, max_path_length: int = None, turn_back_check: bool = False, number_of_solutions: int = 1):
-        self.__info = MazeCircuitInfo(graph, max_path_length)
-        oracle = MazeOracle(self.__info, turn_back_check)
-        grover_operator = GroverDiffusionOperator(self.info.num_qubits_in_max_path)
-        
-        grover_iteration_circuit = QuantumCircuit(len(oracle.qubits), name='Grover Iteration')
-        grover_iteration_circuit.append(oracle, range(len(oracle.qubits)))  
-        grover_iteration_circuit.append(grover_operator, range(self.info.num_qubits_in_max_path))
-
-        QuantumCircuit.__init__(self, len(oracle.qubits), self.info.num_qubits_in_max_path) # init quantum circuit
-        self.name = 'Maze Solver'
-        
-        iterations = int(np.ceil((np.pi / 4) * np.sqrt((2 ** self.info.num_qubits_in_max_path) / number_of_solutions )))
-        for i in range(self.info.num_qubits_in_max_path):
-            self.h(i)
-
-        for i in range(iterations):
-            self.barrier()
-            self.append(grover_iteration_circuit, range(len(oracle.qubits)))  
-
-    @property
-    def info(self) -> int:
+    ENCODINGS = ('node', 'direction')
+
+    def __init__(self, graph: Graph, max_path_length: int = None, turn_back_check: bool = False, number_of_solutions: int = 1,
+                 encoding: str = 'node', iterations: int = None, mcx_mode: str = 'noancilla', gate_library: OracleGateLibrary = None):
+        if encoding not in QuantumMazeCircuit.ENCODINGS:
+            raise ValueError(f"Unknown encoding {encoding}, expected one of {QuantumMazeCircuit.ENCODINGS}")
+        if encoding == 'direction':
+            self.__info = DirectionMazeCircuitInfo(graph, max_path_length, turn_back_check, number_of_solutions, iterations, mcx_mode)
+        else:
+            self.__info = MazeCircuitInfo(graph, max_path_length, turn_back_check, number_of_solutions, iterations, mcx_mode)
+        with maze_trace.span('circuit.build', encoding=encoding, mcx_mode=mcx_mode, qubits=self.__info.total_qubits,
+                             iterations=self.__info.iterations) as span:
+            # wrapped once, appending the circuit itself would deep copy it on every iteration
+            with maze_trace.span('circuit.grover_iteration'):
+                grover_iteration_circuit = OracleGateLibrary.wrap(QuantumMazeCircuit.grover_iteration(self.__info, gate_library))
+
+            with maze_trace.span('circuit.assemble'):
+                QuantumCircuit.__init__(self, self.info.total_qubits, self.info.num_qubits_in_max_path) # init quantum circuit
+                self.name = 'Maze Solver'
+
+                for i in range(self.info.num_qubits_in_max_path):
+                    self.h(i)
+
+                for i in range(self.info.iterations):
+                    self.barrier()
+                    self.append(grover_iteration_circuit, range(self.info.total_qubits))
+            if span:
+                span.set(size=self.size(), depth=self.depth())
+
+    @property
+    def info(self) -> MazeCircuitInfo:
         return self.__info
+
+    # one oracle call followed by the diffuser, over the path, ancilla and work qubits
+    @staticmethod
+    def grover_iteration(maze_circuit_info: MazeCircuitInfo, gate_library: OracleGateLibrary = None) -> QuantumCircuit:
+        info = maze_circuit_info
+        if info.encoding == 'direction':
+            oracle = DirectionMazeOracle(info, gate_library)
+        else:
+            oracle = MazeOracle(info, gate_library=gate_library)
+        grover_operator = GroverDiffusionOperator(info.num_qubits_in_max_path, info.mcx_mode, gate_library)
+        # ancillas are back to zero after the oracle, so the diffuser uses them ahead of the work qubits
+        work_qubits = list(range(info.num_qubits_in_max_path, info.total_qubits))
+
+        grover_iteration_circuit = QuantumCircuit(info.total_qubits, name='Grover Iteration')
+        grover_iteration_circuit.append(OracleGateLibrary.wrap(oracle), range(info.total_qubits))
+        grover_iteration_circuit.append(OracleGateLibrary.wrap(grover_operator), list(range(info.num_qubits_in_max_path)) + work_qubits[:grover_operator.num_qubits - info.num_qubits_in_max_path])
+        return grover_iteration_circuit
+    
+    @staticmethod
+    def from_info(maze_circuit_info: MazeCircuitInfo, gate_library: OracleGateLibrary = None) -> 'QuantumMazeCircuit':
+        info = maze_circuit_info
+        return QuantumMazeCircuit(info.graph, info.max_path_length, info.turn_back_check, info.number_of_solutions, info.encoding, info.iterations, info.mcx_mode,
+                                  gate_library)
     
     def __getattr__(self, name):
         return getattr(self.info.graph, name)
 
-
+# transpiled CX count and depth of one Grover iteration for every mcx mode, next to the totals over all iterations
+def mcx_mode_report(maze_circuit_info: MazeCircuitInfo, modes: tuple[str, ...] = MCX_MODES, basis_gates: tuple[str, ...] = ('cx', 'u'),
+                    optimization_level: int = 1) -> dict[str, dict]:
+    info = maze_circuit_info
+    report = {}
+    for mode in modes:
+        mode_info = type(info)(info.graph, info.max_path_length, info.turn_back_check, info.number_of_solutions, info.iterations, mode)
+        transpiled = transpile(QuantumMazeCircuit.grover_iteration(mode_info), basis_gates=list(basis_gates), optimization_level=optimization_level)
+        cx = transpiled.count_ops().get('cx', 0)
+        depth = transpiled.depth()
+        report[mode] = {
+            'num_qubits': mode_info.total_qubits,
+            'num_work_qubits': mode_info.num_work_qubits,
+            'cx_per_iteration': cx,
+            'depth_per_iteration': depth,
+            'cx': cx * mode_info.iterations,
+            'depth': depth * mode_info.iterations,
+        }
+    return report
@@ -0,0 +1,221 @@
+from abc import ABC, abstractmethod
+from collections import deque
+import heapq
+import numpy as np
+from maze.maze import Graph, Maze
+
+class Path(list[int]):
+    def __init__(self, l: list[int]):
+        super().__init__()
+        for e in l:
+            self.append(e)
+
+    def remove_cycles(self) -> 'Path':
+        p = Path([])
+        count = set()
+        for x in self:
+            if x in count:
+                g = p.pop()
+                while g != x:
+                    count.discard(g)
+                    g = p.pop()
+            p.append(x)
+            count.add(x)
+        return p
+
+    def __repr__(self):
+        if len(self) > 0:
+            s = [repr(e) for e in self]
+            return '[' + str.join(' -> ', s) + ']'
+        else:
+            return '[]'
+    def __hash__(self):
+        return hash(tuple(self))
+
+class SearchResult:
+    def __init__(self, path: Path | None, visited: int):
+        self.__path = path
+        self.__visited = visited
+
+    # None when the end node cannot be reached from the start node
+    @property
+    def path(self) -> Path | None:
+        return self.__path
+
+    @property
+    def found(self) -> bool:
+        return self.__path is not None
+
+    @property
+    def visited(self) -> int:
+        return self.__visited
+
+    def __repr__(self) -> str:
+        return f"SearchResult(path={self.path}, visited={self.visited})"
+
+class ClassicalSolver(ABC):
+    @abstractmethod
+    def search(self, graph: Graph) -> SearchResult:
+        pass
+
+    def solve(self, graph: Graph) -> Path | None:
+        return self.search(graph).path
+
+    @staticmethod
+    def _walk_back(parent: dict[int, int], node_id: int) -> list[int]:
+        path = []
+        while node_id is not None:
+            path.append(node_id)
+            node_id = parent[node_id]
+        return path
+
+class BFSSolver(ClassicalSolver):
+    def search(self, graph: Graph) -> SearchResult:
+        start = graph.start.id
+        end = graph.end.id
+        queue = deque([start])
+        parent = {start: None}
+
+        while queue and end not in parent:
+            current = queue.popleft()
+            for neighbor in graph.neighbor_ids(current):
+                if neighbor not in parent:
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+
+        if end not in parent:
+            return SearchResult(None, len(parent))
+        path = self._walk_back(parent, end)
+        path.reverse()
+        return SearchResult(Path(path), len(parent))
+
+class BidirectionalBFSSolver(ClassicalSolver):
+    def search(self, graph: Graph) -> SearchResult:
+        start = graph.start.id
+        end = graph.end.id
+        if start == end:
+            return SearchResult(Path([start]), 1)
+        # parent and distance of every node reached from each side
+        forward = {start: (None, 0)}
+        backward = {end: (None, 0)}
+        forward_frontier = [start]
+        backward_frontier = [end]
+        meeting = None
+
+        while forward_frontier and backward_frontier and meeting is None:
+            # expand a whole level of the smaller frontier
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, reached, other = forward_frontier, forward, backward
+            else:
+                frontier, reached, other = backward_frontier, backward, forward
+            next_frontier = []
+            best = None
+            for current in frontier:
+                distance = reached[current][1] + 1
+                for neighbor in graph.neighbor_ids(current):
+                    if neighbor in reached:
+                        continue
+                    reached[neighbor] = (current, distance)
+                    next_frontier.append(neighbor)
+                    if neighbor in other and (best is None or distance + other[neighbor][1] < best[0]):
+                        best = (distance + other[neighbor][1], neighbor)
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+            if best is not None:
+                meeting = best[1]
+
+        visited = len(forward.keys() | backward.keys())
+        if meeting is None:
+            return SearchResult(None, visited)
+        path = self._walk_back({n: p for n, (p, _) in forward.items()}, meeting)
+        path.reverse()
+        path.extend(self._walk_back({n: p for n, (p, _) in backward.items()}, meeting)[1:])
+        return SearchResult(Path(path), visited)
+
+class AStarSolver(ClassicalSolver):
+    # Manhattan distance on mazes, no heuristic (uniform cost search) on generic graphs
+    def __heuristic(self, graph: Graph):
+        if not isinstance(graph, Maze):
+            return lambda node_id: 0
+        width = graph.width
+        end_x, end_y = graph.end.x, graph.end.y
+        return lambda node_id: abs(node_id % width - end_x) + abs(node_id // width - end_y)
+
+    def search(self, graph: Graph) -> SearchResult:
+        start = graph.start.id
+        end = graph.end.id
+        heuristic = self.__heuristic(graph)
+        parent = {start: None}
+        cost = {start: 0}
+        closed = set()
+        counter = 0
+        heap = [(heuristic(start), counter, start)]
+
+        while heap:
+            _, _, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            if current == end:
+                break
+            closed.add(current)
+            for neighbor in graph.neighbor_ids(current):
+                new_cost = cost[current] + 1
+                if new_cost < cost.get(neighbor, new_cost + 1):
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = current
+                    counter += 1
+                    heapq.heappush(heap, (new_cost + heuristic(neighbor), counter, neighbor))
+
+        if end not in parent:
+            return SearchResult(None, len(parent))
+        path = self._walk_back(parent, end)
+        path.reverse()
+        return SearchResult(Path(path), len(parent))
+
+class FrontierBFSSolver(ClassicalSolver):
+    # expands the whole BFS frontier at once with array shifts over the maze walls
+    def search(self, graph: Graph) -> SearchResult:
+        if not isinstance(graph, Maze):
+            raise ValueError(f"{type(self).__name__} requires a Maze, got {type(graph).__name__}")
+        east_walls, south_walls = graph.walls()
+        east_open = ~east_walls[:, :-1]
+        south_open = ~south_walls[:-1, :]
+        distance = np.full((graph.height, graph.width), -1, dtype=np.int64)
+        frontier = np.zeros((graph.height, graph.width), dtype=bool)
+        start_x, start_y, end_x, end_y = graph.start.x, graph.start.y, graph.end.x, graph.end.y
+        frontier[start_y, start_x] = True
+        distance[start_y, start_x] = 0
+        step = 0
+
+        while frontier.any() and distance[end_y, end_x] < 0:
+            step += 1
+            reached = np.zeros_like(frontier)
+            reached[:, 1:] |= frontier[:, :-1] & east_open    # east
+            reached[:, :-1] |= frontier[:, 1:] & east_open    # west
+            reached[1:, :] |= frontier[:-1, :] & south_open   # south
+            reached[:-1, :] |= frontier[1:, :] & south_open   # north
+            frontier = reached & (distance < 0)
+            distance[frontier] = step
+
+        visited = int(np.count_nonzero(distance >= 0))
+        if distance[end_y, end_x] < 0:
+            return SearchResult(None, visited)
+
+        # walk back from the end, always stepping to a neighbor one step closer to the start
+        x, y = end_x, end_y
+        path = [y * graph.width + x]
+        while (x, y) != (start_x, start_y):
+            d = distance[y, x] - 1
+            if x > 0 and east_open[y, x - 1] and distance[y, x - 1] == d:
+                x -= 1
+            elif x < graph.width - 1 and east_open[y, x] and distance[y, x + 1] == d:
+                x += 1
+            elif y > 0 and south_open[y - 1, x] and distance[y - 1, x] == d:
+                y -= 1
+            else:
+                y += 1
+            path.append(y * graph.width + x)
+        path.reverse()
+        return SearchResult(Path(path), visited)
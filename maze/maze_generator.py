@@ -1,40 +1,62 @@
 from abc import ABC, abstractmethod
 import random
-from maze.maze import Maze, MazeCell
+import numpy as np
+from maze.maze import Maze, GridMaze
 
 class MazeGenerator(ABC):
-    def __init__(self):
-        pass
+    def __init__(self, compact: bool = False):
+        self.__compact = compact
+
+    # compact generators build GridMaze instances backed by wall arrays
+    @property
+    def compact(self) -> bool:
+        return self.__compact
+
+    def new_maze(self, width: int, height: int, start: tuple[int, int], end: tuple[int, int]) -> Maze:
+        if self.compact:
+            return GridMaze(width, height, start, end)
+        return Maze(width, height, start, end)
+
+    @staticmethod
+    def neighbor_ids(cell_id: int, width: int, height: int) -> list[int]:
+        y, x = divmod(cell_id, width)
+        result = []
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                result.append(ny * width + nx)
+        return result
 
     @abstractmethod
-    def generate_maze(self, width, height, seed = None) -> Maze:
+    def generate_maze(self, width: int, height: int, start: tuple[int, int] = (0, 0), end: tuple[int, int] = None, seed=None) -> Maze:
         pass
 
+    # every maze gets its own seed drawn from the batch seed, so maze i is reproducible on its own
+    def generate_batch(self, n: int, width: int, height: int, seed=None, start: tuple[int, int] = (0, 0), end: tuple[int, int] = None) -> list[Maze]:
+        return [self.generate_maze(width, height, start, end, maze_seed) for maze_seed in MazeGenerator.batch_seeds(n, seed)]
+
+    # seeds of the mazes of generate_batch, to store along with them
+    @staticmethod
+    def batch_seeds(n: int, seed=None) -> list[int]:
+        return np.random.SeedSequence(seed).generate_state(n, dtype=np.uint32).tolist()
+
 class PrimGenerator(MazeGenerator):
-    def generate_maze(self, width: int, height: int, start:tuple[int, int], end: tuple[int, int], seed=None) -> 'Maze':
-        random.seed(seed if seed else random.randint(0, 0xFFFFFFFF))
-        maze = Maze(width, height, start, end)
+    def generate_maze(self, width: int, height: int, start: tuple[int, int] = (0, 0), end: tuple[int, int] = None, seed=None) -> 'Maze':
+        rng = random.Random(seed)
+        maze = self.new_maze(width, height, start, end)
         visited: set[int] = set()
         frontier: list[tuple[int, int]] = []
 
         visited.add(maze.start.id)
 
-        def neighbor_ids(cell: MazeCell) -> list[int]:
-            directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-            result = []
-            for dx, dy in directions:
-                nx, ny = cell.x + dx, cell.y + dy
-                if 0 <= nx < maze.width and 0 <= ny < maze.height:
-                    nid = ny * maze.width + nx
-                    result.append(nid)
-            return result
-
-        for nid in neighbor_ids(maze.start):
+        for nid in self.neighbor_ids(maze.start.id, width, height):
             frontier.append((maze.start.id, nid))
 
         while frontier:
-            idx = random.randint(0, len(frontier) - 1)
-            from_id, to_id = frontier.pop(idx)
+            # swap the picked entry with the last one so removal is O(1)
+            idx = rng.randint(0, len(frontier) - 1)
+            frontier[idx], frontier[-1] = frontier[-1], frontier[idx]
+            from_id, to_id = frontier.pop()
 
             if to_id in visited:
                 continue
@@ -42,9 +64,61 @@ class PrimGenerator(MazeGenerator):
             maze.connect_nodes(from_id, to_id)
             visited.add(to_id)
 
-            to_cell = maze.node_by_id(to_id)
-            for nid in neighbor_ids(to_cell):
+            for nid in self.neighbor_ids(to_id, width, height):
                 if nid not in visited:
                     frontier.append((to_id, nid))
         return maze
 
+class KruskalGenerator(MazeGenerator):
+    def generate_maze(self, width: int, height: int, start: tuple[int, int] = (0, 0), end: tuple[int, int] = None, seed=None) -> 'Maze':
+        rng = np.random.default_rng(seed)
+        maze = self.new_maze(width, height, start, end)
+        cells = np.arange(width * height).reshape(height, width)
+        # every interior wall as the pair of cells it separates, in random order
+        first = np.concatenate([cells[:, :-1].ravel(), cells[:-1, :].ravel()])
+        second = np.concatenate([cells[:, 1:].ravel(), cells[1:, :].ravel()])
+        order = rng.permutation(len(first))
+
+        parent = list(range(width * height))
+        size = [1] * (width * height)
+
+        def find(cell: int) -> int:
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        remaining = width * height - 1
+        for a, b in zip(first[order].tolist(), second[order].tolist()):
+            if remaining == 0:
+                break
+            root_a, root_b = find(a), find(b)
+            if root_a == root_b:
+                continue
+            if size[root_a] < size[root_b]:
+                root_a, root_b = root_b, root_a
+            parent[root_b] = root_a
+            size[root_a] += size[root_b]
+            maze.connect_nodes(a, b)
+            remaining -= 1
+        return maze
+
+class BacktrackerGenerator(MazeGenerator):
+    def generate_maze(self, width: int, height: int, start: tuple[int, int] = (0, 0), end: tuple[int, int] = None, seed=None) -> 'Maze':
+        rng = random.Random(seed)
+        maze = self.new_maze(width, height, start, end)
+        visited = bytearray(width * height)
+        stack = [maze.start.id]
+        visited[maze.start.id] = 1
+
+        while stack:
+            current = stack[-1]
+            candidates = [nid for nid in self.neighbor_ids(current, width, height) if not visited[nid]]
+            if not candidates:
+                stack.pop()
+                continue
+            nid = rng.choice(candidates)
+            maze.connect_nodes(current, nid)
+            visited[nid] = 1
+            stack.append(nid)
+        return maze
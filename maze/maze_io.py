@@ -0,0 +1,212 @@
+import itertools
+import mmap
+import struct
+from typing import Iterable, Iterator
+import numpy as np
+from maze.maze import Graph, Node, Maze, GridMaze
+
+# binary records, little endian, 8 byte aligned:
+#   header  magic 'QMZR', format version, kind, flags (bit 0: seed present), seed, six kind specific fields
+#   maze    fields width, height, start x, start y, end x, end y; then the east and south wall arrays, row major,
+#           packed 8 cells per byte with np.packbits(bitorder='little'), each padded to 8 bytes
+#   graph   fields node count, edge count, start index, end index; then the sorted node ids as int64 and the successors
+#           in CSR form: uint32 row offsets (node count + 1) and uint32 target indices (edge count), each padded to 8 bytes
+RECORD_MAGIC = b'QMZR'
+CORPUS_MAGIC = b'QMZC'
+FORMAT_VERSION = 1
+RECORD_HEADER = struct.Struct('<4sHBBq6I')
+# magic, corpus version, reserved, record count; the records follow and the record offsets (count + 1, relative to
+# the file start) close the file, so records can be written before their count is known
+CORPUS_VERSION = 2
+CORPUS_HEADER = struct.Struct('<4sHHQ')
+KINDS = ('maze', 'graph')
+HAS_SEED = 1
+
+def padded(size: int) -> int:
+    return (size + 7) & ~7
+
+class RecordHeader:
+    def __init__(self, kind: str, seed: int | None, fields: tuple[int, ...]):
+        self.__kind = kind
+        self.__seed = seed
+        self.__fields = fields
+
+    @property
+    def kind(self) -> str:
+        return self.__kind
+
+    # seed the maze was generated from, None when it was not recorded
+    @property
+    def seed(self) -> int | None:
+        return self.__seed
+
+    @property
+    def width(self) -> int | None:
+        return self.__fields[0] if self.__kind == 'maze' else None
+
+    @property
+    def height(self) -> int | None:
+        return self.__fields[1] if self.__kind == 'maze' else None
+
+    @property
+    def total_nodes(self) -> int:
+        return self.__fields[0] * self.__fields[1] if self.__kind == 'maze' else self.__fields[0]
+
+    @property
+    def fields(self) -> tuple[int, ...]:
+        return self.__fields
+
+    def __repr__(self) -> str:
+        return f"RecordHeader(kind={self.__kind}, seed={self.__seed}, fields={self.__fields})"
+
+def encode(graph: Graph, seed: int = None) -> bytes:
+    flags = HAS_SEED if seed is not None else 0
+    seed = seed if seed is not None else 0
+    if isinstance(graph, Maze):
+        east_walls, south_walls = graph.walls()
+        fields = (graph.width, graph.height, graph.start.x, graph.start.y, graph.end.x, graph.end.y)
+        parts = [RECORD_HEADER.pack(RECORD_MAGIC, FORMAT_VERSION, KINDS.index('maze'), flags, seed, *fields)]
+        for walls in (east_walls, south_walls):
+            parts.append(np.packbits(np.asarray(walls, dtype=bool).ravel(), bitorder='little').tobytes())
+    else:
+        node_ids = np.array(sorted(node.id for node in graph.nodes), dtype=np.int64)
+        index = {node_id: i for i, node_id in enumerate(node_ids.tolist())}
+        targets = [sorted(index[s.id] for s in graph.successors(node_id)) for node_id in node_ids.tolist()]
+        offsets = np.zeros(len(node_ids) + 1, dtype=np.uint32)
+        offsets[1:] = np.cumsum([len(t) for t in targets])
+        indices = np.array([i for t in targets for i in t], dtype=np.uint32)
+        fields = (len(node_ids), len(indices), index[graph.start.id], index[graph.end.id], 0, 0)
+        parts = [RECORD_HEADER.pack(RECORD_MAGIC, FORMAT_VERSION, KINDS.index('graph'), flags, seed, *fields)]
+        parts.extend(array.tobytes() for array in (node_ids, offsets, indices))
+    return b''.join(part.ljust(padded(len(part)), b'\0') for part in parts)
+
+def read_header(buffer) -> RecordHeader:
+    buffer = memoryview(buffer)
+    if len(buffer) < RECORD_HEADER.size:
+        raise ValueError("Buffer is too short for a maze record")
+    magic, version, kind, flags, seed, *fields = RECORD_HEADER.unpack_from(buffer)
+    if magic != RECORD_MAGIC:
+        raise ValueError(f"Not a maze record, magic {magic!r}")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported maze record version {version}, expected {FORMAT_VERSION}")
+    if kind >= len(KINDS):
+        raise ValueError(f"Unknown record kind {kind}")
+    return RecordHeader(KINDS[kind], seed if flags & HAS_SEED else None, tuple(fields))
+
+# the graph stored in the buffer, mazes come back as GridMaze; arrays are read straight from the buffer, so decoding
+# from a memory map only copies what the graph itself keeps
+def decode(buffer) -> Graph:
+    buffer = memoryview(buffer)
+    header = read_header(buffer)
+    position = RECORD_HEADER.size
+
+    def take(dtype, count: int) -> np.ndarray:
+        nonlocal position
+        array = np.frombuffer(buffer, dtype=dtype, count=count, offset=position)
+        position += padded(array.nbytes)
+        return array
+
+    if header.kind == 'maze':
+        width, height, start_x, start_y, end_x, end_y = header.fields
+        cells = width * height
+        walls = [np.unpackbits(take(np.uint8, (cells + 7) // 8), count=cells, bitorder='little').astype(bool).reshape(height, width)
+                 for _ in range(2)]
+        return GridMaze(width, height, (start_x, start_y), (end_x, end_y), *walls)
+
+    num_nodes, num_edges, start, end, _, _ = header.fields
+    node_ids = take(np.int64, num_nodes).tolist()
+    offsets = take(np.uint32, num_nodes + 1).tolist()
+    indices = take(np.uint32, num_edges).tolist()
+    nodes = [Node(node_id) for node_id in node_ids]
+    graph = Graph(nodes, nodes[start], nodes[end])
+    for i, node_id in enumerate(node_ids):
+        for j in indices[offsets[i]:offsets[i + 1]]:
+            graph.connect_nodes(node_id, node_ids[j])
+    return graph
+
+def save(path: str, graph: Graph, seed: int = None) -> None:
+    with open(path, 'wb') as f:
+        f.write(encode(graph, seed))
+
+def load(path: str) -> Graph:
+    with open(path, 'rb') as f:
+        return decode(f.read())
+
+# many records in one file, memory-mapped read only: processes opening the same corpus share its pages through the
+# page cache and only decode the records they index
+class MazeCorpus:
+    def __init__(self, path: str):
+        self.__path = path
+        with open(path, 'rb') as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count = CORPUS_HEADER.unpack_from(self.__map)
+        if magic != CORPUS_MAGIC:
+            raise ValueError(f"Not a maze corpus, magic {magic!r}")
+        if version != CORPUS_VERSION:
+            raise ValueError(f"Unsupported maze corpus version {version}, expected {CORPUS_VERSION}")
+        table = 8 * (count + 1)
+        self.__offsets = np.frombuffer(self.__map, dtype=np.uint64, count=count + 1, offset=len(self.__map) - table)
+
+    # writes the graphs, and the seed of each when given, as a corpus; every record is written as soon as the iterable
+    # yields its graph and the count in the header is filled in at the end
+    @staticmethod
+    def write(path: str, graphs: Iterable[Graph], seeds: Iterable[int] = None) -> int:
+        missing = object()
+        pairs = itertools.zip_longest(graphs, seeds, fillvalue=missing) if seeds is not None else ((graph, None) for graph in graphs)
+        offsets = [CORPUS_HEADER.size]
+        with open(path, 'wb') as f:
+            f.write(CORPUS_HEADER.pack(CORPUS_MAGIC, CORPUS_VERSION, 0, 0))
+            for graph, seed in pairs:
+                if graph is missing or seed is missing:
+                    raise ValueError(f"Expected as many seeds as graphs, they differ after {len(offsets) - 1}")
+                record = encode(graph, seed)
+                f.write(record)
+                offsets.append(offsets[-1] + len(record))
+            f.write(np.array(offsets, dtype=np.uint64).tobytes())
+            f.seek(0)
+            f.write(CORPUS_HEADER.pack(CORPUS_MAGIC, CORPUS_VERSION, 0, len(offsets) - 1))
+        return len(offsets) - 1
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    # bytes of the file
+    @property
+    def size(self) -> int:
+        return len(self.__map)
+
+    def __len__(self) -> int:
+        return len(self.__offsets) - 1
+
+    def __record(self, index: int) -> memoryview:
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Record {index} out of range for a corpus of {len(self)}")
+        index %= len(self)
+        return memoryview(self.__map)[int(self.__offsets[index]):int(self.__offsets[index + 1])]
+
+    def header(self, index: int) -> RecordHeader:
+        return read_header(self.__record(index))
+
+    def seed(self, index: int) -> int | None:
+        return self.header(index).seed
+
+    def __getitem__(self, index: int) -> Graph:
+        return decode(self.__record(index))
+
+    def __iter__(self) -> Iterator[Graph]:
+        return (self[i] for i in range(len(self)))
+
+    def close(self) -> None:
+        self.__offsets = None
+        self.__map.close()
+
+    def __enter__(self) -> 'MazeCorpus':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # worker processes get the path and map the file themselves
+    def __reduce__(self):
+        return MazeCorpus, (self.__path,)
@@ -0,0 +1,403 @@
+from collections import Counter
+import math
+import random
+import numpy as np
+from maze.maze import Edge, Maze
+
+# classical model of the bitstrings marked by MazeOracle, following the circuit gate by gate:
+# every step ancilla is flipped once per matching edge check and the turn back ancillas
+# compare the nodes around each step
+class MazeOracleModel:
+    def __init__(self, maze_circuit_info: 'MazeCircuitInfo'):
+        self.__info = maze_circuit_info
+        self.__mask = (1 << maze_circuit_info.bits_per_node) - 1
+        graph = maze_circuit_info.graph
+        edges = list(graph.edges)
+        edges.append(Edge(graph.end, graph.end))
+        length = maze_circuit_info.max_path_length
+        if length == 1:
+            self.__transitions = [self.__flipping_pairs(e for e in edges if e.start == graph.start and e.end == graph.end)]
+        else:
+            first = self.__flipping_pairs(e for e in edges if e.start == graph.start)
+            last = self.__flipping_pairs(e for e in edges if e.end == graph.end)
+            middle = self.__flipping_pairs(edges)
+            self.__transitions = [first] + [middle] * (length - 2) + [last]
+        self.__start = graph.start.id & self.__mask
+        self.__end = graph.end.id & self.__mask
+        self.__marked: list[tuple[int, ...]] = None
+        self.__completion_counts: list[dict[tuple[int, int], int]] = None
+        # allowed (node << bits_per_node | next node) keys per step, sorted for np.isin
+        self.__transition_keys = [np.array(sorted((a << maze_circuit_info.bits_per_node) | b for a, b in pairs), dtype=np.int64)
+                                  for pairs in self.__transitions]
+
+    # every directed edge is checked once; node ids are truncated to bits_per_node bits by the X gate pattern,
+    # so two edges that truncate to the same pair cancel out
+    def __flipping_pairs(self, edges) -> frozenset[tuple[int, int]]:
+        counts = Counter((a & self.__mask, b & self.__mask) for a, b in {(e.start.id, e.end.id) for e in edges})
+        return frozenset(pair for pair, count in counts.items() if count % 2)
+
+    @property
+    def info(self) -> 'MazeCircuitInfo':
+        return self.__info
+
+    # pairs (node at step s, node at step s + 1) that set the edge ancilla of step s
+    @property
+    def transitions(self) -> list[frozenset[tuple[int, int]]]:
+        return list(self.__transitions)
+
+    @property
+    def start(self) -> int:
+        return self.__start
+
+    @property
+    def end(self) -> int:
+        return self.__end
+
+    def turn_back_ok(self, previous: int, current: int, following: int) -> bool:
+        return (previous != following) != (previous == self.__end and current == self.__end)
+
+    def is_marked(self, path: list[int]) -> bool:
+        if len(path) != self.__info.num_nodes_in_max_path:
+            return False
+        if any((a, b) not in pairs for a, b, pairs in zip(path, path[1:], self.__transitions)):
+            return False
+        if self.__info.turn_back_check:
+            return all(self.turn_back_ok(*path[s - 1:s + 2]) for s in range(1, self.__info.max_path_length))
+        return True
+
+    # node -> sorted next nodes, per step
+    def __successors(self) -> list[dict[int, list[int]]]:
+        successors = []
+        for pairs in self.__transitions:
+            step = {}
+            for a, b in sorted(pairs):
+                step.setdefault(a, []).append(b)
+            successors.append(step)
+        return successors
+
+    # completions[s][(a, b)]: marked paths whose nodes s and s + 1 are a and b, counted from there to the end; a pair is
+    # the state the turn back check needs, so counting takes one pass over the pairs of every step instead of every path
+    def __completions(self) -> list[dict[tuple[int, int], int]]:
+        if self.__completion_counts is not None:
+            return self.__completion_counts
+        successors = self.__successors()
+        layers = [dict.fromkeys(self.__transitions[-1], 1)]
+        for s in range(len(successors) - 2, -1, -1):
+            after = layers[-1]
+            layer = {}
+            for a, b in self.__transitions[s]:
+                n = sum(after.get((b, c), 0) for c in successors[s + 1].get(b, [])
+                        if not self.__info.turn_back_check or self.turn_back_ok(a, b, c))
+                if n:
+                    layer[a, b] = n
+            layers.append(layer)
+        layers.reverse()
+        self.__completion_counts = layers
+        return layers
+
+    # number of marked paths, without listing them
+    def count_marked(self) -> int:
+        return sum(self.__completions()[0].values())
+
+    # most (previous, current) node pairs the marked paths pass through at one step
+    def max_frontier(self) -> int:
+        return max(map(len, self.__completions()), default=0)
+
+    # n marked paths drawn uniformly and independently, shape (n, num_nodes_in_max_path), without listing them
+    def sample_marked(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        layers = self.__completions()
+        # next node -> completions, per step and node
+        following = [{} for _ in layers]
+        for s, layer in enumerate(layers):
+            for (a, b), count in layer.items():
+                following[s].setdefault(a, []).append((b, count))
+        picker = random.Random(int(rng.integers(2 ** 63)))
+        samples = np.empty((n, self.__info.num_nodes_in_max_path), dtype=np.int64)
+        for i in range(n):
+            a, b = pick_weighted(list(layers[0].items()), picker)
+            path = [a, b]
+            for s in range(1, len(layers)):
+                choices = [(c, count) for c, count in following[s].get(b, [])
+                           if not self.__info.turn_back_check or self.turn_back_ok(a, b, c)]
+                a, b = b, pick_weighted(choices, picker)
+                path.append(b)
+            samples[i] = path
+        return samples
+
+    # every marked path register value, as tuples of node values from the first step to the last
+    def marked_paths(self) -> list[tuple[int, ...]]:
+        if self.__marked is not None:
+            return self.__marked
+        successors = self.__successors()
+
+        marked = []
+        turn_back_check = self.__info.turn_back_check
+        stack = [(a,) for a in sorted(successors[0], reverse=True)]
+        while stack:
+            path = stack.pop()
+            s = len(path) - 1
+            if s == len(successors):
+                marked.append(path)
+                continue
+            for b in reversed(successors[s].get(path[-1], [])):
+                if turn_back_check and s >= 1 and not self.turn_back_ok(path[-2], path[-1], b):
+                    continue
+                stack.append(path + (b,))
+        self.__marked = marked
+        return marked
+
+    def evaluate(self, samples) -> 'PathEvaluation':
+        nodes = unpack_register(self.__info, samples)
+        keys = (nodes[:, :-1] << self.__info.bits_per_node) | nodes[:, 1:]
+        edge_valid = np.empty(keys.shape, dtype=bool)
+        for s, allowed in enumerate(self.__transition_keys):
+            edge_valid[:, s] = np.isin(keys[:, s], allowed)
+        previous, current, following = nodes[:, :-2], nodes[:, 1:-1], nodes[:, 2:]
+        turn_back_valid = (previous != following) ^ ((previous == self.__end) & (current == self.__end))
+        valid = edge_valid.all(axis=1)
+        if self.__info.turn_back_check:
+            valid &= turn_back_valid.all(axis=1)
+        return PathEvaluation(nodes, edge_valid, turn_back_valid, nodes[:, 0] == self.__start, nodes[:, -1] == self.__end, valid)
+
+# one of the (choice, weight) pairs with probability proportional to its weight; the weights are exact integers
+def pick_weighted(choices: list[tuple[object, int]], picker: random.Random):
+    r = picker.randrange(sum(weight for _, weight in choices))
+    for choice, weight in choices:
+        r -= weight
+        if r < 0:
+            return choice
+
+# accepts the measured register values as integers (clbit i is bit i) or already split into one value per register symbol
+def unpack_register(maze_circuit_info: 'MazeCircuitInfo', samples) -> np.ndarray:
+    samples = np.asarray(samples)
+    if samples.ndim == 2:
+        return samples.astype(np.int64)
+    if maze_circuit_info.num_qubits_in_max_path > 64:
+        raise ValueError(f"{maze_circuit_info.num_qubits_in_max_path} qubit registers do not fit a packed integer, pass symbol values instead")
+    bits = maze_circuit_info.bits_per_symbol
+    shifts = np.arange(maze_circuit_info.register_width, dtype=np.uint64) * np.uint64(bits)
+    return ((samples.astype(np.uint64)[:, None] >> shifts) & np.uint64((1 << bits) - 1)).astype(np.int64)
+
+# (dx, dy) of every move, opposite moves are two apart
+DIRECTION_MOVES = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+
+def opposite_move(move: int) -> int:
+    return (move + 2) % 4
+
+# classical model of DirectionMazeOracle: the register holds one move per step (see DIRECTION_MOVES),
+# a marked register walks from the start through open walls and reaches the end, after which every move must be 0
+class DirectionOracleModel:
+    def __init__(self, maze_circuit_info: 'MazeCircuitInfo'):
+        maze = maze_circuit_info.graph
+        if not isinstance(maze, Maze):
+            raise ValueError(f"Direction encoding requires a Maze, got {type(maze).__name__}")
+        self.__info = maze_circuit_info
+        self.__start = maze.start.id
+        self.__end = maze.end.id
+        # target cell of every move from every cell, -1 when a wall or the boundary is in the way
+        east_walls, south_walls = maze.walls()
+        width, height = maze.width, maze.height
+        cells = np.arange(width * height).reshape(height, width)
+        table = np.full((height, width, len(DIRECTION_MOVES)), -1, dtype=np.int64)
+        for move, (dx, dy) in enumerate(DIRECTION_MOVES):
+            if dx == 1:
+                table[:, :-1, move] = np.where(east_walls[:, :-1], -1, cells[:, 1:])
+            elif dx == -1:
+                table[:, 1:, move] = np.where(east_walls[:, :-1], -1, cells[:, :-1])
+            elif dy == 1:
+                table[:-1, :, move] = np.where(south_walls[:-1, :], -1, cells[1:, :])
+            else:
+                table[1:, :, move] = np.where(south_walls[:-1, :], -1, cells[:-1, :])
+        self.__moves = table.reshape(width * height, len(DIRECTION_MOVES))
+        self.__marked: list[tuple[int, ...]] = None
+        self.__completion_counts: list[dict[tuple[int, int], int]] = None
+
+    @property
+    def info(self) -> 'MazeCircuitInfo':
+        return self.__info
+
+    @property
+    def start(self) -> int:
+        return self.__start
+
+    @property
+    def end(self) -> int:
+        return self.__end
+
+    # target cell of every move from every cell, shape (cells, 4), -1 when a wall or the boundary is in the way
+    @property
+    def moves(self) -> np.ndarray:
+        return self.__moves
+
+    def is_marked(self, moves: list[int]) -> bool:
+        return bool(self.evaluate(np.array([moves], dtype=np.int64)).valid[0])
+
+    # completions[s][(cell, last move)]: marked move sequences that stand on cell after s moves, the last one given
+    # (-1 before the first move), counted from there on; a walk is complete once it reaches the end, so the end has no entry
+    def __completions(self) -> list[dict[tuple[int, int], int]]:
+        if self.__completion_counts is not None:
+            return self.__completion_counts
+        length = self.__info.max_path_length
+        # states reachable after every number of moves, walking forward from the start
+        reachable = [{(self.__start, -1)}]
+        for _ in range(length - 1):
+            reachable.append({(int(target), move) for cell, last in reachable[-1] for move, target in self.__next_cells(cell, last)
+                              if target != self.__end})
+        layers = [None] * length
+        after: dict[tuple[int, int], int] = {}
+        for s in range(length - 1, -1, -1):
+            layer = {}
+            for cell, last in reachable[s]:
+                n = sum(1 if target == self.__end else after.get((target, move), 0) for move, target in self.__next_cells(cell, last))
+                if n:
+                    layer[cell, last] = n
+            layers[s] = after = layer
+        self.__completion_counts = layers
+        return layers
+
+    # (move, target cell) of the moves out of a cell that the walls and the turn back check allow
+    def __next_cells(self, cell: int, last: int) -> list[tuple[int, int]]:
+        turn_back_check = self.__info.turn_back_check
+        return [(move, int(target)) for move, target in enumerate(self.__moves[cell])
+                if target >= 0 and not (turn_back_check and last >= 0 and move == opposite_move(last))]
+
+    # most (cell, last move) states the marked paths pass through at one step
+    def max_frontier(self) -> int:
+        return max(map(len, self.__completions()), default=0)
+
+    # number of marked move sequences, without listing them
+    def count_marked(self) -> int:
+        if self.__start == self.__end:
+            return 1
+        return self.__completions()[0].get((self.__start, -1), 0)
+
+    # n marked move sequences drawn uniformly and independently, shape (n, max_path_length), without listing them
+    def sample_marked(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        samples = np.zeros((n, self.__info.max_path_length), dtype=np.int64)
+        if self.__start == self.__end:
+            return samples
+        layers = self.__completions()
+        picker = random.Random(int(rng.integers(2 ** 63)))
+        for i in range(n):
+            cell, last = self.__start, -1
+            for s in range(len(layers)):
+                after = layers[s + 1] if s + 1 < len(layers) else {}
+                choices = [((move, target), 1 if target == self.__end else after.get((target, move), 0))
+                           for move, target in self.__next_cells(cell, last)]
+                last, cell = pick_weighted([choice for choice in choices if choice[1]], picker)
+                samples[i, s] = last
+                if cell == self.__end:
+                    break
+        return samples
+
+    # every marked move sequence, found by walking the maze from the start
+    def marked_paths(self) -> list[tuple[int, ...]]:
+        if self.__marked is not None:
+            return self.__marked
+        length = self.__info.max_path_length
+        turn_back_check = self.__info.turn_back_check
+        marked = []
+        stack = [((), self.__start)]
+        while stack:
+            moves, cell = stack.pop()
+            if cell == self.__end:
+                marked.append(moves + (0,) * (length - len(moves)))
+                continue
+            if len(moves) == length:
+                continue
+            for move in reversed(range(len(DIRECTION_MOVES))):
+                target = self.__moves[cell, move]
+                if target < 0 or (turn_back_check and moves and move == opposite_move(moves[-1])):
+                    continue
+                stack.append((moves + (move,), int(target)))
+        self.__marked = marked
+        return marked
+
+    # walks every shot at once; blocked moves leave the walker in place so decoded paths stay inside the maze
+    def evaluate(self, samples) -> 'PathEvaluation':
+        moves = unpack_register(self.__info, samples)
+        shots, length = moves.shape
+        cells = np.empty((shots, length + 1), dtype=np.int64)
+        cells[:, 0] = self.__start
+        edge_valid = np.empty((shots, length), dtype=bool)
+        turn_back_valid = np.ones((shots, max(0, length - 1)), dtype=bool)
+        for s in range(length):
+            position = cells[:, s]
+            at_end = position == self.__end
+            target = self.__moves[position, moves[:, s]]
+            edge_valid[:, s] = np.where(at_end, moves[:, s] == 0, target >= 0)
+            cells[:, s + 1] = np.where(at_end | (target < 0), position, target)
+            if s > 0:
+                turn_back_valid[:, s - 1] = at_end | (moves[:, s] != opposite_move(moves[:, s - 1]))
+        valid = edge_valid.all(axis=1) & (cells[:, -1] == self.__end)
+        if self.__info.turn_back_check:
+            valid &= turn_back_valid.all(axis=1)
+        return PathEvaluation(cells, edge_valid, turn_back_valid, cells[:, 0] == self.__start, cells[:, -1] == self.__end, valid)
+
+class PathEvaluation:
+    def __init__(self, nodes: np.ndarray, edge_valid: np.ndarray, turn_back_valid: np.ndarray,
+                 starts_at_start: np.ndarray, ends_at_end: np.ndarray, valid: np.ndarray):
+        self.__nodes = nodes
+        self.__edge_valid = edge_valid
+        self.__turn_back_valid = turn_back_valid
+        self.__starts_at_start = starts_at_start
+        self.__ends_at_end = ends_at_end
+        self.__valid = valid
+
+    # node values per shot, shape (shots, num_nodes_in_max_path)
+    @property
+    def nodes(self) -> np.ndarray:
+        return self.__nodes
+    # whether each step is an edge accepted by the oracle, shape (shots, max_path_length)
+    @property
+    def edge_valid(self) -> np.ndarray:
+        return self.__edge_valid
+    # whether each inner node passes the turn back rule, shape (shots, max_path_length - 1)
+    @property
+    def turn_back_valid(self) -> np.ndarray:
+        return self.__turn_back_valid
+    @property
+    def starts_at_start(self) -> np.ndarray:
+        return self.__starts_at_start
+    @property
+    def ends_at_end(self) -> np.ndarray:
+        return self.__ends_at_end
+    # whether each shot is a path marked by the oracle
+    @property
+    def valid(self) -> np.ndarray:
+        return self.__valid
+    @property
+    def shots(self) -> int:
+        return len(self.__valid)
+    @property
+    def num_valid(self) -> int:
+        return int(np.count_nonzero(self.__valid))
+    @property
+    def success_rate(self) -> float:
+        return self.num_valid / self.shots if self.shots else 0.0
+    @property
+    def standard_error(self) -> float:
+        if not self.shots:
+            return 0.0
+        return math.sqrt(self.success_rate * (1 - self.success_rate) / self.shots)
+
+    # Wilson score interval of the success probability
+    def confidence_interval(self, z: float = 1.96) -> tuple[float, float]:
+        if not self.shots:
+            return (0.0, 1.0)
+        p, n = self.success_rate, self.shots
+        center = (p + z * z / (2 * n)) / (1 + z * z / n)
+        half_width = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return (max(0.0, center - half_width), min(1.0, center + half_width))
+
+    # distinct valid paths with their number of shots, most frequent first
+    def valid_path_counts(self) -> list[tuple[tuple[int, ...], int]]:
+        if not self.num_valid:
+            return []
+        paths, counts = np.unique(self.__nodes[self.__valid], axis=0, return_counts=True)
+        order = np.argsort(-counts, kind='stable')
+        return [(tuple(paths[i].tolist()), int(counts[i])) for i in order]
+
+    def __repr__(self) -> str:
+        low, high = self.confidence_interval()
+        return f"PathEvaluation(shots={self.shots}, valid={self.num_valid}, success_rate={self.success_rate:.4f} [{low:.4f}, {high:.4f}])"
@@ -0,0 +1,116 @@
+from collections import deque
+from maze.maze import Graph, Node, Edge
+
+# graph with dead ends pruned and corridors of degree-2 nodes contracted into single edges,
+# nodes are relabelled 0..n-1 so the circuit needs as few bits per node as possible
+class ReducedGraph(Graph):
+    def __init__(self, original: Graph, labels: list[int], start: int, end: int, corridors: dict[tuple[int, int], list[int]]):
+        self.__original = original
+        self.__labels = list(labels)
+        self.__label_of = {node_id: label for label, node_id in enumerate(self.__labels)}
+        nodes = [Node(label) for label in range(len(self.__labels))]
+        self.__corridors = {(self.__label_of[a], self.__label_of[b]): list(corridor) for (a, b), corridor in corridors.items()}
+        edges = [Edge(nodes[a], nodes[b]) for a, b in self.__corridors]
+        super().__init__(nodes, nodes[self.__label_of[start]], nodes[self.__label_of[end]], edges)
+
+    @property
+    def original(self) -> Graph:
+        return self.__original
+
+    def original_id(self, label: int) -> int:
+        return self.__labels[label]
+
+    def label_of(self, node_id: int) -> int:
+        return self.__label_of[node_id]
+
+    # original nodes hidden inside the edge a -> b, in walking order
+    def corridor(self, a: int, b: int) -> list[int]:
+        return list(self.__corridors[(a, b)])
+
+    # number of original edges the edge a -> b stands for
+    def weight(self, a: int, b: int) -> int:
+        return len(self.__corridors[(a, b)]) + 1
+
+    # maps a path over labels back to original node ids, filling in the contracted corridors;
+    # labels that do not exist in the reduced graph become -1
+    def expand_path(self, path: list[int]) -> list[int]:
+        if not path:
+            return []
+        size = len(self.__labels)
+        expanded = [self.__labels[path[0]] if 0 <= path[0] < size else -1]
+        for a, b in zip(path, path[1:]):
+            expanded.extend(self.__corridors.get((a, b), []))
+            expanded.append(self.__labels[b] if 0 <= b < size else -1)
+        return expanded
+
+    @staticmethod
+    def reduce(graph: Graph, prune_dead_ends: bool = True, contract_corridors: bool = True) -> 'ReducedGraph':
+        start, end = graph.start.id, graph.end.id
+        keep = {start, end}
+        # directed edges with the original nodes they contract, and undirected adjacency
+        out_edges: dict[int, dict[int, list[int]]] = {node.id: {} for node in graph.nodes}
+        adjacency: dict[int, set[int]] = {node.id: set() for node in graph.nodes}
+        for edge in graph.edges:
+            a, b = edge.start.id, edge.end.id
+            if a == b:
+                continue
+            out_edges[a][b] = []
+            adjacency[a].add(b)
+            adjacency[b].add(a)
+
+        def remove(node_id: int) -> None:
+            for neighbor in adjacency.pop(node_id):
+                adjacency[neighbor].discard(node_id)
+                out_edges[neighbor].pop(node_id, None)
+            del out_edges[node_id]
+
+        if prune_dead_ends:
+            # nodes that cannot be reached from the start never appear on a path
+            reachable = {start}
+            queue = deque([start])
+            while queue:
+                for neighbor in adjacency[queue.popleft()]:
+                    if neighbor not in reachable:
+                        reachable.add(neighbor)
+                        queue.append(neighbor)
+            for node_id in [n for n in adjacency if n not in reachable and n not in keep]:
+                remove(node_id)
+
+            queue = deque(n for n, neighbors in adjacency.items() if len(neighbors) <= 1 and n not in keep)
+            while queue:
+                node_id = queue.popleft()
+                if node_id not in adjacency or len(adjacency[node_id]) > 1:
+                    continue
+                neighbors = list(adjacency[node_id])
+                remove(node_id)
+                queue.extend(n for n in neighbors if len(adjacency[n]) <= 1 and n not in keep)
+
+        if contract_corridors:
+            queue = deque(n for n, neighbors in adjacency.items() if len(neighbors) == 2 and n not in keep)
+            while queue:
+                node_id = queue.popleft()
+                if node_id not in adjacency or len(adjacency[node_id]) != 2:
+                    continue
+                u, w = adjacency[node_id]
+                shortcuts = []
+                for a, b in ((u, w), (w, u)):
+                    if node_id in out_edges[a] and b in out_edges[node_id]:
+                        corridor = out_edges[a][node_id] + [node_id] + out_edges[node_id][b]
+                        if b not in out_edges[a] or len(corridor) < len(out_edges[a][b]):
+                            shortcuts.append((a, b, corridor))
+                        else:
+                            shortcuts.append(None)
+                if not shortcuts:
+                    # no directed walk passes through this node
+                    continue
+                remove(node_id)
+                for shortcut in shortcuts:
+                    if shortcut is not None:
+                        a, b, corridor = shortcut
+                        out_edges[a][b] = corridor
+                adjacency[u].add(w)
+                adjacency[w].add(u)
+                queue.extend(n for n in (u, w) if len(adjacency[n]) == 2 and n not in keep)
+
+        corridors = {(a, b): corridor for a, targets in out_edges.items() for b, corridor in targets.items()}
+        return ReducedGraph(graph, sorted(adjacency), start, end, corridors)
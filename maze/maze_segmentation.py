@@ -0,0 +1,179 @@
+from collections import deque
+from maze.maze import Graph, Node, Edge
+from maze.maze_reduction import ReducedGraph
+
+# graph split into segments at waypoints every solution passes, so long paths can be searched piecewise:
+# every segment keeps only the nodes lying on a walk between its two waypoints that avoids the other waypoints,
+# and is reduced and relabelled on its own so its circuit needs as few qubits as possible.
+# Without explicit waypoints the graph is split at the articulation points separating start from end, as few of them as
+# keep every segment within max_segment_nodes; a segment still too large is split at the middle node of a shortest walk,
+# or cut down to the edge between its waypoints when they are neighbours
+class SegmentedGraph:
+    def __init__(self, graph: Graph, waypoints: list[int] = None, max_segment_nodes: int = None):
+        if max_segment_nodes is not None and max_segment_nodes < 2:
+            raise ValueError(f"max_segment_nodes must be at least 2, got {max_segment_nodes}")
+        self.__graph = graph
+        self.__successors = {node.id: [n.id for n in graph.successors(node.id) if n.id != node.id] for node in graph.nodes}
+        self.__predecessors: dict[int, list[int]] = {node_id: [] for node_id in self.__successors}
+        for node_id, successors in self.__successors.items():
+            for successor in successors:
+                self.__predecessors[successor].append(node_id)
+
+        start, end = graph.start.id, graph.end.id
+        if waypoints is not None:
+            for node_id in waypoints:
+                graph.node_by_id(node_id)
+            points = [start] + [node_id for node_id in waypoints if node_id not in (start, end)] + [end]
+            if len(set(points)) != len(points):
+                raise ValueError(f"Waypoints must be distinct, got {waypoints}")
+        else:
+            # a separator is only kept when skipping it would make the segment up to the next one too large
+            points = [start]
+            separators = SegmentedGraph.separators(graph)
+            for following, node_id in zip(separators[1:] + [end], separators):
+                if max_segment_nodes is None or self.__segment(points[-1], following, set()).total_nodes > max_segment_nodes:
+                    points.append(node_id)
+            if start != end:
+                points.append(end)
+
+        i = 0
+        segments: list[ReducedGraph] = []
+        while i < len(points) - 1:
+            a, b = points[i], points[i + 1]
+            blocked = set(points) - {a, b}
+            segment = self.__segment(a, b, blocked)
+            if max_segment_nodes is not None and segment.total_nodes > max_segment_nodes:
+                walk = self.__shortest_walk(self.__region(a, b, blocked), a, b)
+                if len(walk) > 2:
+                    points.insert(i + 1, walk[len(walk) // 2])
+                    continue
+                # neighbouring waypoints only keep their direct edge
+                segment = self.__build(set(walk) or {a, b}, a, b)
+            segments.append(segment)
+            i += 1
+        self.__waypoints = points
+        self.__segments = segments
+
+    @property
+    def graph(self) -> Graph:
+        return self.__graph
+
+    # start, the waypoints in visiting order, end
+    @property
+    def waypoints(self) -> list[int]:
+        return list(self.__waypoints)
+
+    # segment i leads from waypoint i to waypoint i + 1, its paths expand to node ids of the graph
+    @property
+    def segments(self) -> list[ReducedGraph]:
+        return list(self.__segments)
+
+    # joins one path per segment, each running between its waypoints, into a path over the whole graph;
+    # walks repeated through a waypoint or padded at a segment end are cut out
+    def stitch(self, paths: list[list[int]]) -> list[int]:
+        if len(paths) != len(self.__segments):
+            raise ValueError(f"Expected {len(self.__segments)} segment paths, got {len(paths)}")
+        stitched: list[int] = self.__waypoints[:1] if not paths else []
+        for path in paths:
+            stitched.extend(path[1:] if stitched and path and path[0] == stitched[-1] else path)
+        # walking back to a visited node closes a cycle, drop it
+        walk: list[int] = []
+        position: dict[int, int] = {}
+        for node_id in stitched:
+            if node_id in position:
+                for dropped in walk[position[node_id] + 1:]:
+                    del position[dropped]
+                del walk[position[node_id] + 1:]
+                continue
+            position[node_id] = len(walk)
+            walk.append(node_id)
+        return walk
+
+    # nodes other than start and end that lie on every path from start to end, in walking order; the direction of
+    # the edges is ignored, so on directed graphs this finds the undirected articulation points only
+    @staticmethod
+    def separators(graph: Graph) -> list[int]:
+        start, end = graph.start.id, graph.end.id
+        adjacency: dict[int, set[int]] = {node.id: set() for node in graph.nodes}
+        for node in graph.nodes:
+            for successor in graph.successors(node.id):
+                if successor.id != node.id:
+                    adjacency[node.id].add(successor.id)
+                    adjacency[successor.id].add(node.id)
+
+        # iterative depth first search from the start, low[n] is the earliest discovery time reachable from the subtree of n
+        discovery = {start: 0}
+        low = {start: 0}
+        parent = {start: None}
+        stack = [(start, iter(adjacency[start]))]
+        while stack:
+            node_id, neighbors = stack[-1]
+            for neighbor in neighbors:
+                if neighbor not in discovery:
+                    discovery[neighbor] = low[neighbor] = len(discovery)
+                    parent[neighbor] = node_id
+                    stack.append((neighbor, iter(adjacency[neighbor])))
+                    break
+                if neighbor != parent[node_id]:
+                    low[node_id] = min(low[node_id], discovery[neighbor])
+            else:
+                stack.pop()
+                if parent[node_id] is not None:
+                    low[parent[node_id]] = min(low[parent[node_id]], low[node_id])
+        if end not in discovery or start == end:
+            return []
+
+        # an ancestor of the end separates it from the start when the subtree holding the end cannot climb above it
+        cuts = []
+        child = end
+        while parent[child] != start:
+            node_id = parent[child]
+            if low[child] >= discovery[node_id]:
+                cuts.append(node_id)
+            child = node_id
+        return cuts[::-1]
+
+    # nodes on a walk from a to b that passes no blocked node
+    def __region(self, a: int, b: int, blocked: set[int]) -> set[int]:
+        forward = SegmentedGraph.__reach(self.__successors, a, blocked | {b})
+        backward = SegmentedGraph.__reach(self.__predecessors, b, blocked | {a})
+        return (forward & backward) | {a, b}
+
+    # nodes reachable from the source without passing a stop node, stop nodes included
+    @staticmethod
+    def __reach(adjacency: dict[int, list[int]], source: int, stops: set[int]) -> set[int]:
+        seen = {source}
+        queue = deque([source])
+        while queue:
+            node_id = queue.popleft()
+            for neighbor in adjacency[node_id]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    if neighbor not in stops:
+                        queue.append(neighbor)
+        return seen
+
+    def __segment(self, a: int, b: int, blocked: set[int]) -> ReducedGraph:
+        return self.__build(self.__region(a, b, blocked), a, b)
+
+    def __build(self, region: set[int], a: int, b: int) -> ReducedGraph:
+        nodes = {node_id: Node(node_id) for node_id in region}
+        edges = [Edge(nodes[u], nodes[v]) for u in region for v in self.__successors[u] if v in region and u != b and v != a]
+        return ReducedGraph.reduce(Graph(list(nodes.values()), nodes[a], nodes[b], edges))
+
+    # nodes of a shortest walk from a to b inside the region, in walking order, empty when b cannot be reached
+    def __shortest_walk(self, region: set[int], a: int, b: int) -> list[int]:
+        parent = {a: None}
+        queue = deque([a])
+        while queue and b not in parent:
+            node_id = queue.popleft()
+            for neighbor in self.__successors[node_id]:
+                if neighbor in region and neighbor not in parent:
+                    parent[neighbor] = node_id
+                    queue.append(neighbor)
+        if b not in parent:
+            return []
+        walk = [b]
+        while parent[walk[-1]] is not None:
+            walk.append(parent[walk[-1]])
+        return walk[::-1]
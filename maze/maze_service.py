@@ -0,0 +1,403 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, as_completed
+from multiprocessing.connection import wait
+from typing import Iterable, Iterator
+import numpy as np
+from maze.maze import Graph, Node, Maze, GridMaze
+from maze.maze_circuit import MazeCircuitInfo, DirectionMazeCircuitInfo
+from maze.maze_classical import Path, BFSSolver, BidirectionalBFSSolver, AStarSolver, FrontierBFSSolver
+from maze.maze_solver import QuantumMazeSolver
+from maze.maze_cache import CircuitCache
+from maze.maze_reduction import ReducedGraph
+
+# picklable description of a graph, mazes travel as their wall arrays, reduced graphs as their labels and corridors
+# (without the original graph) and any other graph as its node and edge ids
+class GraphSpec:
+    def __init__(self, graph: Graph):
+        if isinstance(graph, ReducedGraph):
+            labels = [graph.original_id(node.id) for node in sorted(graph.nodes, key=lambda node: node.id)]
+            corridors = {(labels[e.start.id], labels[e.end.id]): graph.corridor(e.start.id, e.end.id) for e in graph.edges}
+            self.__kind = 'reduced'
+            self.__data = (labels, labels[graph.start.id], labels[graph.end.id], corridors)
+        elif isinstance(graph, Maze):
+            east_walls, south_walls = graph.walls()
+            self.__kind = 'maze'
+            self.__data = (graph.width, graph.height, (graph.start.x, graph.start.y), (graph.end.x, graph.end.y),
+                           np.array(east_walls, dtype=bool), np.array(south_walls, dtype=bool))
+        else:
+            self.__kind = 'graph'
+            self.__data = (sorted(node.id for node in graph.nodes), sorted((e.start.id, e.end.id) for e in graph.edges),
+                           graph.start.id, graph.end.id)
+
+    @property
+    def kind(self) -> str:
+        return self.__kind
+
+    def build(self) -> Graph:
+        if self.__kind == 'maze':
+            width, height, start, end, east_walls, south_walls = self.__data
+            return GridMaze(width, height, start, end, east_walls, south_walls)
+        if self.__kind == 'reduced':
+            labels, start, end, corridors = self.__data
+            return ReducedGraph(None, labels, start, end, corridors)
+        node_ids, edges, start, end = self.__data
+        nodes = {node_id: Node(node_id) for node_id in node_ids}
+        graph = Graph(list(nodes.values()), nodes[start], nodes[end])
+        for e_start, e_end in edges:
+            graph.connect_nodes(e_start, e_end)
+        return graph
+
+class SolveJob:
+    CLASSICAL_SOLVERS = ('bfs', 'bidirectional', 'astar', 'frontier')
+    SOLVERS = CLASSICAL_SOLVERS + ('quantum',)
+    QUANTUM_OPTIONS = ('backend', 'max_path_length', 'turn_back_check', 'number_of_solutions', 'encoding', 'iterations', 'mcx_mode',
+                       'shots', 'seed')
+    __ids = itertools.count()
+
+    # timeout is in seconds and counts from the moment a worker picks the job up; the service enforces it from the parent
+    def __init__(self, graph: Graph | GraphSpec, solver: str = 'bfs', timeout: float = None, options: dict = None, job_id=None):
+        if solver not in SolveJob.SOLVERS:
+            raise ValueError(f"Unknown solver {solver}, expected one of {SolveJob.SOLVERS}")
+        options = dict(options or {})
+        allowed = SolveJob.QUANTUM_OPTIONS if solver == 'quantum' else ()
+        unknown = [name for name in options if name not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown options {unknown} for solver {solver}, expected some of {allowed}")
+        self.__graph = graph if isinstance(graph, GraphSpec) else GraphSpec(graph)
+        self.__solver = solver
+        self.__timeout = timeout
+        self.__options = options
+        self.__job_id = job_id if job_id is not None else next(SolveJob.__ids)
+
+    # quantum job running the circuit described by the info
+    @staticmethod
+    def quantum(maze_circuit_info: MazeCircuitInfo, shots: int = 1, seed: int = None, backend: str = 'aer', timeout: float = None,
+                job_id=None) -> 'SolveJob':
+        info = maze_circuit_info
+        options = {
+            'backend': backend,
+            'max_path_length': info.max_path_length,
+            'turn_back_check': info.turn_back_check,
+            'number_of_solutions': info.number_of_solutions,
+            'encoding': info.encoding,
+            'iterations': info.iterations,
+            'mcx_mode': info.mcx_mode,
+            'shots': shots,
+            'seed': seed,
+        }
+        return SolveJob(info.graph, 'quantum', timeout, options, job_id)
+
+    @property
+    def graph(self) -> GraphSpec:
+        return self.__graph
+
+    @property
+    def solver(self) -> str:
+        return self.__solver
+
+    @property
+    def timeout(self) -> float | None:
+        return self.__timeout
+
+    @property
+    def options(self) -> dict:
+        return dict(self.__options)
+
+    @property
+    def job_id(self):
+        return self.__job_id
+
+class JobResult:
+    STATUSES = ('done', 'timeout', 'cancelled', 'error')
+
+    def __init__(self, job_id, solver: str, status: str, paths: list[Path], elapsed: float, error: str = None):
+        self.__job_id = job_id
+        self.__solver = solver
+        self.__status = status
+        self.__paths = paths
+        self.__elapsed = elapsed
+        self.__error = error
+
+    @property
+    def job_id(self):
+        return self.__job_id
+
+    @property
+    def solver(self) -> str:
+        return self.__solver
+
+    @property
+    def status(self) -> str:
+        return self.__status
+
+    @property
+    def ok(self) -> bool:
+        return self.__status == 'done'
+
+    # one path for the classical solvers (none when the end is unreachable), one per shot for the quantum solver
+    @property
+    def paths(self) -> list[Path]:
+        return list(self.__paths)
+
+    @property
+    def path(self) -> Path | None:
+        return self.__paths[0] if self.__paths else None
+
+    # seconds spent in the worker
+    @property
+    def elapsed(self) -> float:
+        return self.__elapsed
+
+    @property
+    def error(self) -> str | None:
+        return self.__error
+
+    def __repr__(self) -> str:
+        detail = f", error={self.__error}" if self.__error else ""
+        return f"JobResult(job_id={self.__job_id!r}, solver={self.__solver}, status={self.__status}, paths={len(self.__paths)}, elapsed={self.__elapsed:.3f}s{detail})"
+
+# state of one worker process: classical solvers, and quantum solvers sharing a warm simulator and circuit cache
+class SolveWorker:
+    def __init__(self, cache_capacity: int = 32, cache_directory: str = None, simulator_options: dict = None):
+        cache = CircuitCache(cache_capacity, cache_directory)
+        self.__quantum = {backend: QuantumMazeSolver(backend, cache, simulator_options) for backend in QuantumMazeSolver.BACKENDS}
+        self.__quantum['aer'].warm_up() # create the simulators now rather than on the first job
+        self.__classical = {
+            'bfs': BFSSolver(),
+            'bidirectional': BidirectionalBFSSolver(),
+            'astar': AStarSolver(),
+            'frontier': FrontierBFSSolver(),
+        }
+
+    def run(self, job: SolveJob) -> JobResult:
+        started = time.perf_counter()
+        try:
+            paths = self.__solve(job)
+            return JobResult(job.job_id, job.solver, 'done', paths, time.perf_counter() - started)
+        except Exception as e:
+            return JobResult(job.job_id, job.solver, 'error', [], time.perf_counter() - started, repr(e))
+
+    # paths over a reduced graph come back in the node ids of its original graph, the quantum solver decodes them so itself
+    def __solve(self, job: SolveJob) -> list[Path]:
+        graph = job.graph.build()
+        if job.solver != 'quantum':
+            path = self.__classical[job.solver].solve(graph)
+            if path is not None and isinstance(graph, ReducedGraph):
+                path = Path(graph.expand_path(path))
+            return [path] if path is not None else []
+        options = job.options
+        solver = self.__quantum[options.pop('backend', 'aer')]
+        shots = options.pop('shots', 1)
+        seed = options.pop('seed', None)
+        info_type = DirectionMazeCircuitInfo if options.pop('encoding', 'node') == 'direction' else MazeCircuitInfo
+        return solver.run(info_type(graph, **options), shots, seed)
+
+# worker of the current worker process, set up once when the process starts
+worker: SolveWorker = None
+
+def init_worker(cache_capacity: int, cache_directory: str, simulator_options: dict) -> None:
+    global worker
+    worker = SolveWorker(cache_capacity, cache_directory, simulator_options)
+
+def run_job(job: SolveJob) -> JobResult:
+    return worker.run(job)
+
+# main loop of a worker process: solves the jobs received on the connection until it gets None or the parent goes away
+def serve(connection, cache_capacity: int, cache_directory: str, simulator_options: dict) -> None:
+    init_worker(cache_capacity, cache_directory, simulator_options)
+    try:
+        connection.send(None) # ready
+        while (job := connection.recv()) is not None:
+            connection.send(run_job(job))
+    except (EOFError, BrokenPipeError):
+        pass
+
+# one worker process seen from the parent. A simulation holds the worker inside Aer's native code, where no signal reaches
+# Python, so the parent waits for the result with the job's timeout and kills the process when it runs out or the job
+# is interrupted; the next job gets a fresh process
+class WorkerProcess:
+    def __init__(self, context, initargs: tuple):
+        self.__context = context
+        self.__initargs = initargs
+        self.__restarts = 0
+        self.__start()
+
+    def __start(self) -> None:
+        self.__connection, child = self.__context.Pipe()
+        self.__interrupts, self.__interrupter = self.__context.Pipe(duplex=False)
+        self.__process = self.__context.Process(target=serve, args=(child, *self.__initargs), daemon=True)
+        self.__process.start()
+        child.close()
+        self.__ready = False
+
+    # processes started after the first one
+    @property
+    def restarts(self) -> int:
+        return self.__restarts
+
+    @property
+    def pid(self) -> int:
+        return self.__process.pid
+
+    # the timeout starts once the process is set up, a process still starting does not count against the job
+    def run(self, job: SolveJob) -> JobResult:
+        if not self.__ready:
+            try:
+                self.__connection.recv()
+                self.__ready = True
+            except EOFError:
+                self.__process.join()
+                error = f"worker process exited with code {self.__process.exitcode} while starting"
+                self.__restart()
+                return JobResult(job.job_id, job.solver, 'error', [], 0.0, error)
+        started = time.perf_counter()
+        self.__connection.send(job)
+        ready = wait([self.__connection, self.__interrupts, self.__process.sentinel], job.timeout)
+        if self.__connection in ready:
+            try:
+                return self.__connection.recv()
+            except EOFError:
+                pass
+        if not ready:
+            status, error = 'timeout', f"exceeded {job.timeout} s"
+        elif self.__interrupts in ready:
+            status, error = 'cancelled', "interrupted"
+        else:
+            self.__process.join()
+            status, error = 'error', f"worker process exited with code {self.__process.exitcode}"
+        self.__restart()
+        return JobResult(job.job_id, job.solver, status, [], time.perf_counter() - started, error)
+
+    # makes the running job, if any, stop with status 'cancelled'
+    def interrupt(self) -> None:
+        self.__interrupter.send_bytes(b'')
+
+    # drops an interrupt that arrived after the job it was meant for had finished
+    def clear_interrupt(self) -> None:
+        while self.__interrupts.poll():
+            self.__interrupts.recv_bytes()
+
+    def __restart(self) -> None:
+        self.__kill()
+        self.__restarts += 1
+        self.__start()
+
+    def __kill(self) -> None:
+        self.__process.kill()
+        self.__process.join()
+        for connection in (self.__connection, self.__interrupts, self.__interrupter):
+            connection.close()
+
+    def close(self, timeout: float = 5) -> None:
+        try:
+            self.__connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.__process.join(timeout)
+        self.__kill()
+
+# fans classical and quantum jobs out over worker processes; every worker keeps its simulator and caches warm between jobs.
+# Every worker process has a dispatcher thread taking the next queued job, so a job's timeout starts when it leaves the queue
+class SolveService:
+    def __init__(self, max_workers: int = None, cache_capacity: int = 32, cache_directory: str = None, simulator_options: dict = None,
+                 mp_context=None):
+        max_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        # one simulator thread per worker unless asked otherwise, the workers already use every core
+        simulator_options = {'max_parallel_threads': 1, **(simulator_options or {})}
+        context = mp_context if mp_context is not None else multiprocessing.get_context()
+        self.__jobs: queue.SimpleQueue[tuple[SolveJob, Future] | None] = queue.SimpleQueue()
+        self.__running: dict[Future, WorkerProcess] = {}
+        self.__lock = threading.Lock()
+        self.__closed = False
+        self.__workers = [WorkerProcess(context, (cache_capacity, cache_directory, simulator_options)) for _ in range(max_workers)]
+        self.__dispatchers = [threading.Thread(target=self.__dispatch, args=(worker,), name=f'solve-dispatch-{i}', daemon=True)
+                              for i, worker in enumerate(self.__workers)]
+        for dispatcher in self.__dispatchers:
+            dispatcher.start()
+
+    @property
+    def workers(self) -> list[WorkerProcess]:
+        return list(self.__workers)
+
+    def submit(self, job: SolveJob) -> Future:
+        future = Future()
+        with self.__lock:
+            if self.__closed:
+                raise RuntimeError("The service is shut down")
+            self.__jobs.put((job, future))
+        return future
+
+    # drops a queued job or interrupts a running one, whose worker process is replaced; False once the job is done
+    def cancel(self, future: Future) -> bool:
+        if future.cancel():
+            return True
+        with self.__lock:
+            worker = self.__running.get(future)
+            if worker is None:
+                return False
+            worker.interrupt()
+            return True
+
+    # the future is registered before it turns running, a cancel seeing it running always finds its worker
+    def __dispatch(self, worker: WorkerProcess) -> None:
+        while (item := self.__jobs.get()) is not None:
+            job, future = item
+            with self.__lock:
+                self.__running[future] = worker
+                if not future.set_running_or_notify_cancel():
+                    del self.__running[future]
+                    continue
+            try:
+                result = worker.run(job)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            finally:
+                with self.__lock:
+                    del self.__running[future]
+                    worker.clear_interrupt()
+            future.set_result(result)
+        worker.close()
+
+    # results in completion order
+    def solve_stream(self, jobs: Iterable[SolveJob]) -> Iterator[JobResult]:
+        futures = [self.submit(job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+    # results in job order
+    def solve_all(self, jobs: Iterable[SolveJob]) -> list[JobResult]:
+        futures = [self.submit(job) for job in jobs]
+        return [future.result() for future in futures]
+
+    # running jobs finish first, queued ones too unless cancel_futures
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        with self.__lock:
+            if not self.__closed:
+                self.__closed = True
+                if cancel_futures:
+                    while True:
+                        try:
+                            item = self.__jobs.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item is not None:
+                            item[1].cancel()
+                for _ in self.__dispatchers:
+                    self.__jobs.put(None)
+        if wait:
+            for dispatcher in self.__dispatchers:
+                dispatcher.join()
+
+    def __enter__(self) -> 'SolveService':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown(cancel_futures=exc_type is not None)
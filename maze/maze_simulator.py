@@ -0,0 +1,135 @@
+import logging
+import math
+import numpy as np
+from maze.maze_circuit import MazeCircuitInfo, mcx_cx_count
+from maze.maze_oracle_model import MazeOracleModel, DirectionOracleModel
+
+logger = logging.getLogger(__name__)
+
+# Grover search with the maze oracle only moves amplitude between the uniform superposition of the
+# marked paths and the one of the unmarked paths, so output probabilities follow from the number of
+# marked paths alone and shots can be sampled without simulating any qubit. The oracle model counts and
+# draws the marked paths step by step, they are never listed
+class AnalyticGroverSimulator:
+    def __init__(self, maze_circuit_info: MazeCircuitInfo):
+        self.__info = maze_circuit_info
+        self.__model = maze_circuit_info.oracle_model()
+        self.__num_marked = self.__model.count_marked()
+
+    @property
+    def info(self) -> MazeCircuitInfo:
+        return self.__info
+
+    @property
+    def model(self) -> MazeOracleModel | DirectionOracleModel:
+        return self.__model
+
+    @property
+    def num_marked(self) -> int:
+        return self.__num_marked
+
+    def success_probability(self, iterations: int = None) -> float:
+        if iterations is None:
+            iterations = self.__info.iterations
+        search_space = self.__info.num_qubits_in_max_path
+        if self.num_marked == 0:
+            return 0.0
+        if self.num_marked == 2 ** search_space:
+            return 1.0
+        theta = math.asin(math.sqrt(math.ldexp(self.num_marked, -search_space)))
+        return math.sin((2 * iterations + 1) * theta) ** 2
+
+    # register symbols of every shot, shape (shots, register_width), in path order
+    def sample(self, shots: int, iterations: int = None, seed=None) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+        width = self.__info.register_width
+        hits = int(rng.binomial(shots, self.success_probability(iterations)))
+        samples = np.empty((shots, width), dtype=np.int64)
+        if hits:
+            samples[:hits] = self.__model.sample_marked(hits, rng)
+
+        # unmarked shots are uniform over the unmarked registers: draw uniformly and redraw marked ones
+        pending = np.arange(hits, shots)
+        while len(pending):
+            samples[pending] = rng.integers(0, 2 ** self.__info.bits_per_symbol, size=(len(pending), width))
+            if not self.num_marked:
+                break
+            pending = pending[self.__model.evaluate(samples[pending]).valid]
+        return samples[rng.permutation(shots)]
+
+# memory footprint and gate mix of a maze circuit, used to pick the Aer simulation method able to run it
+class SimulationProfile:
+    METHODS = ('statevector', 'matrix_product_state', 'extended_stabilizer')
+    PRECISIONS = ('double', 'single')
+    # the extended stabilizer runtime grows exponentially with the non-Clifford gate count, past this it is hopeless
+    MAX_STABILIZER_NON_CLIFFORD = 64
+
+    def __init__(self, maze_circuit_info: MazeCircuitInfo):
+        self.__info = info = maze_circuit_info
+        self.__num_qubits = info.total_qubits
+        # between iterations the state is a mix of the uniform superposition and of the marked paths, across a cut of the
+        # register the marked ones differ by the states they pass through at the cut, bounded by the widest frontier of
+        # the oracle model. Inside the oracle only the ancilla of the step at the cut and the running multi-controlled
+        # gate act across it, each of them at most doubles the bond dimension
+        locality = 4 * (info.oracle_model().max_frontier() + 1)
+        self.__bond_dimension = min(2 ** (self.__num_qubits // 2), locality)
+
+        mode = info.mcx_mode
+        resources = info.estimate_resources()
+        gates = dict(resources.mcx_counts)
+        for k, n in resources.mcz_counts.items():
+            gates[k] = gates.get(k, 0) + n
+        self.__non_clifford = sum(SimulationProfile.__gate_non_clifford(k, mode) * n for k, n in gates.items())
+
+    # non-Clifford gates in the synthesis of a multi-controlled gate with k controls: 7 T gates per Toffoli of the
+    # v-chain ladders, roughly one rotation per CX of the synthesis without ancillas
+    @staticmethod
+    def __gate_non_clifford(num_controls: int, mode: str) -> int:
+        if num_controls < 2:
+            return 0
+        if num_controls == 2:
+            return 7
+        if mode in ('v-chain', 'relative-phase'):
+            return 7 * (2 * num_controls - 3)
+        return mcx_cx_count(num_controls, mode)
+
+    @property
+    def info(self) -> MazeCircuitInfo:
+        return self.__info
+
+    @property
+    def num_qubits(self) -> int:
+        return self.__num_qubits
+
+    @property
+    def bond_dimension(self) -> int:
+        return self.__bond_dimension
+
+    @property
+    def non_clifford(self) -> int:
+        return self.__non_clifford
+
+    def statevector_bytes(self, precision: str = 'double') -> int:
+        return 2 ** self.__num_qubits * (16 if precision == 'double' else 8)
+
+    # two complex matrices of bond_dimension x bond_dimension per qubit
+    def mps_bytes(self) -> int:
+        return self.__num_qubits * 2 * self.__bond_dimension ** 2 * 16
+
+    # (method, precision, reason): dense statevector while it fits the memory budget, in single precision if needed,
+    # then matrix product states, then the extended stabilizer when the circuit is almost Clifford. When nothing fits,
+    # matrix product states, whose bond dimension estimate is the loosest of the bounds
+    def select(self, max_memory_bytes: int) -> tuple[str, str, str]:
+        for precision in SimulationProfile.PRECISIONS:
+            if self.statevector_bytes(precision) <= max_memory_bytes:
+                return 'statevector', precision, f"{self.statevector_bytes(precision)} byte statevector fits"
+        if self.mps_bytes() <= max_memory_bytes:
+            return 'matrix_product_state', 'double', f"statevector too large, bond dimension ~{self.__bond_dimension}"
+        if self.__non_clifford <= SimulationProfile.MAX_STABILIZER_NON_CLIFFORD:
+            return 'extended_stabilizer', 'double', f"~{self.__non_clifford} non-Clifford gates"
+        reason = f"no method fits {max_memory_bytes} bytes, bond dimension ~{self.__bond_dimension}"
+        logger.warning("%r: %s, trying matrix_product_state", self, reason)
+        return 'matrix_product_state', 'double', reason
+
+    def __repr__(self) -> str:
+        return f"SimulationProfile(qubits={self.__num_qubits}, bond_dimension~{self.__bond_dimension}, non_clifford~{self.__non_clifford})"
@@ -1,83 +1,534 @@
-from qiskit import transpile
-from qiskit_aer import AerSimulator
-from maze.maze import Graph, Node, Maze
-from maze.maze_circuit import QuantumMazeCircuit
-
-class Path(list[int]):
-    def __init__(self, l: list[int]):
-        super().__init__()
-        for e in l:
-            self.append(e)
-
-    def remove_cycles(self) -> 'Path':
-        p = Path([])
-        count = set()
-        for x in self:
-            if x in count:
-                g = p.pop()
-                while g != x:
-                    count.discard(g)
-                    g = p.pop()
-            p.append(x)
-            count.add(x)
-        return p
-
-    def __repr__(self):
-        if len(self) > 0:
-            s = [repr(e) for e in self]
-            return '[' + str.join(' -> ', s) + ']'
-        else:
-            return '[]'
-    def __hash__(self):
-        return hash(repr(self))
+import logging
+import math
+import os
+import random
+from statistics import NormalDist
+from typing import TYPE_CHECKING, Callable
+import numpy as np
+from qiskit import QuantumCircuit, transpile
+from maze.maze import Graph
+from maze.maze_classical import Path, SearchResult, ClassicalSolver, BFSSolver, BidirectionalBFSSolver, AStarSolver, FrontierBFSSolver
+from maze.maze_circuit import QuantumMazeCircuit, MazeCircuitInfo, DirectionMazeCircuitInfo
+from maze.maze_simulator import AnalyticGroverSimulator, SimulationProfile
+from maze.maze_reduction import ReducedGraph
+from maze.maze_segmentation import SegmentedGraph
+from maze.maze_cache import CircuitCache
+from maze import maze_trace
+
+if TYPE_CHECKING:
+    from qiskit_aer import AerSimulator
+
+logger = logging.getLogger(__name__)
+
+# default memory budget of the simulation, half of the physical memory like Aer itself
+def default_memory_bytes() -> int:
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // 2
+    except (AttributeError, ValueError, OSError):
+        return 4 << 30
+
+# Aer job metadata worth tracing: method, threads and memory of the first experiment next to the totals of the job
+def simulation_metadata(result) -> dict:
+    job = result.metadata or {}
+    experiment = result.results[0].metadata if result.results else {}
+    return {
+        'method': experiment.get('method'),
+        'device': experiment.get('device'),
+        'parallel_experiments': job.get('parallel_experiments'),
+        'parallel_state_update': experiment.get('parallel_state_update'),
+        'parallel_shots': experiment.get('parallel_shots'),
+        'omp_enabled': job.get('omp_enabled'),
+        'max_memory_mb': job.get('max_memory_mb'),
+        'required_memory_mb': experiment.get('required_memory_mb'),
+        'fusion_applied': experiment.get('fusion', {}).get('applied'),
+        'aer_seconds': job.get('time_taken_execute'),
+    }
 
 class QuantumMazeSolver:
-    def __result_to_path(self, result: str, num_nodes_in_max_path: int, node_size: int) -> Path:
-        path = []
-        for i in range(num_nodes_in_max_path):
-            offset = i*node_size
-            n = int(result[offset : offset+node_size], 2)
-            path.insert(0, n)
-        return Path(path)
-    
-    def run(self, circuit: QuantumMazeCircuit, shots: int = 1) -> list[Path]:
-        sim = AerSimulator()
-        transpiled = transpile(circuit, sim)
-        transpiled.measure(range(len(circuit.clbits)), range(len(circuit.clbits)))
-        results = sim.run(transpiled, shots=shots, memory=True).result().get_memory()
-        paths = [self.__result_to_path(r, circuit.info.num_nodes_in_max_path, circuit.info.bits_per_node) for r in results]
-        return paths 
-     
-
-class BFSSolver:
-    def solve(self, graph: Graph) -> list[int]:
-        start = graph.start
-        end = graph.end
-        queue = [graph.start]
-        visited = {graph.start}
-        parent = {start: None}
-
-        adjacency = {node: [] for node in graph.nodes}
-        for edge in graph.edges:
-            adjacency[edge.start].append(edge.end)
-            adjacency[edge.end].append(edge.start)
-
-        while queue:
-            current = queue.pop(0)
-            if current == end:
+    BACKENDS = ('aer', 'fast')
+
+    # 'aer' simulates the circuit, 'fast' samples the exact Grover output distribution analytically;
+    # with a cache, transpiled circuits are reused across runs and circuits given as MazeCircuitInfo are never built on a hit.
+    # method and precision 'auto' pick the Aer simulation method of every circuit from its SimulationProfile and the
+    # max_memory_mb budget, a method or precision in simulator_options counts as an override
+    def __init__(self, backend: str = 'aer', cache: CircuitCache = None, simulator_options: dict = None, method: str = 'auto',
+                 precision: str = 'auto', max_memory_mb: int = None):
+        if backend not in QuantumMazeSolver.BACKENDS:
+            raise ValueError(f"Unknown backend {backend}, expected one of {QuantumMazeSolver.BACKENDS}")
+        simulator_options = dict(simulator_options or {})
+        method = simulator_options.pop('method', method)
+        precision = simulator_options.pop('precision', precision)
+        if method != 'auto' and method not in SimulationProfile.METHODS:
+            raise ValueError(f"Unknown method {method}, expected 'auto' or one of {SimulationProfile.METHODS}")
+        if precision != 'auto' and precision not in SimulationProfile.PRECISIONS:
+            raise ValueError(f"Unknown precision {precision}, expected 'auto' or one of {SimulationProfile.PRECISIONS}")
+        self.__backend = backend
+        self.__cache = cache
+        self.__simulator_options = simulator_options
+        self.__method = method
+        self.__precision = precision
+        self.__max_memory_bytes = max_memory_mb * (1 << 20) if max_memory_mb is not None else default_memory_bytes()
+        self.__simulator = None
+        self.__simulators: dict[tuple, 'AerSimulator'] = {}
+
+    @property
+    def backend(self) -> str:
+        return self.__backend
+
+    @property
+    def cache(self) -> CircuitCache | None:
+        return self.__cache
+
+    @property
+    def method(self) -> str:
+        return self.__method
+
+    @property
+    def precision(self) -> str:
+        return self.__precision
+
+    # simulator with the plain simulator_options, the one Aer picks a method for by itself
+    @property
+    def simulator(self) -> 'AerSimulator':
+        if self.__simulator is None:
+            from qiskit_aer import AerSimulator
+            self.__simulator = AerSimulator(**self.__simulator_options)
+        return self.__simulator
+
+    # Aer method and precision options of the circuit, the precision is only set for the statevector
+    def simulation_settings(self, circuit: QuantumMazeCircuit | MazeCircuitInfo) -> dict:
+        info = circuit if isinstance(circuit, MazeCircuitInfo) else circuit.info
+        method, precision = self.__method, self.__precision
+        if method == 'auto':
+            profile = SimulationProfile(info)
+            method, selected_precision, reason = profile.select(self.__max_memory_bytes)
+            logger.debug("%r: %s", profile, reason)
+            precision = selected_precision if precision == 'auto' else precision
+        elif method == 'statevector' and precision == 'auto':
+            fits = 2 ** info.total_qubits * 16 <= self.__max_memory_bytes
+            precision = 'double' if fits else 'single'
+        if method != 'statevector':
+            return {'method': method}
+        return {'method': method, 'precision': precision}
+
+    def simulator_for(self, settings: dict) -> 'AerSimulator':
+        key = tuple(sorted(settings.items()))
+        if key not in self.__simulators:
+            from qiskit_aer import AerSimulator
+            self.__simulators[key] = AerSimulator(**self.__simulator_options, **settings)
+        return self.__simulators[key]
+
+    # creates the simulators of every setting the solver can pick, with their transpiler targets, ahead of the first circuit
+    def warm_up(self) -> None:
+        if self.__backend != 'aer':
+            return
+        methods = SimulationProfile.METHODS if self.__method == 'auto' else (self.__method,)
+        for method in methods:
+            precisions = SimulationProfile.PRECISIONS if self.__precision == 'auto' else (self.__precision,)
+            for precision in precisions if method == 'statevector' else (None,):
+                settings = {'method': method, 'precision': precision} if precision else {'method': method}
+                self.simulator_for(settings).target
+
+    # measured, transpiled circuit ready to run on the simulator
+    def transpiled(self, circuit: QuantumMazeCircuit | MazeCircuitInfo) -> QuantumCircuit:
+        return self.transpiled_batch([circuit])[0]
+
+    # same for many circuits at once, cache misses are built and transpiled together so qiskit can spread them over processes
+    def transpiled_batch(self, circuits: list[QuantumMazeCircuit | MazeCircuitInfo], settings: list[dict] = None) -> list[QuantumCircuit]:
+        infos = [circuit if isinstance(circuit, MazeCircuitInfo) else circuit.info for circuit in circuits]
+        settings = settings if settings is not None else [self.simulation_settings(info) for info in infos]
+        keys = [CircuitCache.key(info, {**self.__simulator_options, **s}) if self.__cache is not None else None
+                for info, s in zip(infos, settings)]
+        transpiled: list[QuantumCircuit | None] = [None] * len(circuits)
+        # circuits sharing a cache key are only transpiled once, the others are grouped by simulator
+        missing: dict[tuple, dict[str | int, list[int]]] = {}
+        for i, key in enumerate(keys):
+            if key is not None:
+                transpiled[i] = self.__cache.get(key)
+            if transpiled[i] is None:
+                group = missing.setdefault(tuple(sorted(settings[i].items())), {})
+                group.setdefault(key if key is not None else i, []).append(i)
+
+        for target, group in missing.items():
+            first = [indices[0] for indices in group.values()]
+            with maze_trace.span('solver.build', circuits=len(first)):
+                built = [QuantumMazeCircuit.from_info(infos[i]) if isinstance(circuits[i], MazeCircuitInfo) else circuits[i] for i in first]
+            with maze_trace.span('solver.transpile', circuits=len(built), **dict(target)) as span:
+                results = transpile(built, self.simulator_for(dict(target)))
+                if span:
+                    span.set(qubits=max(circuit.num_qubits for circuit in built),
+                             size_before=sum(circuit.size() for circuit in built), depth_before=max(circuit.depth() for circuit in built),
+                             size_after=sum(result.size() for result in results), depth_after=max(result.depth() for result in results))
+            for indices, circuit, result in zip(group.values(), built, results):
+                result.measure(range(len(circuit.clbits)), range(len(circuit.clbits)))
+                if keys[indices[0]] is not None:
+                    self.__cache.put(keys[indices[0]], result)
+                for i in indices:
+                    transpiled[i] = result
+        return transpiled
+
+    # runs the transpiled circuits as one job of the simulator
+    def __simulate(self, settings: dict, circuits: list[QuantumCircuit], shots: int, seed: int, **options):
+        with maze_trace.span('solver.simulate', circuits=len(circuits), shots=shots, qubits=max(c.num_qubits for c in circuits),
+                             **settings) as span:
+            result = self.simulator_for(settings).run(circuits, shots=shots, seed_simulator=seed, **options).result()
+            if span:
+                span.set(**simulation_metadata(result))
+        return result
+
+    # distinct register values of a counts dictionary, shape (k, register_width), and how many shots measured each;
+    # the bit strings are decoded together as one byte array instead of one integer parse per symbol
+    def __counts_to_symbols(self, info: MazeCircuitInfo, counts: dict[str, int]) -> tuple[np.ndarray, np.ndarray]:
+        with maze_trace.span('solver.decode_counts', distinct=len(counts)) as span:
+            keys = [key.replace(' ', '') for key in counts]
+            frequencies = np.fromiter(counts.values(), dtype=np.int64, count=len(keys))
+            if not keys:
+                return np.zeros((0, info.register_width), dtype=np.int64), frequencies
+            # clbit i is the i-th character from the right
+            bits = np.frombuffer(''.join(keys).encode('ascii'), dtype=np.uint8).reshape(len(keys), -1)[:, ::-1] - ord('0')
+            weights = 1 << np.arange(info.bits_per_symbol, dtype=np.int64)
+            symbols = bits.reshape(len(keys), info.register_width, info.bits_per_symbol).astype(np.int64) @ weights
+            if span:
+                span.set(shots=int(frequencies.sum()))
+            return symbols, frequencies
+
+    # one row per shot; the counts lost the order the shots came in, so the repeated rows are shuffled
+    # instead of grouping equal shots together
+    @staticmethod
+    def __shots(symbols: np.ndarray, frequencies: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        return rng.permutation(np.repeat(symbols, frequencies, axis=0), axis=0)
+
+    # raw register symbols of every shot, shape (shots, register_width), in path order; shots come in random order,
+    # reproducible with the seed
+    def sample(self, circuit: QuantumMazeCircuit | MazeCircuitInfo, shots: int = 1, seed: int = None) -> np.ndarray:
+        info = circuit if isinstance(circuit, MazeCircuitInfo) else circuit.info
+        if self.backend == 'fast':
+            with maze_trace.span('solver.sample_analytic', shots=shots, qubits=info.total_qubits):
+                return AnalyticGroverSimulator(info).sample(shots, info.iterations, seed)
+        symbols, frequencies = self.sample_counts(circuit, shots, seed)
+        return QuantumMazeSolver.__shots(symbols, frequencies, np.random.default_rng(seed))
+
+    # distinct register symbols, shape (k, register_width), and how many shots measured each
+    def sample_counts(self, circuit: QuantumMazeCircuit | MazeCircuitInfo, shots: int = 1, seed: int = None) -> tuple[np.ndarray, np.ndarray]:
+        return self.__counts_sampler(circuit)(shots, seed)
+
+    # prepares the circuit once, transpiled for aer or as the analytic simulator of the fast backend, and returns
+    # a function drawing sample_counts for a number of shots and a seed from it
+    def __counts_sampler(self, circuit: QuantumMazeCircuit | MazeCircuitInfo) -> Callable[[int, int], tuple[np.ndarray, np.ndarray]]:
+        info = circuit if isinstance(circuit, MazeCircuitInfo) else circuit.info
+        if self.backend == 'fast':
+            simulator = AnalyticGroverSimulator(info)
+            def draw(shots: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+                with maze_trace.span('solver.sample_analytic', shots=shots, qubits=info.total_qubits):
+                    return np.unique(simulator.sample(shots, info.iterations, seed), axis=0, return_counts=True)
+            return draw
+        settings = self.simulation_settings(info)
+        logger.info("Simulating %d qubits with %s", info.total_qubits, settings)
+        transpiled = self.transpiled_batch([circuit], [settings])
+        def draw(shots: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+            return self.__counts_to_symbols(info, self.__simulate(settings, transpiled, shots, seed).get_counts())
+        return draw
+
+    # samples of many circuits from one simulator job per simulation method, Aer runs the experiments on parallel threads
+    # (max_parallel_experiments=0 lets it use every core); the fast backend draws one seed per circuit
+    def sample_batch(self, circuits: list[QuantumMazeCircuit | MazeCircuitInfo], shots: int = 1, seed: int = None,
+                     max_parallel_experiments: int = 0) -> list[np.ndarray]:
+        infos = [circuit if isinstance(circuit, MazeCircuitInfo) else circuit.info for circuit in circuits]
+        if not circuits:
+            return []
+        if self.backend == 'fast':
+            seeds = np.random.SeedSequence(seed).generate_state(len(infos), dtype=np.uint32)
+            with maze_trace.span('solver.sample_analytic', circuits=len(infos), shots=shots):
+                return [AnalyticGroverSimulator(info).sample(shots, info.iterations, int(s)) for info, s in zip(infos, seeds)]
+        settings = [self.simulation_settings(info) for info in infos]
+        transpiled = self.transpiled_batch(circuits, settings)
+        groups: dict[tuple, list[int]] = {}
+        for i, s in enumerate(settings):
+            groups.setdefault(tuple(sorted(s.items())), []).append(i)
+        samples: list[np.ndarray | None] = [None] * len(circuits)
+        rng = np.random.default_rng(seed)
+        for target, indices in groups.items():
+            logger.info("Simulating %d circuits with %s", len(indices), dict(target))
+            result = self.__simulate(dict(target), [transpiled[i] for i in indices], shots, seed,
+                                     max_parallel_experiments=max_parallel_experiments)
+            for j, i in enumerate(indices):
+                samples[i] = QuantumMazeSolver.__shots(*self.__counts_to_symbols(infos[i], result.get_counts(j)), rng)
+        return samples
+
+    # turns register symbols into paths over the graph nodes,
+    # paths measured on a ReducedGraph are expanded back to node ids of the original graph
+    def decode(self, maze_circuit_info: MazeCircuitInfo, samples: np.ndarray) -> list[Path]:
+        info = maze_circuit_info
+        with maze_trace.span('solver.decode', samples=len(samples), encoding=info.encoding):
+            if info.encoding == 'direction':
+                # the register holds moves, walk them to get the visited cells
+                samples = info.oracle_model().evaluate(samples).nodes
+            paths = [Path(row) for row in samples.tolist()]
+            if isinstance(info.graph, ReducedGraph):
+                paths = [Path(info.graph.expand_path(path)) for path in paths]
+            return paths
+
+    def run(self, circuit: QuantumMazeCircuit | MazeCircuitInfo, shots: int = 1, seed: int = None) -> list[Path]:
+        info = circuit if isinstance(circuit, MazeCircuitInfo) else circuit.info
+        with maze_trace.span('solver.run', backend=self.backend, shots=shots, qubits=info.total_qubits):
+            return self.decode(info, self.sample(circuit, shots, seed))
+
+    # decoded path -> number of shots, most frequent first; only the distinct register values are decoded
+    def path_counts(self, circuit: QuantumMazeCircuit | MazeCircuitInfo, shots: int = 1, seed: int = None) -> dict[Path, int]:
+        info = circuit if isinstance(circuit, MazeCircuitInfo) else circuit.info
+        symbols, frequencies = self.sample_counts(circuit, shots, seed)
+        table: dict[Path, int] = {}
+        for path, frequency in zip(self.decode(info, symbols), frequencies.tolist()):
+            table[path] = table.get(path, 0) + frequency
+        return dict(sorted(table.items(), key=lambda item: -item[1]))
+
+    # decoded paths of every circuit, in order, from a single simulator job
+    def run_batch(self, circuits: list[QuantumMazeCircuit | MazeCircuitInfo], shots: int = 1, seed: int = None,
+                  max_parallel_experiments: int = 0) -> list[list[Path]]:
+        infos = [circuit if isinstance(circuit, MazeCircuitInfo) else circuit.info for circuit in circuits]
+        with maze_trace.span('solver.run_batch', backend=self.backend, circuits=len(circuits), shots=shots):
+            samples = self.sample_batch(circuits, shots, seed, max_parallel_experiments)
+            return [self.decode(info, s) for info, s in zip(infos, samples)]
+
+    # Grover search with an unknown number of solutions (Boyer, Brassard, Hoyer, Tapp): every round runs a random
+    # number of iterations below a growing bound and stops as soon as a sampled path passes the classical check
+    def solve_adaptive(self, graph: Graph, max_path_length: int = None, turn_back_check: bool = False, encoding: str = 'node',
+                       shots_per_round: int = 1, growth: float = 6 / 5, max_oracle_calls: int = None, seed: int = None,
+                       mcx_mode: str = 'noancilla') -> 'AdaptiveSolveResult':
+        if encoding not in QuantumMazeCircuit.ENCODINGS:
+            raise ValueError(f"Unknown encoding {encoding}, expected one of {QuantumMazeCircuit.ENCODINGS}")
+        rng = random.Random(seed)
+        base = MazeCircuitInfo(graph, max_path_length, turn_back_check, mcx_mode=mcx_mode) if encoding == 'node' \
+            else DirectionMazeCircuitInfo(graph, max_path_length, turn_back_check, mcx_mode=mcx_mode)
+        model = base.oracle_model()
+        root_search_space = math.sqrt(2 ** base.num_qubits_in_max_path)
+        if max_oracle_calls is None:
+            max_oracle_calls = 10 * math.ceil(root_search_space) * shots_per_round
+        bound = 1.0
+        rounds: list[tuple[int, int]] = []
+        oracle_calls = 0
+
+        while True:
+            iterations = rng.randrange(math.ceil(bound))
+            info = type(base)(graph, base.max_path_length, turn_back_check, iterations=iterations, mcx_mode=mcx_mode)
+            samples = self.sample(info, shots_per_round, rng.getrandbits(32))
+            rounds.append((iterations, shots_per_round))
+            oracle_calls += iterations * shots_per_round
+            valid = model.evaluate(samples).valid
+            if valid.any():
+                path = self.decode(info, samples[valid][:1])[0]
+                return AdaptiveSolveResult(path, rounds, oracle_calls)
+            if oracle_calls >= max_oracle_calls:
+                return AdaptiveSolveResult(None, rounds, oracle_calls)
+            bound = min(growth * bound, root_search_space)
+
+    # the adaptive search above on every segment of a SegmentedGraph, then the segment paths stitched together. Each round
+    # runs the unsolved segments as one batch, which Aer spreads over max_parallel_experiments threads (1 runs them one by
+    # one); max_path_length caps the path length of every segment and max_oracle_calls is a budget per segment
+    def solve_segmented(self, graph: Graph | SegmentedGraph, waypoints: list[int] = None, max_segment_nodes: int = None,
+                        max_path_length: int = None, turn_back_check: bool = False, shots_per_round: int = 1, growth: float = 6 / 5,
+                        max_oracle_calls: int = None, seed: int = None, mcx_mode: str = 'noancilla',
+                        max_parallel_experiments: int = 0) -> 'SegmentedSolveResult':
+        segmented = graph if isinstance(graph, SegmentedGraph) else SegmentedGraph(graph, waypoints, max_segment_nodes)
+        segments = segmented.segments
+        rng = random.Random(seed)
+        bases = [MazeCircuitInfo(segment, min(max_path_length, segment.total_nodes - 1) if max_path_length else None, turn_back_check,
+                                 mcx_mode=mcx_mode) for segment in segments]
+        models = [base.oracle_model() for base in bases]
+        root_search_spaces = [math.sqrt(2 ** base.num_qubits_in_max_path) for base in bases]
+        budgets = [max_oracle_calls if max_oracle_calls is not None else 10 * math.ceil(root) * shots_per_round for root in root_search_spaces]
+        bounds = [1.0] * len(segments)
+        rounds: list[list[tuple[int, int]]] = [[] for _ in segments]
+        oracle_calls = [0] * len(segments)
+        paths: list[Path | None] = [None] * len(segments)
+
+        pending = list(range(len(segments)))
+        while pending:
+            infos = [MazeCircuitInfo(segments[i], bases[i].max_path_length, turn_back_check, iterations=rng.randrange(math.ceil(bounds[i])),
+                                     mcx_mode=mcx_mode) for i in pending]
+            batch = self.sample_batch(infos, shots_per_round, rng.getrandbits(32), max_parallel_experiments)
+            unsolved = []
+            for i, info, samples in zip(pending, infos, batch):
+                rounds[i].append((info.iterations, shots_per_round))
+                oracle_calls[i] += info.iterations * shots_per_round
+                valid = models[i].evaluate(samples).valid
+                if valid.any():
+                    paths[i] = self.decode(info, samples[valid][:1])[0]
+                elif oracle_calls[i] < budgets[i]:
+                    bounds[i] = min(growth * bounds[i], root_search_spaces[i])
+                    unsolved.append(i)
+            pending = unsolved
+
+        results = [AdaptiveSolveResult(path, r, calls) for path, r, calls in zip(paths, rounds, oracle_calls)]
+        path = None
+        if all(result.found for result in results):
+            path = Path(segmented.stitch(paths))
+            if isinstance(segmented.graph, ReducedGraph):
+                path = Path(segmented.graph.expand_path(path))
+        return SegmentedSolveResult(path, segmented.waypoints, results)
+
+    # runs shots in chunks growing by growth until the most frequent path beats the runner-up with the given confidence,
+    # or max_shots are spent; the test is a one-sided Wilson bound on the leader's share of the two paths, with the error
+    # split over every look. valid_only ranks only paths that pass the classical oracle check
+    def sample_until_confident(self, circuit: QuantumMazeCircuit | MazeCircuitInfo, max_shots: int = 10000, confidence: float = 0.99,
+                               initial_shots: int = 100, growth: float = 2.0, valid_only: bool = False, seed: int = None) -> 'SequentialSampleResult':
+        if not 0 < confidence < 1:
+            raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+        if initial_shots < 1 or growth <= 1:
+            raise ValueError(f"initial_shots must be positive and growth above 1, got {initial_shots} and {growth}")
+        info = circuit if isinstance(circuit, MazeCircuitInfo) else circuit.info
+        model = info.oracle_model() if valid_only else None
+        chunks = []
+        chunk = initial_shots
+        while sum(chunks) < max_shots:
+            chunks.append(min(chunk, max_shots - sum(chunks)))
+            chunk = math.ceil(chunk * growth)
+        z = NormalDist().inv_cdf(1 - (1 - confidence) / max(1, len(chunks)))
+        seeds = np.random.SeedSequence(seed).generate_state(max(1, len(chunks)), dtype=np.uint32)
+
+        # transpiled or built once, every chunk only reruns the simulation
+        draw = self.__counts_sampler(circuit)
+        table: dict[Path, int] = {}
+        shots = rounds = 0
+        confident = False
+        for chunk, chunk_seed in zip(chunks, seeds):
+            symbols, frequencies = draw(chunk, int(chunk_seed))
+            if model is not None:
+                valid = model.evaluate(symbols).valid
+                symbols, frequencies = symbols[valid], frequencies[valid]
+            for path, frequency in zip(self.decode(info, symbols), frequencies.tolist()):
+                table[path] = table.get(path, 0) + frequency
+            shots += chunk
+            rounds += 1
+            top = sorted(table.values(), reverse=True)[:2] + [0, 0]
+            if QuantumMazeSolver.__leader_separated(top[0], top[1], z):
+                confident = True
                 break
+        table = dict(sorted(table.items(), key=lambda item: -item[1]))
+        return SequentialSampleResult(table, shots, max_shots, rounds, confident, confidence)
+
+    # lower Wilson bound of leader / (leader + runner_up) above one half
+    @staticmethod
+    def __leader_separated(leader: int, runner_up: int, z: float) -> bool:
+        n = leader + runner_up
+        if not n:
+            return False
+        p = leader / n
+        center = (p + z * z / (2 * n)) / (1 + z * z / n)
+        half_width = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return center - half_width > 0.5
+
+class AdaptiveSolveResult:
+    def __init__(self, path: Path | None, rounds: list[tuple[int, int]], oracle_calls: int):
+        self.__path = path
+        self.__rounds = rounds
+        self.__oracle_calls = oracle_calls
+
+    # first valid path found, None when the oracle call budget ran out
+    @property
+    def path(self) -> Path | None:
+        return self.__path
+
+    @property
+    def found(self) -> bool:
+        return self.__path is not None
+
+    # (Grover iterations, shots) of every round, in order
+    @property
+    def rounds(self) -> list[tuple[int, int]]:
+        return list(self.__rounds)
+
+    # oracle applications summed over all shots
+    @property
+    def oracle_calls(self) -> int:
+        return self.__oracle_calls
+
+    @property
+    def shots(self) -> int:
+        return sum(shots for _, shots in self.__rounds)
+
+    def __repr__(self) -> str:
+        return f"AdaptiveSolveResult(path={self.path}, rounds={len(self.__rounds)}, oracle_calls={self.oracle_calls}, shots={self.shots})"
+
+class SegmentedSolveResult:
+    def __init__(self, path: Path | None, waypoints: list[int], segments: list[AdaptiveSolveResult]):
+        self.__path = path
+        self.__waypoints = waypoints
+        self.__segments = segments
+
+    # stitched path over the whole graph, None when a segment ran out of oracle calls
+    @property
+    def path(self) -> Path | None:
+        return self.__path
+
+    @property
+    def found(self) -> bool:
+        return self.__path is not None
+
+    @property
+    def waypoints(self) -> list[int]:
+        return list(self.__waypoints)
+
+    # adaptive search of every segment, in walking order
+    @property
+    def segments(self) -> list[AdaptiveSolveResult]:
+        return list(self.__segments)
+
+    @property
+    def oracle_calls(self) -> int:
+        return sum(segment.oracle_calls for segment in self.__segments)
+
+    @property
+    def shots(self) -> int:
+        return sum(segment.shots for segment in self.__segments)
+
+    def __repr__(self) -> str:
+        return f"SegmentedSolveResult(path={self.path}, segments={len(self.__segments)}, oracle_calls={self.oracle_calls}, shots={self.shots})"
+
+class SequentialSampleResult:
+    def __init__(self, path_counts: dict[Path, int], shots: int, max_shots: int, rounds: int, confident: bool, confidence: float):
+        self.__path_counts = path_counts
+        self.__shots = shots
+        self.__max_shots = max_shots
+        self.__rounds = rounds
+        self.__confident = confident
+        self.__confidence = confidence
+
+    # path -> number of shots (valid shots only with valid_only), most frequent first
+    @property
+    def path_counts(self) -> dict[Path, int]:
+        return dict(self.__path_counts)
+
+    # most frequent path, None when no shot was counted
+    @property
+    def path(self) -> Path | None:
+        return next(iter(self.__path_counts), None)
+
+    @property
+    def shots(self) -> int:
+        return self.__shots
+
+    @property
+    def max_shots(self) -> int:
+        return self.__max_shots
+
+    @property
+    def shots_saved(self) -> int:
+        return self.__max_shots - self.__shots
+
+    # number of chunks sampled
+    @property
+    def rounds(self) -> int:
+        return self.__rounds
 
-            for neighbor in adjacency[current]:
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    parent[neighbor] = current
-                    queue.append(neighbor)
+    # whether sampling stopped because the leader was separated, rather than because max_shots ran out
+    @property
+    def confident(self) -> bool:
+        return self.__confident
 
-        path = []
-        cur = end
-        while cur is not None:
-            path.append(cur.id)
-            cur = parent.get(cur)
-        path.reverse()
+    @property
+    def confidence(self) -> float:
+        return self.__confidence
 
-        return path
\ No newline at end of file
+    def __repr__(self) -> str:
+        return f"SequentialSampleResult(path={self.path}, shots={self.__shots}, shots_saved={self.shots_saved}, confident={self.__confident})"
@@ -0,0 +1,197 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+# timed span of one pipeline stage; spans opened inside it become its children. attributes describe the stage,
+# set() adds more once they are known
+class Span:
+    __ids = itertools.count(1)
+
+    def __init__(self, tracer: 'Tracer', name: str, parent: 'Span | None', attributes: dict):
+        self.__tracer = tracer
+        self.__id = next(Span.__ids)
+        self.__name = name
+        self.__parent = parent
+        self.__attributes = attributes
+        self.__start = 0
+        self.__end = None
+        self.__thread = threading.get_ident()
+        self.__token = None
+
+    @property
+    def id(self) -> int:
+        return self.__id
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def parent(self) -> 'Span | None':
+        return self.__parent
+
+    @property
+    def attributes(self) -> dict:
+        return dict(self.__attributes)
+
+    @property
+    def thread(self) -> int:
+        return self.__thread
+
+    # perf_counter_ns at the start of the span
+    @property
+    def start(self) -> int:
+        return self.__start
+
+    # seconds, None while the span is open
+    @property
+    def duration(self) -> float | None:
+        return (self.__end - self.__start) / 1e9 if self.__end is not None else None
+
+    def set(self, **attributes) -> None:
+        self.__attributes.update(attributes)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __enter__(self) -> 'Span':
+        self.__token = Tracer.current.set(self)
+        self.__start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.__end = time.perf_counter_ns()
+        Tracer.current.reset(self.__token)
+        if exc_type is not None:
+            self.__attributes['error'] = exc_type.__name__
+        self.__tracer.finish(self)
+
+    def __repr__(self) -> str:
+        duration = f"{self.duration * 1000:.3f} ms" if self.duration is not None else "open"
+        return f"Span({self.__name}, {duration}, {self.__attributes})"
+
+# stands in for every span while tracing is disabled; it is falsy, so costly attributes can be skipped with `if span:`
+class NullSpan:
+    def set(self, **attributes) -> None:
+        pass
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __enter__(self) -> 'NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+NULL_SPAN = NullSpan()
+
+# collects finished spans and hands each of them to the callbacks; record=False only calls the callbacks
+class Tracer:
+    RATES = ('shots', 'samples', 'distinct')
+    current: contextvars.ContextVar['Span | None'] = contextvars.ContextVar('maze_trace_span', default=None)
+
+    def __init__(self, record: bool = True):
+        self.__record = record
+        self.__spans: list[Span] = []
+        self.__callbacks: list[Callable[[Span], None]] = []
+        self.__lock = threading.Lock()
+        self.__origin = time.perf_counter_ns()
+
+    @property
+    def spans(self) -> list[Span]:
+        with self.__lock:
+            return list(self.__spans)
+
+    def add_callback(self, callback: Callable[[Span], None]) -> None:
+        self.__callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[Span], None]) -> None:
+        self.__callbacks.remove(callback)
+
+    def span(self, name: str, **attributes) -> Span:
+        return Span(self, name, Tracer.current.get(), attributes)
+
+    def finish(self, span: Span) -> None:
+        if self.__record:
+            with self.__lock:
+                self.__spans.append(span)
+        for callback in self.__callbacks:
+            callback(span)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__spans.clear()
+
+    # span name -> number of spans, total seconds and, for the RATES attributes the spans carry, their throughput per second
+    def summary(self) -> dict[str, dict]:
+        totals: dict[str, dict] = {}
+        for span in self.spans:
+            entry = totals.setdefault(span.name, {'count': 0, 'seconds': 0.0})
+            entry['count'] += 1
+            entry['seconds'] += span.duration
+            attributes = span.attributes
+            for name in Tracer.RATES:
+                if isinstance(attributes.get(name), int):
+                    entry[name] = entry.get(name, 0) + attributes[name]
+        for entry in totals.values():
+            for name in Tracer.RATES:
+                if name in entry and entry['seconds'] > 0:
+                    entry[f'{name}_per_second'] = entry[name] / entry['seconds']
+        return totals
+
+    # Chrome trace event format, opens in chrome://tracing and Perfetto
+    def export(self, path: str) -> None:
+        events = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            args = {name: value if isinstance(value, (int, float, str, bool, type(None))) else repr(value)
+                    for name, value in span.attributes.items()}
+            events.append({
+                'name': span.name,
+                'ph': 'X',
+                'ts': (span.start - self.__origin) / 1000,
+                'dur': span.duration * 1e6,
+                'pid': os.getpid(),
+                'tid': span.thread,
+                'args': {'id': span.id, 'parent': span.parent.id if span.parent is not None else None, **args},
+            })
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+# tracer of the process, None while tracing is disabled
+active_tracer: Tracer | None = None
+
+def enable(tracer: Tracer = None) -> Tracer:
+    global active_tracer
+    active_tracer = tracer if tracer is not None else Tracer()
+    return active_tracer
+
+def disable() -> None:
+    global active_tracer
+    active_tracer = None
+
+# span of the active tracer, or the shared NULL_SPAN when tracing is disabled
+def span(name: str, **attributes) -> Span | NullSpan:
+    if active_tracer is None:
+        return NULL_SPAN
+    return active_tracer.span(name, **attributes)
+
+# traces the block and, given a path, writes the trace file when it ends
+@contextmanager
+def tracing(path: str = None, tracer: Tracer = None) -> Iterator[Tracer]:
+    previous = active_tracer
+    tracer = enable(tracer)
+    try:
+        yield tracer
+    finally:
+        if previous is not None:
+            enable(previous)
+        else:
+            disable()
+        if path is not None:
+            tracer.export(path)
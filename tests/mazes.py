@@ -0,0 +1,21 @@
+import random
+from maze.maze import Graph, Maze
+from maze.maze_generator import PrimGenerator
+
+# Prim maze with extra openings, so it has cycles and more than one path
+def braided_maze(width: int, height: int, openings: int, seed: int = 0) -> Maze:
+    maze = PrimGenerator().generate_maze(width, height, seed=seed)
+    rng = random.Random(seed)
+    while openings:
+        cell = rng.randrange(width * height)
+        y, x = divmod(cell, width)
+        other = cell + 1 if rng.random() < 0.5 and x < width - 1 else cell + width if y < height - 1 else None
+        if other is not None and not maze.has_edge(cell, other):
+            maze.connect_nodes(cell, other)
+            openings -= 1
+    return maze
+
+# whether the path walks from the start to the end of the graph along its edges
+def is_solution(graph: Graph, path: list[int]) -> bool:
+    return bool(path) and path[0] == graph.start.id and path[-1] == graph.end.id and \
+        all(graph.has_edge(a, b) for a, b in zip(path, path[1:]))
@@ -0,0 +1,66 @@
+import os
+
+from qiskit import QuantumCircuit, transpile
+
+from maze.maze_cache import CircuitCache
+from maze.maze_circuit import MazeCircuitInfo, QuantumMazeCircuit
+from maze.maze_generator import PrimGenerator
+
+
+def maze_circuit(seed: int) -> tuple[str, QuantumCircuit]:
+    info = MazeCircuitInfo(PrimGenerator().generate_maze(2, 2, seed=seed), 2)
+    circuit = transpile(QuantumMazeCircuit.from_info(info), basis_gates=['cx', 'u'], optimization_level=1)
+    return CircuitCache.key(info), circuit
+
+
+def small_circuit(qubits: int) -> QuantumCircuit:
+    circuit = QuantumCircuit(qubits)
+    circuit.h(range(qubits))
+    return circuit
+
+
+def test_memory_hit():
+    cache = CircuitCache()
+    key, circuit = maze_circuit(1)
+    assert cache.get(key) is None
+    cache.put(key, circuit)
+    assert cache.get(key) is circuit
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_disk_hit_round_trips_through_qpy(tmp_path):
+    key, circuit = maze_circuit(1)
+    CircuitCache(directory=str(tmp_path)).put(key, circuit)
+    # a new cache on the same directory starts with an empty memory tier
+    cache = CircuitCache(directory=str(tmp_path))
+    loaded = cache.get(key)
+    assert loaded is not None and loaded is not circuit
+    assert loaded == circuit
+    assert (cache.hits, cache.misses) == (1, 0)
+    # the loaded circuit is now served from memory
+    assert cache.get(key) is loaded
+
+
+def test_memory_evicts_the_least_recently_used():
+    cache = CircuitCache(capacity=2)
+    cache.put('a', small_circuit(1))
+    cache.put('b', small_circuit(2))
+    cache.get('a')
+    cache.put('c', small_circuit(3))
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_disk_evicts_the_least_recently_used(tmp_path):
+    directory = str(tmp_path)
+    cache = CircuitCache(directory=directory)
+    cache.put('a', small_circuit(1))
+    size = os.path.getsize(os.path.join(directory, 'a.qpy'))
+    cache = CircuitCache(directory=directory, max_disk_bytes=2 * size + size // 2)
+    for age, key in enumerate(('a', 'b')):
+        cache.put(key, small_circuit(1))
+        os.utime(os.path.join(directory, f'{key}.qpy'), (age, age))
+    cache.put('c', small_circuit(1))
+    assert sorted(os.listdir(directory)) == ['b.qpy', 'c.qpy']
+    # gone from disk, a fresh memory tier misses it
+    assert CircuitCache(directory=directory).get('a') is None
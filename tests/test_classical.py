@@ -0,0 +1,42 @@
+import pytest
+from maze.maze import Graph, Maze
+from maze.maze_generator import PrimGenerator
+from maze.maze_classical import Path, BFSSolver, BidirectionalBFSSolver, AStarSolver, FrontierBFSSolver
+from tests.mazes import braided_maze, is_solution
+
+SOLVERS = [BFSSolver(), BidirectionalBFSSolver(), AStarSolver(), FrontierBFSSolver()]
+
+@pytest.mark.parametrize('solver', SOLVERS, ids=lambda s: type(s).__name__)
+@pytest.mark.parametrize('seed', range(5))
+def test_solvers_find_shortest_paths(solver, seed):
+    maze = braided_maze(9, 7, openings=12, seed=seed)
+    shortest = BFSSolver().solve(maze)
+    path = solver.solve(maze)
+    assert is_solution(maze, path)
+    assert len(path) == len(shortest)
+
+@pytest.mark.parametrize('solver', SOLVERS, ids=lambda s: type(s).__name__)
+def test_solvers_follow_the_only_path_of_a_perfect_maze(solver):
+    maze = PrimGenerator().generate_maze(12, 12, seed=4)
+    assert solver.solve(maze) == BFSSolver().solve(maze)
+
+@pytest.mark.parametrize('solver', SOLVERS, ids=lambda s: type(s).__name__)
+def test_solvers_report_unreachable_ends(solver):
+    maze = Maze(3, 2)
+    maze.connect_nodes(0, 1)
+    result = solver.search(maze)
+    assert not result.found and result.path is None
+    assert result.visited >= 1
+
+@pytest.mark.parametrize('solver', SOLVERS[:3], ids=lambda s: type(s).__name__)
+def test_graph_solvers_on_plain_graphs(solver):
+    graph = Graph.from_edges([(0, 1), (1, 2), (2, 5), (0, 3), (3, 4), (4, 5), (1, 4)], 0, 5)
+    path = solver.solve(graph)
+    assert len(path) == 4 and path[0] == 0 and path[-1] == 5
+
+def test_frontier_solver_requires_a_maze():
+    with pytest.raises(ValueError):
+        FrontierBFSSolver().solve(Graph.from_edges([(0, 1)], 0, 1))
+
+def test_remove_cycles():
+    assert Path([0, 1, 2, 1, 3, 4, 3, 5]).remove_cycles() == [0, 1, 3, 5]
@@ -0,0 +1,101 @@
+import copy
+import pickle
+import threading
+
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Operator
+
+from maze.maze_circuit import MazeCircuitInfo, MazeOracle, OracleGateLibrary, QuantumMazeCircuit, SHARED_GATE_LIBRARY
+from maze.maze_generator import PrimGenerator
+
+
+def test_rejects_non_positive_capacity():
+    with pytest.raises(ValueError):
+        OracleGateLibrary(0)
+
+
+def test_memoizes_gates():
+    library = OracleGateLibrary()
+    assert library.node_to_binary(3, 5) is library.node_to_binary(3, 5)
+    assert library.size == 1
+
+
+def test_evicts_least_recently_used():
+    library = OracleGateLibrary(capacity=2)
+    first = library.node_to_binary(3, 1)
+    library.node_to_binary(3, 2)
+    assert library.node_to_binary(3, 1) is first
+    library.node_to_binary(3, 3)
+    assert library.size == 2
+    # 2 was the least recently used, 1 survives
+    assert library.node_to_binary(3, 1) is first
+
+
+def test_nested_builds_stay_within_capacity():
+    library = OracleGateLibrary(capacity=3)
+    for to_node in range(8):
+        library.pattern_check((3, 3), (0, to_node), 'v-chain')
+    assert library.size <= 3
+
+
+@pytest.mark.parametrize('mode', ['noancilla', 'relative-phase'])
+def test_edge_check_block_matches_its_edge_checks(mode):
+    library = OracleGateLibrary()
+    pairs = ((0, 1), (1, 0), (1, 3), (2, 3), (3, 1), (3, 3))
+    block = library.edge_check_block(2, pairs, mode=mode)
+    reference = QuantumCircuit(block.num_qubits)
+    for from_node, to_node in pairs:
+        reference.append(library.pattern_check((2, 2), (from_node, to_node), mode), range(block.num_qubits))
+    if mode == 'relative-phase':
+        # the reordered relative-phase gates agree up to the relative phases the inverse of the block undoes
+        assert np.allclose(np.abs(Operator(block.definition).data), np.abs(Operator(reference).data))
+    else:
+        assert Operator(block.definition).equiv(Operator(reference))
+
+
+def test_edge_check_block_shares_encoders():
+    maze = PrimGenerator().generate_maze(4, 4, seed=3)
+    bits = MazeCircuitInfo(maze, 6).bits_per_node
+    pairs = tuple(sorted({(e.start.id, e.end.id) for e in maze.edges}))
+    # encoding and decoding every pair on its own flips each 0 bit of the pattern twice
+    separate = sum(2 * (2 * bits - bin(from_node | to_node << bits).count('1')) for from_node, to_node in pairs)
+    merged = OracleGateLibrary().edge_check_block(bits, pairs).definition.count_ops()['x']
+    assert merged < separate / 2
+
+
+def test_concurrent_lookups_share_one_gate():
+    library = OracleGateLibrary()
+    barrier = threading.Barrier(8)
+    gates = []
+
+    def build():
+        barrier.wait()
+        gates.append(library.edge_check_block(3, ((0, 1), (1, 2), (2, 3)), mode='v-chain'))
+
+    threads = [threading.Thread(target=build) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(gates) == 8
+    assert all(gate is gates[0] for gate in gates)
+
+
+def test_own_library_leaves_shared_one_alone():
+    maze = PrimGenerator().generate_maze(2, 2, seed=1)
+    SHARED_GATE_LIBRARY.clear()
+    library = OracleGateLibrary()
+    MazeOracle(MazeCircuitInfo(maze, 2), gate_library=library)
+    QuantumMazeCircuit(maze, 2, iterations=1, gate_library=library)
+    assert library.size > 0
+    assert SHARED_GATE_LIBRARY.size == 0
+
+
+def test_copies_and_pickles_start_empty():
+    library = OracleGateLibrary(capacity=7)
+    library.node_to_binary(3, 1)
+    for clone in (copy.deepcopy(library), pickle.loads(pickle.dumps(library))):
+        assert clone.capacity == 7
+        assert clone.size == 0
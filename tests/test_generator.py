@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from maze.maze import GridMaze
+from maze.maze_generator import MazeGenerator, PrimGenerator, KruskalGenerator, BacktrackerGenerator
+
+GENERATORS = [PrimGenerator, KruskalGenerator, BacktrackerGenerator]
+
+def passages(maze) -> set[frozenset[int]]:
+    return {frozenset((e.start.id, e.end.id)) for e in maze.edges if e.start.id != e.end.id}
+
+def reachable(maze) -> set[int]:
+    seen = {maze.start.id}
+    stack = [maze.start.id]
+    while stack:
+        for node in maze.neighbors(stack.pop()):
+            if node.id not in seen:
+                seen.add(node.id)
+                stack.append(node.id)
+    return seen
+
+@pytest.mark.parametrize('generator', GENERATORS)
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('width, height', [(1, 1), (1, 7), (6, 1), (5, 4), (12, 9)])
+def test_generates_perfect_mazes(generator, compact, width, height):
+    maze = generator(compact).generate_maze(width, height, seed=11)
+    assert isinstance(maze, GridMaze) == compact
+    cells = width * height
+    # connected with cells - 1 passages is a spanning tree: every cell reachable by exactly one route
+    assert len(reachable(maze)) == cells
+    assert len(passages(maze)) == cells - 1
+    # passages only join grid neighbours
+    for a, b in map(tuple, passages(maze)):
+        assert b in MazeGenerator.neighbor_ids(a, width, height)
+
+@pytest.mark.parametrize('generator', GENERATORS)
+def test_seed_reproduces_the_maze(generator):
+    first = generator().generate_maze(8, 6, seed=4)
+    assert passages(first) == passages(generator().generate_maze(8, 6, seed=4))
+    assert passages(first) != passages(generator().generate_maze(8, 6, seed=5))
+
+@pytest.mark.parametrize('generator', GENERATORS)
+def test_batch_maze_rebuilds_from_its_seed(generator):
+    batch = generator().generate_batch(5, 6, 5, seed=21, end=(5, 2))
+    seeds = MazeGenerator.batch_seeds(5, 21)
+    assert len(batch) == len(seeds) == 5
+    for maze, seed in zip(batch, seeds):
+        alone = generator().generate_maze(6, 5, end=(5, 2), seed=seed)
+        assert passages(maze) == passages(alone)
+        assert (maze.end.x, maze.end.y) == (5, 2)
+    # the mazes of a batch differ from each other
+    assert len({frozenset(passages(maze)) for maze in batch}) == 5
+
+def test_batch_seeds_are_stable():
+    assert MazeGenerator.batch_seeds(3, 7) == MazeGenerator.batch_seeds(3, 7)
+    assert MazeGenerator.batch_seeds(4, 7)[:3] == MazeGenerator.batch_seeds(3, 7)
+    assert all(isinstance(seed, int) for seed in MazeGenerator.batch_seeds(3, 7))
+    assert np.unique(MazeGenerator.batch_seeds(100, 7)).size == 100
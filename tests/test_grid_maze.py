@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from maze.maze import Graph, Maze, GridMaze
+from maze.maze_generator import PrimGenerator
+from maze.maze_classical import BFSSolver, FrontierBFSSolver
+
+# names used by the code object and by the comprehensions and closures nested in it
+def names(code) -> set[str]:
+    result = set(code.co_names)
+    for constant in code.co_consts:
+        if hasattr(constant, 'co_names'):
+            result |= names(constant)
+    return result
+
+# members of Graph and Maze that read the private state set up by Graph.__init__, which GridMaze never runs
+def private_state_readers(cls: type) -> list[str]:
+    readers = []
+    for name, member in vars(cls).items():
+        function = member.fget if isinstance(member, property) else getattr(member, '__func__', member)
+        code = getattr(function, '__code__', None)
+        if code is not None and not name.startswith(f'_{cls.__name__}__') and \
+                any(n.startswith(('_Graph__', '_Maze__')) and n not in ('_Graph__draw', '_Maze__cell_walls') for n in names(code)):
+            readers.append(name)
+    return readers
+
+@pytest.fixture
+def mazes() -> tuple[Maze, GridMaze]:
+    maze = PrimGenerator().generate_maze(7, 5, seed=3)
+    return maze, maze.to_grid()
+
+def test_grid_maze_overrides_every_reader_of_graph_state():
+    for cls in (Graph, Maze):
+        for name in private_state_readers(cls):
+            assert name in vars(GridMaze), f"GridMaze must override {cls.__name__}.{name}"
+
+def test_grid_maze_matches_maze(mazes):
+    maze, grid = mazes
+    assert (grid.width, grid.height, grid.start, grid.end) == (maze.width, maze.height, maze.start, maze.end)
+    assert grid.nodes == maze.nodes
+    assert {(e.start.id, e.end.id) for e in grid.edges} == {(e.start.id, e.end.id) for e in maze.edges}
+    assert (grid.total_nodes, grid.total_edges) == (maze.total_nodes, maze.total_edges)
+    for node in maze.nodes:
+        assert grid.node_by_id(node.id) == node
+        assert (grid.node_by_id(node.id).x, grid.node_by_id(node.id).y) == (node.x, node.y)
+        assert sorted(grid.neighbor_ids(node.id)) == sorted(maze.neighbor_ids(node.id))
+        assert sorted(n.id for n in grid.successors(node.id)) == sorted(n.id for n in maze.successors(node.id))
+        assert sorted(n.id for n in grid.neighbors(node.id)) == sorted(n.id for n in maze.neighbors(node.id))
+        for other in maze.nodes:
+            assert grid.has_edge(node.id, other.id) == maze.has_edge(node.id, other.id)
+    assert grid.cell_at(3, 2) == maze.cell_at(3, 2)
+    for ours, theirs in zip(grid.walls(), maze.walls()):
+        np.testing.assert_array_equal(ours, theirs)
+    assert grid.layout() == maze.layout()
+    np.testing.assert_array_equal(grid.raster(), maze.raster())
+    np.testing.assert_array_equal(grid.wall_segments(), maze.wall_segments())
+
+def test_grid_maze_edits_walls():
+    grid = GridMaze(10, 3)
+    grid.connect_nodes(8, 9)
+    grid.connect_nodes(9, 19)
+    assert grid.has_edge(9, 8) and grid.has_edge(19, 9) and not grid.has_edge(0, 1)
+    assert grid.total_edges == 4
+    grid.disconnect_nodes(9, 8)
+    assert not grid.has_edge(8, 9)
+    with pytest.raises(ValueError):
+        grid.disconnect_nodes(8, 9)
+    with pytest.raises(ValueError):
+        grid.connect_nodes(9, 10)
+    with pytest.raises(ValueError):
+        grid.node_by_id(30)
+
+def test_grid_maze_packs_walls():
+    grid = GridMaze(1000, 1000)
+    assert grid.nbytes == 2 * 1000 * 125
+    # the properties hand out copies
+    grid.east_walls[0, 0] = False
+    assert not grid.has_edge(0, 1)
+
+def test_grid_maze_copy_and_crop(mazes):
+    _, grid = mazes
+    copy = grid.copy()
+    copy.disconnect_nodes(*next((e.start.id, e.end.id) for e in copy.edges))
+    assert copy.total_edges == grid.total_edges - 2
+    cropped = grid.crop(2, 1, 4, 3)
+    east_walls, south_walls = grid.walls()
+    np.testing.assert_array_equal(cropped.walls()[0], east_walls[1:4, 2:6])
+    np.testing.assert_array_equal(cropped.walls()[1], south_walls[1:4, 2:6])
+
+def test_compact_generator_and_solvers():
+    maze = PrimGenerator().generate_maze(9, 6, seed=5)
+    grid = PrimGenerator(compact=True).generate_maze(9, 6, seed=5)
+    assert isinstance(grid, GridMaze)
+    assert BFSSolver().solve(grid) == BFSSolver().solve(maze)
+    assert FrontierBFSSolver().solve(grid) == BFSSolver().solve(maze)
+
+@pytest.mark.parametrize('start, end', [((3, 0), (2, 2)), ((0, 0), (2, -1)), ((1, 1), (2, 2))])
+def test_terminals_are_checked(start, end):
+    for cls in (Maze, GridMaze):
+        with pytest.raises(ValueError):
+            cls(3, 3, start, end)
@@ -0,0 +1,78 @@
+import asyncio
+import multiprocessing
+import time
+from collections import Counter
+
+import pytest
+
+from maze.maze_async import AsyncQuantumMazeSolver
+from maze.maze_circuit import MazeCircuitInfo
+from maze.maze_classical import BFSSolver
+from maze.maze_generator import PrimGenerator
+
+# 40 Grover iterations over 24 qubits, far longer than any timeout below
+SLOW = MazeCircuitInfo(PrimGenerator().generate_maze(3, 3, seed=1), 4, iterations=40)
+FAST = MazeCircuitInfo(PrimGenerator().generate_maze(2, 2, seed=1), 2)
+
+
+def solver(**kwargs) -> AsyncQuantumMazeSolver:
+    # Aer already ran in this process, a forked worker could inherit its locked state
+    return AsyncQuantumMazeSolver(max_concurrency=1, mp_context=multiprocessing.get_context('spawn'), **kwargs)
+
+
+def test_solves():
+    async def main():
+        async with solver() as quantum:
+            return await quantum.solve(FAST, shots=8, seed=1)
+    paths = asyncio.run(main())
+    assert len(paths) == 8
+    assert Counter(tuple(path) for path in paths).most_common(1)[0][0] == tuple(BFSSolver().solve(FAST.graph))
+
+
+def test_slow_solve_returns_on_time():
+    async def main():
+        async with solver() as quantum:
+            await quantum.solve(FAST) # worker is up
+            started = time.perf_counter()
+            with pytest.raises(TimeoutError):
+                await quantum.solve(SLOW, timeout=0.5)
+            waited = time.perf_counter() - started
+            # the stuck worker was replaced and takes the next solve
+            paths = await quantum.solve(FAST, shots=4, seed=1)
+            return waited, paths
+    waited, paths = asyncio.run(main())
+    assert waited < 1.5
+    assert len(paths) == 4
+
+
+def test_timeout_covers_waiting_for_a_worker():
+    async def main():
+        async with solver() as quantum:
+            await quantum.solve(FAST)
+            busy = await quantum.submit(SLOW, timeout=1)
+            started = time.perf_counter()
+            # queued behind the slow solve, never reaches a worker in time
+            with pytest.raises(TimeoutError):
+                await quantum.solve(FAST, timeout=0.3)
+            waited = time.perf_counter() - started
+            with pytest.raises(TimeoutError):
+                await busy
+            return waited
+    assert asyncio.run(main()) < 0.8
+
+
+def test_cancel_stops_a_running_solve():
+    async def main():
+        async with solver() as quantum:
+            await quantum.solve(FAST)
+            task = await quantum.submit(SLOW)
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            started = time.perf_counter()
+            paths = await quantum.solve(FAST, shots=2, seed=1)
+            return time.perf_counter() - started, paths
+    waited, paths = asyncio.run(main())
+    assert waited < 3
+    assert len(paths) == 2
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from maze.maze import Graph, GridMaze
+from maze.maze_generator import PrimGenerator, KruskalGenerator
+from maze import maze_io
+from maze.maze_io import encode, decode, read_header, save, load, MazeCorpus
+
+def edge_pairs(graph: Graph) -> set[tuple[int, int]]:
+    return {(edge.start.id, edge.end.id) for edge in graph.edges}
+
+@pytest.mark.parametrize('width, height', [(1, 1), (3, 5), (9, 8), (17, 2)])
+def test_maze_round_trip(width, height):
+    maze = PrimGenerator().generate_maze(width, height, end=(width - 1, 0), seed=width * height)
+    record = encode(maze, seed=42)
+    assert len(record) % 8 == 0
+    decoded = decode(record)
+    assert isinstance(decoded, GridMaze)
+    assert (decoded.width, decoded.height, decoded.start, decoded.end) == (width, height, maze.start, maze.end)
+    assert edge_pairs(decoded) == edge_pairs(maze)
+    header = read_header(record)
+    assert (header.kind, header.seed, header.width, header.height) == ('maze', 42, width, height)
+
+def test_graph_round_trip():
+    graph = Graph.from_edges([(10, 3), (3, 7), (7, 10), (7, 2), (2, 2)], 10, 2)
+    decoded = decode(encode(graph))
+    assert {node.id for node in decoded.nodes} == {node.id for node in graph.nodes}
+    assert edge_pairs(decoded) == edge_pairs(graph)
+    assert (decoded.start.id, decoded.end.id) == (10, 2)
+    assert read_header(encode(graph)).seed is None
+
+def test_save_and_load(tmp_path):
+    maze = KruskalGenerator(compact=True).generate_maze(6, 4, seed=1)
+    save(tmp_path / 'maze.qmz', maze, seed=1)
+    np.testing.assert_array_equal(load(tmp_path / 'maze.qmz').walls()[0], maze.walls()[0])
+
+def test_corpus(tmp_path):
+    generator = PrimGenerator(compact=True)
+    seeds = generator.batch_seeds(5, seed=3)
+    mazes = [generator.generate_maze(4 + i, 3, seed=s) for i, s in enumerate(seeds)]
+    graph = Graph.from_edges([(0, 1)], 0, 1)
+    path = tmp_path / 'corpus.qmzc'
+    assert MazeCorpus.write(path, mazes + [graph], seeds + [None]) == 6
+    with MazeCorpus(path) as corpus:
+        assert len(corpus) == 6
+        assert [corpus.seed(i) for i in range(6)] == seeds + [None]
+        for stored, maze in zip(corpus, mazes):
+            assert edge_pairs(stored) == edge_pairs(maze)
+        assert edge_pairs(corpus[-1]) == {(0, 1)}
+        with pytest.raises(IndexError):
+            corpus[6]
+
+def test_corpus_streams_its_records(tmp_path, monkeypatch):
+    events = []
+    monkeypatch.setattr(maze_io, 'encode', lambda graph, seed=None: events.append('encode') or encode(graph, seed))
+
+    def mazes():
+        for seed in range(3):
+            events.append('generate')
+            yield PrimGenerator(compact=True).generate_maze(5, 5, seed=seed)
+
+    path = tmp_path / 'corpus.qmzc'
+    assert MazeCorpus.write(path, mazes()) == 3
+    # every maze is written before the next one is made
+    assert events == ['generate', 'encode'] * 3
+    with MazeCorpus(path) as corpus:
+        assert len(corpus) == 3
+        assert edge_pairs(corpus[2]) == edge_pairs(PrimGenerator().generate_maze(5, 5, seed=2))
+
+def test_rejects_foreign_data(tmp_path):
+    record = bytearray(encode(PrimGenerator().generate_maze(2, 2, seed=1)))
+    with pytest.raises(ValueError):
+        decode(b'XXXX' + bytes(record[4:]))
+    record[4] = 99
+    with pytest.raises(ValueError):
+        decode(bytes(record))
+    with pytest.raises(ValueError):
+        decode(b'QMZR')
+    with pytest.raises(ValueError):
+        MazeCorpus.write(tmp_path / 'corpus', [PrimGenerator().generate_maze(2, 2)], [1, 2])
+    with pytest.raises(ValueError):
+        MazeCorpus.write(tmp_path / 'corpus', [PrimGenerator().generate_maze(2, 2)] * 2, [1])
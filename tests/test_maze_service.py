@@ -0,0 +1,92 @@
+import multiprocessing
+import time
+from collections import Counter
+
+import pytest
+
+from maze.maze_circuit import MazeCircuitInfo
+from maze.maze_classical import BFSSolver
+from maze.maze_generator import PrimGenerator
+from maze.maze_reduction import ReducedGraph
+from tests.mazes import braided_maze
+from maze.maze_service import SolveJob, SolveService
+
+# 40 Grover iterations over 24 qubits, far longer than any timeout below
+SLOW = MazeCircuitInfo(PrimGenerator().generate_maze(3, 3, seed=1), 4, iterations=40)
+
+
+@pytest.fixture(scope='module')
+def service():
+    # Aer already ran in this process, a forked worker could inherit its locked state
+    with SolveService(1, mp_context=multiprocessing.get_context('spawn')) as service:
+        yield service
+
+
+def test_classical_jobs_in_order(service):
+    mazes = [PrimGenerator().generate_maze(4, 3, seed=seed) for seed in range(3)]
+    results = service.solve_all([SolveJob(maze, solver) for maze in mazes for solver in ('bfs', 'astar')])
+    assert [result.status for result in results] == ['done'] * 6
+    for i, maze in enumerate(mazes):
+        assert results[2 * i].path[0] == maze.start.id and results[2 * i].path[-1] == maze.end.id
+        assert len(results[2 * i].path) == len(results[2 * i + 1].path)
+
+
+def test_reduced_graph_paths_come_back_expanded(service):
+    maze = braided_maze(4, 3, openings=2, seed=3)
+    reduced = ReducedGraph.reduce(maze)
+    labels = BFSSolver().solve(reduced)
+    info = MazeCircuitInfo(reduced, len(labels) - 1, True)
+    classical, quantum = service.solve_all([SolveJob(reduced), SolveJob.quantum(info, shots=20, seed=1, backend='fast')])
+    assert classical.path == reduced.expand_path(labels)
+    assert quantum.ok
+    # the most common path walks the maze in original node ids
+    path = Counter(tuple(path) for path in quantum.paths).most_common(1)[0][0]
+    assert (path[0], path[-1], len(path)) == (maze.start.id, maze.end.id, len(BFSSolver().solve(maze)))
+    assert all(maze.has_edge(a, b) for a, b in zip(path, path[1:]))
+
+
+def test_timeout_is_enforced_by_the_parent(service):
+    service.solve_all([SolveJob(PrimGenerator().generate_maze(2, 2, seed=1))]) # worker is up
+    worker = service.workers[0]
+    pid, restarts = worker.pid, worker.restarts
+    started = time.perf_counter()
+    result = service.submit(SolveJob.quantum(SLOW, timeout=0.5)).result()
+    assert time.perf_counter() - started < 2
+    assert result.status == 'timeout'
+    assert worker.restarts == restarts + 1
+    assert worker.pid != pid
+    # the replacement process takes the next job
+    maze = PrimGenerator().generate_maze(2, 2, seed=1)
+    result = service.submit(SolveJob.quantum(MazeCircuitInfo(maze, 2), shots=4, seed=1)).result()
+    assert result.ok and len(result.paths) == 4
+
+
+def test_cancel_interrupts_a_running_job(service):
+    future = service.submit(SolveJob.quantum(SLOW))
+    while not future.running():
+        time.sleep(0.01)
+    time.sleep(0.2)
+    started = time.perf_counter()
+    assert service.cancel(future)
+    assert future.result().status == 'cancelled'
+    assert time.perf_counter() - started < 1
+    assert service.submit(SolveJob(PrimGenerator().generate_maze(2, 2, seed=1))).result().ok
+
+
+def test_cancel_drops_a_queued_job(service):
+    running = service.submit(SolveJob.quantum(SLOW))
+    while not running.running():
+        time.sleep(0.01)
+    queued = service.submit(SolveJob(PrimGenerator().generate_maze(2, 2, seed=1)))
+    assert service.cancel(queued)
+    assert queued.cancelled()
+    service.cancel(running)
+    assert running.result().status == 'cancelled'
+    assert not service.cancel(running)
+
+
+def test_rejects_jobs_after_shutdown():
+    service = SolveService(1, mp_context=multiprocessing.get_context('spawn'))
+    service.shutdown()
+    with pytest.raises(RuntimeError):
+        service.submit(SolveJob(PrimGenerator().generate_maze(2, 2, seed=1)))
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+import maze.maze_solver as maze_solver
+from maze.maze_circuit import MazeCircuitInfo, QuantumMazeCircuit
+from maze.maze_generator import PrimGenerator
+from maze.maze_solver import QuantumMazeSolver
+from tests.mazes import braided_maze, is_solution
+
+# L=3 leaves many wrong registers at the default iteration count, so shots spread over many values
+INFO = MazeCircuitInfo(PrimGenerator().generate_maze(2, 2, seed=1), 3, iterations=1)
+
+
+def runs(samples: np.ndarray) -> int:
+    return 1 + int(np.any(samples[1:] != samples[:-1], axis=1).sum())
+
+
+def assert_shuffled_counts(samples: np.ndarray, symbols: np.ndarray, frequencies: np.ndarray):
+    distinct, counts = np.unique(samples, axis=0, return_counts=True)
+    order = np.lexsort(symbols.T[::-1])
+    assert np.array_equal(distinct, symbols[order])
+    assert np.array_equal(counts, frequencies[order])
+    # grouped shots would change value only once per distinct row
+    assert runs(samples) > len(distinct)
+
+
+def test_aer_sample_is_shuffled_and_reproducible():
+    solver = QuantumMazeSolver('aer')
+    samples = solver.sample(INFO, 500, seed=3)
+    assert samples.shape == (500, INFO.register_width)
+    assert np.array_equal(samples, solver.sample(INFO, 500, seed=3))
+    assert_shuffled_counts(samples, *solver.sample_counts(INFO, 500, seed=3))
+
+
+def test_aer_sample_batch_is_shuffled():
+    solver = QuantumMazeSolver('aer')
+    other = MazeCircuitInfo(INFO.graph, 2, iterations=1)
+    batch = solver.sample_batch([INFO, other], 300, seed=5)
+    assert [len(samples) for samples in batch] == [300, 300]
+    assert all(runs(samples) > len(np.unique(samples, axis=0)) for samples in batch)
+    assert all(np.array_equal(a, b) for a, b in zip(batch, solver.sample_batch([INFO, other], 300, seed=5)))
+
+
+def test_fast_sample_is_shuffled():
+    samples = QuantumMazeSolver('fast').sample(INFO, 500, seed=3)
+    assert runs(samples) > len(np.unique(samples, axis=0))
+
+
+def test_sample_until_confident_prepares_the_circuit_once(monkeypatch):
+    calls = {'transpile': 0, 'analytic': 0}
+    transpile, analytic = maze_solver.transpile, maze_solver.AnalyticGroverSimulator
+
+    def counting_transpile(*args, **kwargs):
+        calls['transpile'] += 1
+        return transpile(*args, **kwargs)
+
+    def counting_analytic(*args, **kwargs):
+        calls['analytic'] += 1
+        return analytic(*args, **kwargs)
+
+    monkeypatch.setattr(maze_solver, 'transpile', counting_transpile)
+    monkeypatch.setattr(maze_solver, 'AnalyticGroverSimulator', counting_analytic)
+    for backend in QuantumMazeSolver.BACKENDS:
+        # the spread out register never separates a leader, so every chunk runs
+        result = QuantumMazeSolver(backend).sample_until_confident(INFO, max_shots=700, confidence=0.999999, seed=1)
+        assert result.rounds == 3
+        assert result.shots == 700
+    assert calls == {'transpile': 1, 'analytic': 1}
+
+
+@pytest.mark.parametrize('encoding', QuantumMazeCircuit.ENCODINGS)
+def test_solve_adaptive_finds_a_solution(encoding):
+    maze = PrimGenerator().generate_maze(3, 3, seed=1)
+    result = QuantumMazeSolver('fast').solve_adaptive(maze, encoding=encoding, seed=3)
+    assert result.found
+    assert is_solution(maze, result.path)
+    assert result.shots == len(result.rounds)
+    assert result.oracle_calls == sum(iterations * shots for iterations, shots in result.rounds)
+    # the same seed draws the same rounds
+    again = QuantumMazeSolver('fast').solve_adaptive(maze, encoding=encoding, seed=3)
+    assert again.rounds == result.rounds and again.path == result.path
+
+
+def test_solve_adaptive_stops_at_the_budget():
+    # no path of 2 steps reaches the end, every round fails
+    maze = PrimGenerator().generate_maze(3, 3, seed=1)
+    result = QuantumMazeSolver('fast').solve_adaptive(maze, 2, max_oracle_calls=20, seed=3)
+    assert not result.found and result.path is None
+    assert result.oracle_calls >= 20
+    assert result.oracle_calls - result.rounds[-1][0] < 20
+
+
+def test_solve_adaptive_rejects_unknown_encodings():
+    with pytest.raises(ValueError):
+        QuantumMazeSolver('fast').solve_adaptive(PrimGenerator().generate_maze(2, 2, seed=1), encoding='edge')
+
+
+def test_simulation_settings_pick_and_respect_overrides():
+    small = MazeCircuitInfo(INFO.graph, 2)
+    big = MazeCircuitInfo(PrimGenerator().generate_maze(5, 5, seed=1), 10)
+    auto = QuantumMazeSolver('aer', max_memory_mb=4096)
+    assert auto.simulation_settings(small) == {'method': 'statevector', 'precision': 'double'}
+    assert auto.simulation_settings(big) == {'method': 'matrix_product_state'}
+    assert QuantumMazeSolver('aer', precision='single').simulation_settings(small) == {'method': 'statevector', 'precision': 'single'}
+    # an explicit method is kept, its precision still follows the budget
+    forced = QuantumMazeSolver('aer', simulator_options={'method': 'statevector'}, max_memory_mb=4096)
+    assert forced.simulation_settings(big) == {'method': 'statevector', 'precision': 'single'}
+    assert QuantumMazeSolver('aer', method='extended_stabilizer').simulation_settings(small) == {'method': 'extended_stabilizer'}
+
+
+@pytest.mark.parametrize('max_segment_nodes', [None, 6])
+def test_solve_segmented_stitches_a_solution(max_segment_nodes):
+    maze = braided_maze(5, 5, openings=4, seed=2)
+    result = QuantumMazeSolver('fast').solve_segmented(maze, max_segment_nodes=max_segment_nodes, seed=1)
+    assert result.found and all(segment.found for segment in result.segments)
+    assert result.waypoints[0] == maze.start.id and result.waypoints[-1] == maze.end.id
+    assert len(result.segments) == len(result.waypoints) - 1
+    assert is_solution(maze, result.path)
+    assert result.oracle_calls == sum(segment.oracle_calls for segment in result.segments)
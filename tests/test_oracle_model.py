@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+from maze.maze_generator import PrimGenerator
+from maze.maze_circuit import MazeCircuitInfo, MazeOracle, DirectionMazeCircuitInfo, DirectionMazeOracle, QuantumMazeCircuit, MCX_MODES
+from maze.maze_oracle_model import MazeOracleModel, DirectionOracleModel
+from tests.mazes import braided_maze
+
+qiskit_aer = pytest.importorskip('qiskit_aer')
+from qiskit import QuantumCircuit, transpile
+
+# statevector after the oracle acts on the uniform superposition of the path register, ancillas and work qubits at zero
+def oracle_statevector(info: MazeCircuitInfo) -> np.ndarray:
+    circuit = QuantumCircuit(info.total_qubits)
+    circuit.h(range(info.num_qubits_in_max_path))
+    oracle = DirectionMazeOracle(info) if info.encoding == 'direction' else MazeOracle(info)
+    circuit.append(oracle, range(info.total_qubits))
+    circuit.save_statevector()
+    simulator = qiskit_aer.AerSimulator(method='statevector')
+    return np.asarray(simulator.run(transpile(circuit, simulator)).result().get_statevector())
+
+def node_values(info: MazeCircuitInfo, index: int) -> list[int]:
+    mask = (1 << info.bits_per_node) - 1
+    return [(index >> (s * info.bits_per_node)) & mask for s in range(info.num_nodes_in_max_path)]
+
+CASES = [(seed, length, turn_back_check, mcx_mode) for seed in (1, 2) for length in (1, 2, 3) for turn_back_check in (False, True)
+         for mcx_mode in ('noancilla',)] + [(3, 3, True, mode) for mode in ('recursion', 'v-chain', 'relative-phase')]
+
+@pytest.mark.parametrize('seed, length, turn_back_check, mcx_mode', CASES)
+def test_model_matches_oracle_phases(seed, length, turn_back_check, mcx_mode):
+    maze = braided_maze(2, 2, openings=1, seed=seed) if seed == 2 else PrimGenerator().generate_maze(2, 2, seed=seed)
+    info = MazeCircuitInfo(maze, length, turn_back_check, mcx_mode=mcx_mode)
+    model = MazeOracleModel(info)
+    state = oracle_statevector(info)
+    size = 1 << info.num_qubits_in_max_path
+    amplitude = 1 / np.sqrt(size)
+    # the oracle returns every ancilla and work qubit to zero
+    np.testing.assert_allclose(state[size:], 0, atol=1e-9)
+    marked = set()
+    for index in range(size):
+        path = node_values(info, index)
+        expected = -amplitude if model.is_marked(path) else amplitude
+        assert abs(state[index] - expected) < 1e-9, f"path {path}"
+        if model.is_marked(path):
+            marked.add(tuple(path))
+    assert marked == set(model.marked_paths())
+    # opposite corners of a 2x2 maze are two steps apart
+    assert bool(marked) == (length >= 2)
+
+def test_model_evaluates_packed_registers():
+    info = MazeCircuitInfo(PrimGenerator().generate_maze(2, 2, seed=1), 3, True)
+    model = MazeOracleModel(info)
+    packed = [sum(node << (s * info.bits_per_node) for s, node in enumerate(path)) for path in model.marked_paths()]
+    evaluation = model.evaluate(np.array(packed + [0], dtype=np.int64))
+    assert evaluation.valid.tolist() == [True] * len(packed) + [False]
+    assert evaluation.num_valid == len(packed)
+
+def moves_of(info: DirectionMazeCircuitInfo, index: int) -> list[int]:
+    return [(index >> (2 * s)) & 3 for s in range(info.max_path_length)]
+
+DIRECTION_CASES = [(width, seed, length, turn_back_check, 'noancilla') for width, seed in ((2, 1), (3, 2), (3, 5))
+                   for length in (2, 3, 4) for turn_back_check in (False, True)] + \
+                  [(3, 5, 4, True, mode) for mode in ('recursion', 'v-chain', 'relative-phase')]
+
+@pytest.mark.parametrize('width, seed, length, turn_back_check, mcx_mode', DIRECTION_CASES)
+def test_direction_model_matches_oracle_phases(width, seed, length, turn_back_check, mcx_mode):
+    maze = braided_maze(width, 2, openings=1, seed=seed) if seed == 5 else PrimGenerator().generate_maze(width, 2, seed=seed)
+    info = DirectionMazeCircuitInfo(maze, length, turn_back_check, mcx_mode=mcx_mode)
+    model = DirectionOracleModel(info)
+    state = oracle_statevector(info)
+    size = 1 << info.num_qubits_in_max_path
+    amplitude = 1 / np.sqrt(size)
+    np.testing.assert_allclose(state[size:], 0, atol=1e-9)
+    marked = {tuple(moves_of(info, index)) for index in range(size) if model.is_marked(moves_of(info, index))}
+    for index in range(size):
+        expected = -amplitude if tuple(moves_of(info, index)) in marked else amplitude
+        assert abs(state[index] - expected) < 1e-9, f"moves {moves_of(info, index)}"
+    assert marked == set(model.marked_paths())
+
+def test_direction_oracle_is_built_from_the_walls(monkeypatch):
+    def enumerate_solutions(self):
+        raise AssertionError("the oracle must not enumerate the solutions")
+    monkeypatch.setattr(DirectionOracleModel, 'marked_paths', enumerate_solutions)
+    # no path of 3 steps crosses a 4x4 maze, the lookup is built all the same
+    info = DirectionMazeCircuitInfo(PrimGenerator().generate_maze(4, 4, seed=1), 3)
+    oracle = DirectionMazeOracle(info)
+    assert oracle.num_qubits == info.total_qubits
+    assert info.positions[0] == [info.graph.start.id]
+    assert all(entries for entries in info.transitions[:-1]) and info.transitions[-1] == []
+
+def test_direction_resources_match_the_transpiled_circuit():
+    maze = PrimGenerator().generate_maze(3, 2, seed=2)
+    for mode in ('v-chain', 'relative-phase'):
+        info = DirectionMazeCircuitInfo(maze, 4, True, iterations=1, mcx_mode=mode)
+        resources = info.estimate_resources()
+        transpiled = transpile(QuantumMazeCircuit.from_info(info), basis_gates=['cx', 'u'], optimization_level=1)
+        assert resources.num_qubits == transpiled.num_qubits
+        assert resources.estimated_cx == transpiled.count_ops()['cx']
+        assert resources.estimated_depth >= transpiled.depth()
+
+@pytest.mark.parametrize('mcx_mode', MCX_MODES)
+@pytest.mark.parametrize('length, turn_back_check', [(2, False), (3, True)])
+def test_node_resources_match_the_transpiled_circuit(mcx_mode, length, turn_back_check):
+    info = MazeCircuitInfo(PrimGenerator().generate_maze(3, 2, seed=2), length, turn_back_check, iterations=1, mcx_mode=mcx_mode)
+    resources = info.estimate_resources()
+    transpiled = transpile(QuantumMazeCircuit.from_info(info), basis_gates=['cx', 'u'], optimization_level=1)
+    assert resources.num_qubits == transpiled.num_qubits
+    assert resources.estimated_depth >= transpiled.depth()
+    if mcx_mode in ('v-chain', 'relative-phase'):
+        assert resources.estimated_cx == transpiled.count_ops()['cx']
+    else:
+        # the transpiler borrows clean qubits for these gates, the per gate costs only bound them
+        assert resources.estimated_cx >= transpiled.count_ops()['cx']
+
+COUNT_CASES = [(info_type, width, seed, length, turn_back_check) for info_type in (MazeCircuitInfo, DirectionMazeCircuitInfo)
+               for width, seed in ((2, 1), (3, 2), (4, 3)) for length in (1, 2, 4, 6) for turn_back_check in (False, True)]
+
+@pytest.mark.parametrize('info_type, width, seed, length, turn_back_check', COUNT_CASES)
+def test_count_and_sample_agree_with_the_listed_paths(info_type, width, seed, length, turn_back_check):
+    maze = braided_maze(width, 3, openings=2, seed=seed) if width > 2 else PrimGenerator().generate_maze(width, 3, seed=seed)
+    model = info_type(maze, length, turn_back_check).oracle_model()
+    marked = model.marked_paths()
+    assert model.count_marked() == len(marked)
+    if marked:
+        samples = model.sample_marked(50 * len(marked), np.random.default_rng(seed))
+        assert samples.shape == (50 * len(marked), len(marked[0]))
+        drawn = [tuple(row) for row in samples.tolist()]
+        assert set(drawn) <= set(marked)
+        # uniform: every marked path comes up, none far more often than the others
+        counts = [drawn.count(path) for path in marked]
+        assert min(counts) > 0 and max(counts) < 100
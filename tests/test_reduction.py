@@ -0,0 +1,51 @@
+from maze.maze import Graph
+from maze.maze_generator import PrimGenerator
+from maze.maze_reduction import ReducedGraph
+from maze.maze_classical import BFSSolver
+from tests.mazes import braided_maze, is_solution
+
+def test_reduction_keeps_the_solution_of_a_perfect_maze():
+    maze = PrimGenerator().generate_maze(10, 10, seed=2)
+    reduced = ReducedGraph.reduce(maze)
+    # a perfect maze reduces to the single edge from start to end
+    assert reduced.total_nodes == 2
+    path = BFSSolver().solve(reduced)
+    assert reduced.expand_path(path) == BFSSolver().solve(maze)
+
+def test_reduction_preserves_shortest_paths_with_cycles():
+    for seed in range(5):
+        maze = braided_maze(8, 8, openings=10, seed=seed)
+        reduced = ReducedGraph.reduce(maze)
+        assert reduced.total_nodes < maze.total_nodes
+        # every reduced edge expands to a walk in the maze of its weight
+        for edge in reduced.edges:
+            a, b = edge.start.id, edge.end.id
+            walk = reduced.expand_path([a, b])
+            assert len(walk) - 1 == reduced.weight(a, b)
+            assert all(maze.has_edge(u, v) for u, v in zip(walk, walk[1:]))
+        # the shortest path of the maze survives: its weighted length in the reduced graph matches
+        expanded = reduced.expand_path(BFSSolver().solve(reduced))
+        assert is_solution(maze, expanded)
+        assert reduced.label_of(maze.start.id) == reduced.start.id and reduced.original_id(reduced.end.id) == maze.end.id
+
+def test_dead_ends_and_unreachable_nodes_are_pruned():
+    # 0 - 1 - 2 - 3 with a dead end 1 - 4 and an unreachable pair 5 - 6
+    graph = Graph.from_edges([(0, 1), (1, 2), (2, 3), (1, 4), (5, 6)], 0, 3, bidirectional=True)
+    reduced = ReducedGraph.reduce(graph, contract_corridors=False)
+    assert sorted(reduced.original_id(node.id) for node in reduced.nodes) == [0, 1, 2, 3]
+    contracted = ReducedGraph.reduce(graph)
+    assert contracted.total_nodes == 2
+    assert contracted.corridor(contracted.start.id, contracted.end.id) == [1, 2]
+    assert contracted.weight(contracted.start.id, contracted.end.id) == 3
+
+def test_directed_corridors_keep_their_direction():
+    graph = Graph.from_edges([(0, 1), (1, 2), (2, 3)], 0, 3)
+    reduced = ReducedGraph.reduce(graph)
+    start, end = reduced.start.id, reduced.end.id
+    assert reduced.has_edge(start, end) and not reduced.has_edge(end, start)
+    assert reduced.expand_path([start, end]) == [0, 1, 2, 3]
+
+def test_expand_path_marks_unknown_labels():
+    reduced = ReducedGraph.reduce(PrimGenerator().generate_maze(3, 3, seed=1))
+    assert reduced.expand_path([]) == []
+    assert reduced.expand_path([0, 7])[-1] == -1
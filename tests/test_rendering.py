@@ -0,0 +1,65 @@
+import sys
+import types
+import numpy as np
+import pytest
+from maze.maze import Graph, GridMaze
+
+matplotlib = pytest.importorskip('matplotlib')
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+# 2x2 maze (0, 0) -> (1, 0) -> (1, 1), entered from the west and left to the east
+def small_maze() -> GridMaze:
+    east_walls = np.array([[False, True], [True, True]])
+    south_walls = np.array([[True, False], [True, True]])
+    return GridMaze(2, 2, (0, 0), (1, 1), east_walls, south_walls)
+
+def test_raster_marks_the_walls():
+    image = small_maze().raster()
+    assert image.shape == (5, 5)
+    assert np.array_equal(image, np.array([
+        [1, 1, 1, 1, 1],
+        [0, 0, 0, 0, 1],
+        [1, 1, 1, 0, 1],
+        [1, 0, 1, 0, 0],
+        [1, 1, 1, 1, 1],
+    ], dtype=bool))
+
+# unit wall segments of a raster, ((x0, y0), (x1, y1)) in drawing coordinates with y pointing up
+def raster_segments(image: np.ndarray) -> set[tuple[tuple[float, float], ...]]:
+    height = image.shape[0] // 2
+    segments = set()
+    for r, c in zip(*np.nonzero(image)):
+        r, c = int(r), int(c)
+        if r % 2 == 0 and c % 2 == 1:
+            segments.add(((c // 2, height - r // 2), (c // 2 + 1, height - r // 2)))
+        elif r % 2 == 1 and c % 2 == 0:
+            segments.add(((c // 2, height - r // 2 - 1), (c // 2, height - r // 2)))
+    return segments
+
+def test_wall_segments_match_the_raster():
+    maze = small_maze()
+    segments = maze.wall_segments()
+    # six outer walls besides the two openings and the two inner walls
+    assert segments.shape == (8, 2, 2)
+    drawn = {tuple(sorted(map(tuple, segment.tolist()))) for segment in segments}
+    assert len(drawn) == len(segments)
+    assert drawn == raster_segments(maze.raster())
+
+def test_graph_renderers(monkeypatch):
+    graph = Graph.from_edges([(0, 1), (1, 2), (0, 2)], 0, 2)
+    _, ax = plt.subplots()
+    graph.show([0, 1, 2], renderer='local', ax=ax)
+    # the edges, then the path on top of them
+    assert [len(collection.get_segments()) for collection in ax.collections[:2]] == [3, 2]
+    assert [text.get_text() for text in ax.texts] == ['0', '1', '2']
+    plt.close('all')
+
+    drawn = []
+    monkeypatch.setitem(sys.modules, 'utils.Helpers', types.SimpleNamespace(mm=drawn.append))
+    graph.show([0, 2], renderer='mermaid')
+    header, *lines = drawn[0].split('\n')
+    assert header == 'flowchart LR;'
+    assert sorted(lines) == ['    n0 --> n1;', '    n0 --> n2;', '    n1 --> n2;', '    ns0 --> ns2;']
+    with pytest.raises(ValueError):
+        graph.show(renderer='svg')
@@ -0,0 +1,52 @@
+import pytest
+from maze.maze import Graph
+from maze.maze_generator import PrimGenerator
+from maze.maze_segmentation import SegmentedGraph
+from maze.maze_classical import BFSSolver
+from tests.mazes import braided_maze, is_solution
+
+def solve_segments(segmented: SegmentedGraph) -> list[int]:
+    paths = [segment.expand_path(BFSSolver().solve(segment)) for segment in segmented.segments]
+    return segmented.stitch(paths)
+
+def test_separators_of_a_chain_of_cycles():
+    # two squares 0-1-2-3 and 3-4-5-6 joined at 3, then a tail 6 - 7
+    edges = [(0, 1), (1, 3), (0, 2), (2, 3), (3, 4), (4, 6), (3, 5), (5, 6), (6, 7)]
+    graph = Graph.from_edges(edges, 0, 7, bidirectional=True)
+    assert SegmentedGraph.separators(graph) == [3, 6]
+    assert SegmentedGraph.separators(Graph.from_edges(edges, 0, 3, bidirectional=True)) == []
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('max_segment_nodes', [None, 4, 8])
+def test_segments_stitch_into_a_solution(seed, max_segment_nodes):
+    maze = braided_maze(8, 8, openings=6, seed=seed)
+    segmented = SegmentedGraph(maze, max_segment_nodes=max_segment_nodes)
+    waypoints = segmented.waypoints
+    assert waypoints[0] == maze.start.id and waypoints[-1] == maze.end.id
+    assert len(segmented.segments) == len(waypoints) - 1
+    if max_segment_nodes is not None:
+        assert all(segment.total_nodes <= max_segment_nodes for segment in segmented.segments)
+    assert is_solution(maze, solve_segments(segmented))
+
+def test_perfect_maze_segments_follow_the_only_path():
+    maze = PrimGenerator().generate_maze(10, 10, seed=7)
+    segmented = SegmentedGraph(maze, max_segment_nodes=2)
+    assert solve_segments(segmented) == BFSSolver().solve(maze)
+
+def test_explicit_waypoints():
+    maze = PrimGenerator().generate_maze(6, 6, seed=3)
+    path = BFSSolver().solve(maze)
+    segmented = SegmentedGraph(maze, waypoints=[path[5], path[9]])
+    assert segmented.waypoints == [path[0], path[5], path[9], path[-1]]
+    assert solve_segments(segmented) == path
+    with pytest.raises(ValueError):
+        SegmentedGraph(maze, waypoints=[path[5], path[5]])
+    with pytest.raises(ValueError):
+        SegmentedGraph(maze, max_segment_nodes=1)
+
+def test_stitch_drops_cycles_and_checks_the_segment_count():
+    graph = Graph.from_edges([(0, 1), (1, 2), (2, 3)], 0, 3, bidirectional=True)
+    segmented = SegmentedGraph(graph, waypoints=[2])
+    assert segmented.stitch([[0, 1, 2], [2, 1, 2, 3]]) == [0, 1, 2, 3]
+    with pytest.raises(ValueError):
+        segmented.stitch([[0, 1, 2]])
@@ -0,0 +1,59 @@
+import logging
+import math
+import numpy as np
+from maze.maze_circuit import MazeCircuitInfo, DirectionMazeCircuitInfo
+from maze.maze_generator import PrimGenerator
+from maze.maze_oracle_model import MazeOracleModel, DirectionOracleModel
+from maze.maze_simulator import AnalyticGroverSimulator, SimulationProfile
+from tests.mazes import braided_maze
+
+def test_analytic_simulator_never_lists_the_marked_paths(monkeypatch):
+    def enumerate_solutions(self):
+        raise AssertionError("the simulator must not list the marked paths")
+    monkeypatch.setattr(MazeOracleModel, 'marked_paths', enumerate_solutions)
+    monkeypatch.setattr(DirectionOracleModel, 'marked_paths', enumerate_solutions)
+    # walks of 24 steps through a braided maze, far too many to list
+    maze = braided_maze(6, 6, openings=10, seed=1)
+    for info in (MazeCircuitInfo(maze, 24), DirectionMazeCircuitInfo(maze, 24)):
+        simulator = AnalyticGroverSimulator(info)
+        assert simulator.num_marked > 10 ** 6
+        theta = math.asin(math.sqrt(math.ldexp(simulator.num_marked, -info.num_qubits_in_max_path)))
+        iterations = round(math.pi / (4 * theta) - 0.5)
+        assert simulator.success_probability(iterations) > 0.9
+        samples = simulator.sample(200, iterations, seed=3)
+        assert samples.shape == (200, info.register_width)
+        assert info.oracle_model().evaluate(samples).valid.mean() > 0.8
+
+def test_success_probability_follows_the_marked_count():
+    info = MazeCircuitInfo(PrimGenerator().generate_maze(3, 2, seed=2), 3)
+    simulator = AnalyticGroverSimulator(info)
+    num_marked = len(info.oracle_model().marked_paths())
+    assert simulator.num_marked == num_marked
+    theta = math.asin(math.sqrt(num_marked / 2 ** info.num_qubits_in_max_path))
+    for iterations in (0, 1, 3):
+        assert math.isclose(simulator.success_probability(iterations), math.sin((2 * iterations + 1) * theta) ** 2)
+    samples = simulator.sample(4000, info.iterations, seed=5)
+    hits = info.oracle_model().evaluate(samples).valid.mean()
+    assert abs(hits - simulator.success_probability()) < 0.05
+
+# a sparse 5x5 maze with paths of 10 steps takes 65 qubits, far past any statevector
+SPARSE = MazeCircuitInfo(PrimGenerator().generate_maze(5, 5, seed=1), 10)
+
+def test_select_prefers_the_statevector():
+    profile = SimulationProfile(MazeCircuitInfo(PrimGenerator().generate_maze(2, 2, seed=1), 2))
+    assert profile.select(profile.statevector_bytes('double'))[:2] == ('statevector', 'double')
+    assert profile.select(profile.statevector_bytes('single'))[:2] == ('statevector', 'single')
+
+def test_select_falls_to_mps_on_large_sparse_mazes():
+    profile = SimulationProfile(SPARSE)
+    assert profile.num_qubits == 65
+    # the bond dimension follows the marked paths crossing one step, not the number of ancillas
+    assert profile.bond_dimension <= 4 * 40
+    assert profile.select(4 << 30)[:2] == ('matrix_product_state', 'double')
+
+def test_select_warns_when_nothing_fits(caplog):
+    profile = SimulationProfile(SPARSE)
+    with caplog.at_level(logging.WARNING, logger='maze.maze_simulator'):
+        method, precision, reason = profile.select(1 << 10)
+    assert (method, precision) == ('matrix_product_state', 'double')
+    assert reason in caplog.text
@@ -0,0 +1,43 @@
+import json
+import pytest
+from maze import maze_trace
+
+def test_nested_spans_export_as_chrome_events(tmp_path):
+    path = tmp_path / 'trace.json'
+    with maze_trace.tracing(str(path)) as tracer:
+        with maze_trace.span('outer', shots=10) as outer:
+            with maze_trace.span('inner', samples=4):
+                pass
+            with maze_trace.span('inner') as second:
+                second.set(distinct=2)
+    assert maze_trace.active_tracer is None
+    assert maze_trace.span('untraced') is maze_trace.NULL_SPAN
+
+    spans = {span.id: span for span in tracer.spans}
+    inner = [span for span in spans.values() if span.name == 'inner']
+    assert [span.parent for span in inner] == [outer, outer]
+    assert outer.parent is None
+
+    events = json.loads(path.read_text())['traceEvents']
+    assert sorted(event['name'] for event in events) == ['inner', 'inner', 'outer']
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 and event['ts'] >= 0 for event in events)
+    by_id = {event['args']['id']: event for event in events}
+    assert set(by_id) == set(spans)
+    # every child sits inside its parent on the timeline
+    for event in events:
+        parent = event['args']['parent']
+        if parent is not None:
+            assert by_id[parent]['name'] == 'outer'
+            assert by_id[parent]['ts'] <= event['ts']
+            assert event['ts'] + event['dur'] <= by_id[parent]['ts'] + by_id[parent]['dur'] + 1e-3
+    assert by_id[outer.id]['args']['shots'] == 10
+    assert sorted(by_id[span.id]['args'].get('samples', by_id[span.id]['args'].get('distinct')) for span in inner) == [2, 4]
+
+def test_span_records_errors():
+    with maze_trace.tracing() as tracer:
+        with pytest.raises(KeyError):
+            with maze_trace.span('failing'):
+                raise KeyError('x')
+    [span] = tracer.spans
+    assert span.attributes['error'] == 'KeyError'
+    assert span.duration >= 0